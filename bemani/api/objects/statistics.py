@@ -35,117 +35,18 @@ class StatisticsObject(BaseObject):
         else:
             return self.version
 
-    def __is_play(self, attempt: Attempt) -> bool:
-        if self.game in [
-            GameConstants.DDR,
-            GameConstants.JUBEAT,
-            GameConstants.MUSECA,
-            GameConstants.POPN_MUSIC,
-        ]:
-            return True
-        if self.game == GameConstants.IIDX:
-            return attempt.data.get_int('clear_status') != DBConstants.IIDX_CLEAR_STATUS_NO_PLAY
-        if self.game == GameConstants.REFLEC_BEAT:
-            return attempt.data.get_int('clear_type') != DBConstants.REFLEC_BEAT_CLEAR_TYPE_NO_PLAY
-        if self.game == GameConstants.SDVX:
-            return attempt.data.get_int('clear_type') != DBConstants.SDVX_CLEAR_TYPE_NO_PLAY
-
-        return False
-
-    def __is_clear(self, attempt: Attempt) -> bool:
-        if not self.__is_play(attempt):
-            return False
-
-        if self.game == GameConstants.DDR:
-            return attempt.data.get_int('rank') != DBConstants.DDR_RANK_E
-        if self.game == GameConstants.IIDX:
-            return attempt.data.get_int('clear_status') != DBConstants.IIDX_CLEAR_STATUS_FAILED
-        if self.game == GameConstants.JUBEAT:
-            return attempt.data.get_int('medal') != DBConstants.JUBEAT_PLAY_MEDAL_FAILED
-        if self.game == GameConstants.MUSECA:
-            return attempt.data.get_int('clear_type') != DBConstants.MUSECA_CLEAR_TYPE_FAILED
-        if self.game == GameConstants.POPN_MUSIC:
-            return attempt.data.get_int('medal') not in [
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_CIRCLE_FAILED,
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_DIAMOND_FAILED,
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_STAR_FAILED,
-            ]
-        if self.game == GameConstants.REFLEC_BEAT:
-            return attempt.data.get_int('clear_type') != DBConstants.REFLEC_BEAT_CLEAR_TYPE_FAILED
-        if self.game == GameConstants.SDVX:
-            return (
-                attempt.data.get_int('grade') != DBConstants.SDVX_GRADE_NO_PLAY and
-                attempt.data.get_int('clear_type') not in [
-                    DBConstants.SDVX_CLEAR_TYPE_NO_PLAY,
-                    DBConstants.SDVX_CLEAR_TYPE_FAILED,
-                ]
-            )
-
-        return False
-
-    def __is_combo(self, attempt: Attempt) -> bool:
-        if not self.__is_play(attempt):
-            return False
-
-        if self.game == GameConstants.DDR:
-            return attempt.data.get_int('halo') != DBConstants.DDR_HALO_NONE
-        if self.game == GameConstants.IIDX:
-            return attempt.data.get_int('clear_status') == DBConstants.IIDX_CLEAR_STATUS_FULL_COMBO
-        if self.game == GameConstants.JUBEAT:
-            return attempt.data.get_int('medal') in [
-                DBConstants.JUBEAT_PLAY_MEDAL_FULL_COMBO,
-                DBConstants.JUBEAT_PLAY_MEDAL_NEARLY_EXCELLENT,
-                DBConstants.JUBEAT_PLAY_MEDAL_EXCELLENT,
-            ]
-        if self.game == GameConstants.MUSECA:
-            return attempt.data.get_int('clear_type') == DBConstants.MUSECA_CLEAR_TYPE_FULL_COMBO
-        if self.game == GameConstants.POPN_MUSIC:
-            return attempt.data.get_int('medal') in [
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_CIRCLE_FULL_COMBO,
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_DIAMOND_FULL_COMBO,
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_STAR_FULL_COMBO,
-                DBConstants.POPN_MUSIC_PLAY_MEDAL_PERFECT,
-            ]
-        if self.game == GameConstants.REFLEC_BEAT:
-            return attempt.data.get_int('combo_type') in [
-                DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO,
-                DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO_ALL_JUST,
-            ]
-        if self.game == GameConstants.SDVX:
-            return attempt.data.get_int('clear_type') in [
-                DBConstants.SDVX_CLEAR_TYPE_ULTIMATE_CHAIN,
-                DBConstants.SDVX_CLEAR_TYPE_PERFECT_ULTIMATE_CHAIN,
-            ]
-
-        return False
-
-    def __aggregate_global(self, attempts: List[Attempt]) -> List[Dict[str, Any]]:
-        stats: Dict[int, Dict[int, Dict[str, int]]] = {}
-
-        for attempt in attempts:
-            if attempt.id not in stats:
-                stats[attempt.id] = {}
-            if attempt.chart not in stats[attempt.id]:
-                stats[attempt.id][attempt.chart] = {
-                    'plays': 0,
-                    'clears': 0,
-                    'combos': 0,
-                }
-
-            if self.__is_play(attempt):
-                stats[attempt.id][attempt.chart]['plays'] += 1
-            if self.__is_clear(attempt):
-                stats[attempt.id][attempt.chart]['clears'] += 1
-            if self.__is_combo(attempt):
-                stats[attempt.id][attempt.chart]['combos'] += 1
-
+    def __aggregate_global(self, rates: Dict[int, Dict[int, Dict[str, int]]]) -> List[Dict[str, Any]]:
         retval = []
-        for songid in stats:
-            for songchart in stats[songid]:
-                stat = stats[songid][songchart]
-                stat['id'] = songid
-                stat['chart'] = songchart
-                retval.append(self.__format_statistics(stat))
+        for songid in rates:
+            for songchart in rates[songid]:
+                stat = rates[songid][songchart]
+                retval.append(self.__format_statistics({
+                    'id': songid,
+                    'chart': songchart,
+                    'plays': stat['plays'],
+                    'clears': stat['clears'],
+                    'combos': stat['combos'],
+                }))
 
         return retval
 
@@ -164,11 +65,12 @@ class StatisticsObject(BaseObject):
                     'combos': 0,
                 }
 
-            if self.__is_play(attempt):
+            play, clear, combo = self.data.local.music.get_attempt_stats(self.game, attempt.data)
+            if play:
                 stats[userid][attempt.id][attempt.chart]['plays'] += 1
-            if self.__is_clear(attempt):
+            if clear:
                 stats[userid][attempt.id][attempt.chart]['clears'] += 1
-            if self.__is_combo(attempt):
+            if combo:
                 stats[userid][attempt.id][attempt.chart]['combos'] += 1
 
         retval = []
@@ -188,7 +90,7 @@ class StatisticsObject(BaseObject):
         # Fetch the attempts
         if idtype == APIConstants.ID_TYPE_SERVER:
             retval = self.__aggregate_global(
-                [attempt[1] for attempt in self.data.local.music.get_all_attempts(self.game, self.music_version)]
+                self.data.local.music.get_clear_rates(self.game, self.music_version)
             )
         elif idtype == APIConstants.ID_TYPE_SONG:
             if len(ids) == 1:
@@ -198,7 +100,7 @@ class StatisticsObject(BaseObject):
                 songid = int(ids[0])
                 chart = int(ids[1])
             retval = self.__aggregate_global(
-                [attempt[1] for attempt in self.data.local.music.get_all_attempts(self.game, self.music_version, songid=songid, songchart=chart)]
+                self.data.local.music.get_clear_rates(self.game, self.music_version, songid=songid, songchart=chart)
             )
         elif idtype == APIConstants.ID_TYPE_INSTANCE:
             songid = int(ids[0])
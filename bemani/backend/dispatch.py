@@ -87,7 +87,12 @@ class Dispatch:
 
         request = tree.children[0]
 
+        # Only the sections we modify below are copied, so that we never change the
+        # global config and don't pay for a deep copy on every request.
         config = copy.copy(self.__config)
+        for section in ['paseli', 'server']:
+            if section in config:
+                config[section] = copy.copy(config[section])
         config['machine'] = {
             'pcbid': pcbid,
             'arcade': pcb.arcade,
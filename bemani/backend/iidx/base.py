@@ -201,7 +201,7 @@ class IIDXBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
         Returns a dictionary similar to the following:
 
         {
-            musicid: {
+            songid: {
                 chart: {
                     total: total plays,
                     clears: total clears,
@@ -210,8 +210,8 @@ class IIDXBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             },
         }
         """
-        all_attempts, remote_attempts = Parallel.execute([
-            lambda: self.data.local.music.get_all_attempts(
+        local_attempts, remote_attempts = Parallel.execute([
+            lambda: self.data.local.music.get_clear_rates(
                 game=self.game,
                 version=self.music_version,
                 songid=songid,
@@ -225,65 +225,35 @@ class IIDXBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             ),
         ])
 
+        # If requesting a specific song/chart, make sure its in the dict
         attempts: Dict[int, Dict[int, Dict[str, int]]] = {}
-        for (_, attempt) in all_attempts:
-            if attempt.data.get_int('clear_status') == self.CLEAR_STATUS_NO_PLAY:
-                # This attempt was outside of the clear infra, so don't bother with it.
-                continue
+        if songid is not None:
+            attempts[songid] = {}
 
-            # Terrible temporary structure is terrible.
-            if attempt.id not in attempts:
-                attempts[attempt.id] = {}
-            if attempt.chart not in attempts[attempt.id]:
-                attempts[attempt.id][attempt.chart] = {
+            if songchart is not None:
+                attempts[songid][songchart] = {
                     'total': 0,
                     'clears': 0,
                     'fcs': 0,
                 }
 
-            # We saw an attempt, keep the total attempts in sync.
-            attempts[attempt.id][attempt.chart]['total'] = attempts[attempt.id][attempt.chart]['total'] + 1
-
-            if attempt.data.get_int('clear_status', self.CLEAR_STATUS_FAILED) == self.CLEAR_STATUS_FAILED:
-                # This attempt was a failure, so don't count it against clears of full combos
-                continue
-
-            # It was at least a clear
-            attempts[attempt.id][attempt.chart]['clears'] = attempts[attempt.id][attempt.chart]['clears'] + 1
-
-            if attempt.data.get_int('clear_status') == self.CLEAR_STATUS_FULL_COMBO:
-                # This was a full combo clear, so it also counts here
-                attempts[attempt.id][attempt.chart]['fcs'] = attempts[attempt.id][attempt.chart]['fcs'] + 1
-
-        # Merge in remote attempts
-        for songid in remote_attempts:
-            if songid not in attempts:
-                attempts[songid] = {}
-
-            for songchart in remote_attempts[songid]:
-                if songchart not in attempts[songid]:
-                    attempts[songid][songchart] = {
-                        'total': 0,
-                        'clears': 0,
-                        'fcs': 0,
-                    }
-
-                attempts[songid][songchart]['total'] += remote_attempts[songid][songchart]['plays']
-                attempts[songid][songchart]['clears'] += remote_attempts[songid][songchart]['clears']
-                attempts[songid][songchart]['fcs'] += remote_attempts[songid][songchart]['combos']
-
-        # If requesting a specific song/chart, make sure its in the dict
-        if songid is not None:
-            if songid not in attempts:
-                attempts[songid] = {}
+        # Merge in local and remote attempts
+        for rates in [local_attempts, remote_attempts]:
+            for songid in rates:
+                if songid not in attempts:
+                    attempts[songid] = {}
+
+                for chart in rates[songid]:
+                    if chart not in attempts[songid]:
+                        attempts[songid][chart] = {
+                            'total': 0,
+                            'clears': 0,
+                            'fcs': 0,
+                        }
 
-            if songchart is not None:
-                if songchart not in attempts[songid]:
-                    attempts[songid][songchart] = {
-                        'total': 0,
-                        'clears': 0,
-                        'fcs': 0,
-                    }
+                    attempts[songid][chart]['total'] += rates[songid][chart]['plays']
+                    attempts[songid][chart]['clears'] += rates[songid][chart]['clears']
+                    attempts[songid][chart]['fcs'] += rates[songid][chart]['combos']
 
         return attempts
 
@@ -626,6 +596,76 @@ class IIDXBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
         # The machine they joined matches the arcade of the current machine
         return their_machine.arcade == machine.arcade
 
+    def __get_arcade_ranking(self, userid: UserID, musicid: int, chart: int, machine: Machine) -> List[Tuple[UserID, Score]]:
+        all_scores = sorted(
+            self.data.remote.music.get_all_scores(game=self.game, version=self.music_version, songid=musicid, songchart=chart),
+            key=lambda s: (s[1].points, s[1].timestamp),
+            reverse=True,
+        )
+        all_players = {
+            uid: prof for (uid, prof) in
+            self.get_any_profiles([s[0] for s in all_scores])
+        }
+        return [
+            score for score in all_scores
+            if (
+                score[0] == userid or
+                self.user_joined_arcade(machine, all_players[score[0]])
+            )
+        ]
+
+    def get_ranking_position(self, userid: Optional[UserID], musicid: int, chart: int, machine: Optional[Machine]) -> Optional[int]:
+        """
+        Look up the zero-based position of a user's score on the ranking for a song/chart,
+        or None if they have no score. If a machine is given, only players who joined the
+        same arcade are ranked. Otherwise the global leaderboard is used, which doesn't
+        require loading every score for the chart.
+        """
+        if userid is None:
+            return None
+
+        if machine is None:
+            return self.data.remote.music.get_leaderboard_rank(self.game, self.music_version, userid, musicid, chart)
+
+        for i, (uid, _) in enumerate(self.__get_arcade_ranking(userid, musicid, chart, machine)):
+            if uid == userid:
+                return i
+        return None
+
+    def get_ranking_neighbors(
+        self,
+        userid: UserID,
+        musicid: int,
+        chart: int,
+        machine: Optional[Machine],
+        distance: int,
+    ) -> Tuple[int, List[Tuple[UserID, Score]]]:
+        """
+        Look up the scores within a certain distance of a user's own score on the ranking for a
+        song/chart, using the same rules as get_ranking_position. Returns the zero-based position
+        of the first score returned, along with the scores themselves in ranking order.
+        """
+        if machine is None:
+            position = self.data.remote.music.get_leaderboard_rank(self.game, self.music_version, userid, musicid, chart)
+            if position is None:
+                raise Exception('Cannot find our own score after saving to DB!')
+            start = max(position - distance, 0)
+            return start, self.data.remote.music.get_leaderboard(
+                self.game,
+                self.music_version,
+                musicid,
+                chart,
+                offset=start,
+                limit=(position + distance + 1) - start,
+            )
+
+        all_scores = self.__get_arcade_ranking(userid, musicid, chart, machine)
+        for i, (uid, _) in enumerate(all_scores):
+            if uid == userid:
+                start = max(i - distance, 0)
+                return start, all_scores[start:(i + distance + 1)]
+        raise Exception('Cannot find our own score after saving to DB!')
+
     def get_ghost(
         self,
         ghost_type: int,
@@ -680,13 +720,17 @@ class IIDXBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
                     machine = None
 
                 if machine is not None:
+                    profiles = {uid: prof for (uid, prof) in self.get_any_profiles([score[0] for score in all_scores])}
                     all_scores = [
                         score for score in all_scores
-                        if self.user_joined_arcade(machine, self.get_any_profile(score[0]))
+                        if self.user_joined_arcade(machine, profiles[score[0]])
                     ]
                 else:
                     # Not joined an arcade, so nobody matches our scores
                     all_scores = []
+            elif ghost_type == self.GHOST_TYPE_GLOBAL_TOP:
+                # Only the top score matters, so there's no need to load the whole leaderboard
+                all_scores = self.data.remote.music.get_leaderboard(self.game, self.music_version, musicid, chart, limit=1)
             else:
                 all_scores = sorted(
                     self.data.remote.music.get_all_scores(game=self.game, version=self.music_version, songid=musicid, songchart=chart),
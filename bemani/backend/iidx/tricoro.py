@@ -359,7 +359,6 @@ class IIDXTricoro(IIDXBase):
             ]
 
             totalscores: Dict[UserID, int] = {}
-            profiles: Dict[UserID, ValidatedDict] = {}
             for songid in songids:
                 scores = self.data.local.music.get_all_scores(
                     self.game,
@@ -371,13 +370,10 @@ class IIDXTricoro(IIDXBase):
                 for score in scores:
                     if score[0] not in totalscores:
                         totalscores[score[0]] = 0
-                        profile = self.get_any_profile(score[0])
-                        if profile is None:
-                            profile = ValidatedDict()
-                        profiles[score[0]] = profile
-
                     totalscores[score[0]] += score[1].points
 
+            profiles = {uid: prof for (uid, prof) in self.get_any_profiles(list(totalscores.keys()))}
+
             topscores = sorted(
                 [
                     (totalscores[userid], profiles[userid])
@@ -510,31 +506,7 @@ class IIDXTricoro(IIDXBase):
                 machine = None
 
             # First, determine our current ranking before saving the new score
-            all_scores = sorted(
-                self.data.remote.music.get_all_scores(game=self.game, version=self.music_version, songid=musicid, songchart=chart),
-                key=lambda s: (s[1].points, s[1].timestamp),
-                reverse=True,
-            )
-            all_players = {
-                uid: prof for (uid, prof) in
-                self.get_any_profiles([s[0] for s in all_scores])
-            }
-
-            if not global_scores:
-                all_scores = [
-                    score for score in all_scores
-                    if (
-                        score[0] == userid or
-                        self.user_joined_arcade(machine, all_players[score[0]])
-                    )
-                ]
-
-            # Find our actual index
-            oldindex = None
-            for i in range(len(all_scores)):
-                if all_scores[i][0] == userid:
-                    oldindex = i
-                    break
+            oldindex = self.get_ranking_position(userid, musicid, chart, None if global_scores else machine)
 
             if userid is not None:
                 clear_status = self.game_to_db_status(int(request.attribute('cflg')))
@@ -583,42 +555,11 @@ class IIDXTricoro(IIDXBase):
                 ranklist = Node.void('ranklist')
                 root.add_child(ranklist)
 
-                all_scores = sorted(
-                    self.data.remote.music.get_all_scores(game=self.game, version=self.music_version, songid=musicid, songchart=chart),
-                    key=lambda s: (s[1].points, s[1].timestamp),
-                    reverse=True,
-                )
-                missing_players = [
-                    uid for (uid, _) in all_scores
-                    if uid not in all_players
-                ]
-                for (uid, prof) in self.get_any_profiles(missing_players):
-                    all_players[uid] = prof
-
-                if not global_scores:
-                    all_scores = [
-                        score for score in all_scores
-                        if (
-                            score[0] == userid or
-                            self.user_joined_arcade(machine, all_players[score[0]])
-                        )
-                    ]
-
-                # Find our actual index
-                ourindex = None
-                for i in range(len(all_scores)):
-                    if all_scores[i][0] == userid:
-                        ourindex = i
-                        break
-                if ourindex is None:
-                    raise Exception('Cannot find our own score after saving to DB!')
-                start = ourindex - 4
-                end = ourindex + 4
-                if start < 0:
-                    start = 0
-                if end >= len(all_scores):
-                    end = len(all_scores) - 1
-                relevant_scores = all_scores[start:(end + 1)]
+                start, relevant_scores = self.get_ranking_neighbors(userid, musicid, chart, None if global_scores else machine, 4)
+                all_players = {
+                    uid: prof for (uid, prof) in
+                    self.get_any_profiles([s[0] for s in relevant_scores])
+                }
 
                 record_num = start + 1
                 for score in relevant_scores:
@@ -961,14 +902,7 @@ class IIDXTricoro(IIDXBase):
                 )
 
             # Figure out number of players that played this ranking
-            all_achievements = self.data.local.user.get_all_achievements(self.game, self.version)
-            num_players = 0
-            for [_, ach] in all_achievements:
-                if ach.type != index:
-                    continue
-                if ach.id != rank:
-                    continue
-                num_players = num_players + 1
+            num_players = self.data.local.user.count_achievements(self.game, self.version, rank, index)
 
             root = Node.void('grade')
             root.set_attribute('pnum', str(num_players))
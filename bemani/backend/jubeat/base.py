@@ -1,10 +1,10 @@
 # vim: set fileencoding=utf-8
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from bemani.backend.base import Base
 from bemani.backend.core import CoreHandler, CardManagerHandler, PASELIHandler
 from bemani.common import DBConstants, GameConstants, ValidatedDict, Model
-from bemani.data import Data, Score, UserID
+from bemani.data import Attempt, Data, Score, UserID
 from bemani.protocol import Node
 
 
@@ -179,102 +179,137 @@ class JubeatBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
         history in a controlled manner, so all games in Jubeat series can expect
         the same attributes in a score.
         """
-        # Range check medals
-        if medal not in [
-            self.PLAY_MEDAL_FAILED,
-            self.PLAY_MEDAL_CLEARED,
-            self.PLAY_MEDAL_NEARLY_FULL_COMBO,
-            self.PLAY_MEDAL_FULL_COMBO,
-            self.PLAY_MEDAL_NEARLY_EXCELLENT,
-            self.PLAY_MEDAL_EXCELLENT,
-        ]:
-            raise Exception(f"Invalid medal value {medal}")
-
-        oldscore = self.data.local.music.get_score(
-            self.game,
-            self.music_version,
+        self.update_scores(
             userid,
-            songid,
-            chart,
+            [{
+                'timestamp': timestamp,
+                'songid': songid,
+                'chart': chart,
+                'points': points,
+                'medal': medal,
+                'combo': combo,
+                'ghost': ghost,
+                'stats': stats,
+                'music_rate': music_rate,
+            }],
         )
 
-        # Score history is verbatum, instead of highest score
-        history = ValidatedDict({})
-        oldpoints = points
-
-        if oldscore is None:
-            # If it is a new score, create a new dictionary to add to
-            scoredata = ValidatedDict({})
-            raised = True
-            highscore = True
-        else:
-            # Set the score to any new record achieved
-            raised = points > oldscore.points
-            highscore = points >= oldscore.points
-            points = max(oldscore.points, points)
-            scoredata = oldscore.data
-
-        # Replace medal with highest value
-        scoredata.replace_int('medal', max(scoredata.get_int('medal'), medal))
-        history.replace_int('medal', medal)
-
-        # Increment counters based on medal
-        if medal == self.PLAY_MEDAL_CLEARED:
-            scoredata.increment_int('clear_count')
-        if medal == self.PLAY_MEDAL_FULL_COMBO:
-            scoredata.increment_int('full_combo_count')
-        if medal == self.PLAY_MEDAL_EXCELLENT:
-            scoredata.increment_int('excellent_count')
-
-        # If we have a combo, replace it
-        scoredata.replace_int('combo', max(scoredata.get_int('combo'), combo))
-        history.replace_int('combo', combo)
-
-        if stats is not None:
-            if raised:
-                # We have stats, and there's a new high score, update the stats
-                scoredata.replace_dict('stats', stats)
-            history.replace_dict('stats', stats)
-
-        if ghost is not None:
-            # Update the ghost regardless, but don't bother with it in history
-            scoredata.replace_int_array('ghost', len(ghost), ghost)
-
-        if music_rate is not None:
-            if oldscore is not None:
-                if music_rate > oldscore.data.get_int('music_rate'):
-                    scoredata.replace_int('music_rate', music_rate)
-            else:
-                scoredata.replace_int('music_rate', music_rate)
-            history.replace_int('music_rate', music_rate)
-
-        # Look up where this score was earned
-        lid = self.get_machine_id()
-
-        # Write the new score back
-        self.data.local.music.put_score(
+    def update_scores(self, userid: UserID, plays: List[Dict[str, Any]]) -> None:
+        """
+        Given a list of plays, each a dictionary with the same arguments as update_score,
+        update the user's high scores and score history for all of them at once. Games
+        should use this when they send every song played in a credit together.
+        """
+        for play in plays:
+            # Range check medals
+            if play['medal'] not in [
+                self.PLAY_MEDAL_FAILED,
+                self.PLAY_MEDAL_CLEARED,
+                self.PLAY_MEDAL_NEARLY_FULL_COMBO,
+                self.PLAY_MEDAL_FULL_COMBO,
+                self.PLAY_MEDAL_NEARLY_EXCELLENT,
+                self.PLAY_MEDAL_EXCELLENT,
+            ]:
+                raise Exception(f"Invalid medal value {play['medal']}")
+
+        oldscores = self.data.local.music.get_scores_by_song(
             self.game,
             self.music_version,
             userid,
-            songid,
-            chart,
-            lid,
-            points,
-            scoredata,
-            highscore,
-            timestamp=timestamp,
+            [(play['songid'], play['chart']) for play in plays],
         )
 
-        # Save the history of this score too
-        self.data.local.music.put_attempt(
+        # Look up where these scores were earned
+        lid = self.get_machine_id()
+
+        newscores: Dict[Tuple[int, int], Score] = {}
+        attempts: List[Attempt] = []
+        for play in plays:
+            songid = play['songid']
+            chart = play['chart']
+            timestamp = play['timestamp']
+            points = play['points']
+            medal = play['medal']
+            combo = play['combo']
+            ghost = play.get('ghost')
+            stats = play.get('stats')
+            music_rate = play.get('music_rate')
+
+            # The same chart can be played more than once in a credit, in which case
+            # later plays are compared against the score from the earlier ones.
+            oldscore = newscores.get((songid, chart), oldscores.get((songid, chart)))
+
+            # Score history is verbatum, instead of highest score
+            history = ValidatedDict({})
+            oldpoints = points
+
+            if oldscore is None:
+                # If it is a new score, create a new dictionary to add to
+                scoredata = ValidatedDict({})
+                raised = True
+                highscore = True
+            else:
+                # Set the score to any new record achieved
+                raised = points > oldscore.points
+                highscore = points >= oldscore.points
+                points = max(oldscore.points, points)
+                scoredata = oldscore.data
+
+            # Replace medal with highest value
+            scoredata.replace_int('medal', max(scoredata.get_int('medal'), medal))
+            history.replace_int('medal', medal)
+
+            # Increment counters based on medal
+            if medal == self.PLAY_MEDAL_CLEARED:
+                scoredata.increment_int('clear_count')
+            if medal == self.PLAY_MEDAL_FULL_COMBO:
+                scoredata.increment_int('full_combo_count')
+            if medal == self.PLAY_MEDAL_EXCELLENT:
+                scoredata.increment_int('excellent_count')
+
+            # If we have a combo, replace it
+            scoredata.replace_int('combo', max(scoredata.get_int('combo'), combo))
+            history.replace_int('combo', combo)
+
+            if stats is not None:
+                if raised:
+                    # We have stats, and there's a new high score, update the stats
+                    scoredata.replace_dict('stats', stats)
+                history.replace_dict('stats', stats)
+
+            if ghost is not None:
+                # Update the ghost regardless, but don't bother with it in history
+                scoredata.replace_int_array('ghost', len(ghost), ghost)
+
+            if music_rate is not None:
+                if oldscore is not None:
+                    if music_rate > oldscore.data.get_int('music_rate'):
+                        scoredata.replace_int('music_rate', music_rate)
+                else:
+                    scoredata.replace_int('music_rate', music_rate)
+                history.replace_int('music_rate', music_rate)
+
+            # We only want to move the timestamp and location if it is a new record.
+            newscores[(songid, chart)] = Score(
+                -1,
+                songid,
+                chart,
+                points,
+                timestamp if highscore else oldscore.timestamp,
+                timestamp,
+                lid if highscore else oldscore.location,
+                0,
+                scoredata,
+            )
+
+            # Save the history of this score too
+            attempts.append(Attempt(-1, songid, chart, oldpoints, timestamp, lid, raised, history))
+
+        # Write the new scores back, along with their history
+        self.data.local.music.put_scores_and_attempts(
             self.game,
             self.music_version,
             userid,
-            songid,
-            chart,
-            lid,
-            oldpoints,
-            history,
-            raised,
-            timestamp=timestamp,
+            list(newscores.values()),
+            attempts,
         )
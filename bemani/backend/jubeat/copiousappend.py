@@ -428,6 +428,7 @@ class JubeatCopiousAppend(
         # Grab scores and save those
         result = data.child('result')
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -469,7 +470,17 @@ class JubeatCopiousAppend(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal, combo, ghost)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                })
+
+            self.update_scores(userid, plays)
 
         # Save back last information gleaned from results
         newprofile.replace_dict('last', last)
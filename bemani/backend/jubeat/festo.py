@@ -2272,6 +2272,7 @@ class JubeatFesto(
 
         # Grab scores and save those
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -2317,8 +2318,19 @@ class JubeatFesto(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal,
-                                  combo, ghost, stats, music_rate)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                    'stats': stats,
+                    'music_rate': music_rate,
+                })
+
+            self.update_scores(userid, plays)
                                   
      
         # Born stuff
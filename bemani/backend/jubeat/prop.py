@@ -1263,6 +1263,7 @@ class JubeatProp(
 
         # Grab scores and save those
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -1295,7 +1296,17 @@ class JubeatProp(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal, combo, ghost)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                })
+
+            self.update_scores(userid, plays)
 
         # If this was a course save, grab and save that info too
         course = player.child('course')
@@ -1166,6 +1166,7 @@ class JubeatQubell(
 
         # Grab scores and save those
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -1205,7 +1206,18 @@ class JubeatQubell(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal, combo, ghost, stats)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                    'stats': stats,
+                })
+
+            self.update_scores(userid, plays)
 
         # Born stuff
         born = player.child('born')
@@ -634,6 +634,7 @@ class JubeatSaucer(
         # Grab scores and save those
         result = data.child('result')
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -675,7 +676,17 @@ class JubeatSaucer(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal, combo, ghost)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                })
+
+            self.update_scores(userid, plays)
 
         # Save back last information gleaned from results
         newprofile.replace_dict('last', last)
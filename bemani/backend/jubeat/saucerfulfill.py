@@ -708,6 +708,7 @@ class JubeatSaucerFulfill(
         # Grab scores and save those
         result = data.child('result')
         if result is not None:
+            plays: List[Dict[str, Any]] = []
             for tune in result.children:
                 if tune.name != 'tune':
                     continue
@@ -749,7 +750,17 @@ class JubeatSaucerFulfill(
                     if flags & bit > 0:
                         medal = max(medal, mapping[bit])
 
-                self.update_score(userid, timestamp, songid, chart, points, medal, combo, ghost)
+                plays.append({
+                    'timestamp': timestamp,
+                    'songid': songid,
+                    'chart': chart,
+                    'points': points,
+                    'medal': medal,
+                    'combo': combo,
+                    'ghost': ghost,
+                })
+
+            self.update_scores(userid, plays)
 
         # Grab the course results as well
         course = data.child('course')
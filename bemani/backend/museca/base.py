@@ -138,8 +138,8 @@ class MusecaBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             },
         }
         """
-        all_attempts, remote_attempts = Parallel.execute([
-            lambda: self.data.local.music.get_all_attempts(
+        local_attempts, remote_attempts = Parallel.execute([
+            lambda: self.data.local.music.get_clear_rates(
                 game=self.game,
                 version=self.music_version,
             ),
@@ -149,26 +149,14 @@ class MusecaBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             )
         ])
         attempts: Dict[int, Dict[int, Dict[str, int]]] = {}
-        for (_, attempt) in all_attempts:
-            # Terrible temporary structure is terrible.
-            if attempt.id not in attempts:
-                attempts[attempt.id] = {}
-            if attempt.chart not in attempts[attempt.id]:
-                attempts[attempt.id][attempt.chart] = {
-                    'total': 0,
-                    'clears': 0,
+        for songid in local_attempts:
+            attempts[songid] = {}
+            for songchart in local_attempts[songid]:
+                attempts[songid][songchart] = {
+                    'total': local_attempts[songid][songchart]['plays'],
+                    'clears': local_attempts[songid][songchart]['clears'],
                 }
 
-            # We saw an attempt, keep the total attempts in sync.
-            attempts[attempt.id][attempt.chart]['total'] = attempts[attempt.id][attempt.chart]['total'] + 1
-
-            if attempt.data.get_int('clear_type', self.CLEAR_TYPE_FAILED) != self.CLEAR_TYPE_FAILED:
-                # This attempt was a failure, so don't count it against clears of full combos
-                continue
-
-            # It was at least a clear
-            attempts[attempt.id][attempt.chart]['clears'] = attempts[attempt.id][attempt.chart]['clears'] + 1
-
         # Merge in remote attempts
         for songid in remote_attempts:
             if songid not in attempts:
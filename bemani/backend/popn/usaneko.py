@@ -184,10 +184,20 @@ class PopnMusicUsaNeko(PopnMusicBase):
             phase.add_child(Node.s16('phase', phases[phaseid]))
 
         # Gather course informatino and course ranking for users.
-        course_infos, achievements, profiles = Parallel.execute([
+        type_to_chart_lut: Dict[str, str] = {
+            f'course_{self.GAME_CHART_TYPE_EASY}': "loc_ranking_e",
+            f'course_{self.GAME_CHART_TYPE_NORMAL}': "loc_ranking_n",
+            f'course_{self.GAME_CHART_TYPE_HYPER}': "loc_ranking_h",
+            f'course_{self.GAME_CHART_TYPE_EX}': "loc_ranking_ex",
+        }
+        course_infos, profiles, *course_achievements = Parallel.execute([
             lambda: self.data.local.game.get_all_time_sensitive_settings(self.game, self.version, 'course'),
-            lambda: self.data.local.user.get_all_achievements(self.game, self.version),
             lambda: self.data.local.user.get_all_profiles(self.game, self.version),
+            *[
+                # Bind the type now, since these are called after the loop finishes.
+                lambda achtype=achtype: self.data.local.user.get_all_achievements(self.game, self.version, achievementtype=achtype)
+                for achtype in type_to_chart_lut
+            ],
         ])
         # Sort courses by newest to oldest so we can grab the newest 256.
         course_infos = sorted(
@@ -197,15 +207,7 @@ class PopnMusicUsaNeko(PopnMusicBase):
         )
         # Sort achievements within course ID from best to worst ranking.
         achievements_by_course_id: Dict[int, Dict[str, List[Tuple[UserID, Achievement]]]] = {}
-        type_to_chart_lut: Dict[str, str] = {
-            f'course_{self.GAME_CHART_TYPE_EASY}': "loc_ranking_e",
-            f'course_{self.GAME_CHART_TYPE_NORMAL}': "loc_ranking_n",
-            f'course_{self.GAME_CHART_TYPE_HYPER}': "loc_ranking_h",
-            f'course_{self.GAME_CHART_TYPE_EX}': "loc_ranking_ex",
-        }
-        for uid, ach in achievements:
-            if ach.type[:7] != 'course_':
-                continue
+        for uid, ach in [uid_and_ach for achievements in course_achievements for uid_and_ach in achievements]:
             if ach.id not in achievements_by_course_id:
                 achievements_by_course_id[ach.id] = {
                     "loc_ranking_e": [],
@@ -470,13 +472,18 @@ class PopnMusicUsaNeko(PopnMusicBase):
 
             # Handle fetching all scores
             uids_and_courses, profile = Parallel.execute([
-                lambda: self.data.local.user.get_all_achievements(self.game, self.version),
+                lambda: self.data.local.user.get_all_achievements(
+                    self.game,
+                    self.version,
+                    achievementid=course_id,
+                    achievementtype=course_type,
+                ),
                 lambda: self.get_profile(userid) or ValidatedDict()
             ])
 
             # Grab a sorted list of all scores for this course and chart
             global_uids_and_courses = sorted(
-                [(uid, ach) for (uid, ach) in uids_and_courses if ach.type == course_type and ach.id == course_id],
+                uids_and_courses,
                 key=lambda uid_and_course: uid_and_course[1].data.get_int('score'),
                 reverse=True,
             )
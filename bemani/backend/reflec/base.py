@@ -1,5 +1,5 @@
 # vim: set fileencoding=utf-8
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 
 from bemani.backend.base import Base
 from bemani.backend.core import CoreHandler, CardManagerHandler, PASELIHandler
@@ -34,6 +34,11 @@ class ReflecBeatBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
     COMBO_TYPE_FULL_COMBO = DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO
     COMBO_TYPE_FULL_COMBO_ALL_JUST = DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO_ALL_JUST
 
+    # Score totals that players are ranked by on the network, in the order that
+    # the game expects ranks for them. Versions without network ranking leave this
+    # empty, so no totals are kept for them.
+    RANKING_TOTALS: List[str] = []
+
     def __init__(self, data: Data, config: Dict[str, Any], model: Model) -> None:
         super().__init__(data, config, model)
         if model.rev == 'X':
@@ -47,6 +52,93 @@ class ReflecBeatBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             return DBConstants.OMNIMIX_VERSION_BUMP + self.version
         return self.version
 
+    @property
+    def ranking_version(self) -> int:
+        """
+        The version whose ranking totals this game places players against. Older
+        versions ranked omnimix players against the regular score pool.
+        """
+        return self.music_version
+
+    @classmethod
+    def run_scheduled_work(cls, data: Data, config: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Recount ranking totals once a day, so that scores from remote servers are
+        included and any drift from incremental updates is corrected.
+        """
+        if cls.RANKING_TOTALS and data.local.network.should_schedule(cls.game, cls.version, 'ranking_totals', 'daily'):
+            cls.rebuild_ranking_totals(data)
+
+            # Mark that we did some actual work here.
+            data.local.network.mark_scheduled(cls.game, cls.version, 'ranking_totals', 'daily')
+        return []
+
+    @classmethod
+    def get_new_songs(cls, data: Data) -> Set[int]:
+        """
+        Returns the song IDs that first appeared in this version of the game.
+        """
+        return {song.id for song in data.local.music.get_all_songs(cls.game, cls.version) if song.data.get_int('folder', 0) == cls.version}
+
+    @classmethod
+    def get_ranking_totals(cls, chart: int, new_song: bool) -> List[str]:
+        """
+        Returns the names of the ranking totals that a cleared score on a chart counts towards.
+        """
+        names = [
+            'total',
+            {
+                cls.CHART_TYPE_BASIC: 'basic',
+                cls.CHART_TYPE_MEDIUM: 'medium',
+                cls.CHART_TYPE_HARD: 'hard',
+                cls.CHART_TYPE_SPECIAL: 'special',
+            }.get(chart, ''),
+        ]
+        if new_song:
+            names.append('new')
+        return [name for name in names if name in cls.RANKING_TOTALS]
+
+    @classmethod
+    def rebuild_ranking_totals(cls, data: Data) -> None:
+        """
+        Recount every player's ranking totals for this version from all scores on the
+        network, for both the regular and omnimix versions of the game.
+        """
+        new_songs = cls.get_new_songs(data) if 'new' in cls.RANKING_TOTALS else set()
+        if 'minigame' in cls.RANKING_TOTALS:
+            all_profiles = data.remote.user.get_all_profiles(cls.game, cls.version)
+        else:
+            all_profiles = []
+
+        for version in [cls.version, DBConstants.OMNIMIX_VERSION_BUMP + cls.version]:
+            totals: Dict[UserID, Dict[str, int]] = {}
+            for (userid, score) in data.remote.music.get_all_scores(cls.game, version):
+                # Every player with a score is ranked, even if they haven't cleared anything.
+                if userid not in totals:
+                    totals[userid] = {'total': 0} if 'total' in cls.RANKING_TOTALS else {}
+
+                # Only scores where the user at least cleared the song count.
+                if score.data.get_int('clear_type') < cls.CLEAR_TYPE_CLEARED:
+                    continue
+
+                for name in cls.get_ranking_totals(score.chart, score.id in new_songs):
+                    totals[userid][name] = totals[userid].get(name, 0) + score.points
+
+            for (userid, profile) in all_profiles:
+                if userid not in totals:
+                    totals[userid] = {}
+                totals[userid]['minigame'] = profile.get_int('mgsc')
+
+            data.local.music.replace_score_totals(cls.game, version, totals)
+
+    def get_ranking_places(self, totals: List[int]) -> List[int]:
+        """
+        Given totals in the order of RANKING_TOTALS, return where each would place
+        amongst every player on the network.
+        """
+        ranks = self.data.local.music.get_score_total_ranks(self.game, self.ranking_version, dict(zip(self.RANKING_TOTALS, totals)))
+        return [ranks[name] for name in self.RANKING_TOTALS]
+
     def previous_version(self) -> Optional['ReflecBeatBase']:
         """
         Returns the previous version of the game, based on this game. Should
@@ -174,6 +266,10 @@ class ReflecBeatBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
             songid,
             chart,
         )
+        if oldscore is not None and oldscore.data.get_int('clear_type') >= self.CLEAR_TYPE_CLEARED:
+            oldtotal = oldscore.points
+        else:
+            oldtotal = 0
 
         # Score history is verbatum, instead of highest score
         now = Time.now()
@@ -287,3 +383,19 @@ class ReflecBeatBase(CoreHandler, CardManagerHandler, PASELIHandler, Base):
 
             # We saved successfully
             break
+
+        # Keep this player's ranking totals in sync with their best scores. A first score
+        # always writes its totals, so that players without clears are still ranked.
+        newtotal = points if scoredata.get_int('clear_type') >= self.CLEAR_TYPE_CLEARED else 0
+        if self.RANKING_TOTALS and (newtotal != oldtotal or oldscore is None):
+            if 'new' in self.RANKING_TOTALS:
+                song = self.data.local.music.get_song(self.game, self.version, songid, chart)
+                new_song = song is not None and song.data.get_int('folder', 0) == self.version
+            else:
+                new_song = False
+            self.data.local.music.update_score_totals(
+                self.game,
+                self.music_version,
+                userid,
+                {name: newtotal - oldtotal for name in self.get_ranking_totals(chart, new_song)},
+            )
@@ -30,9 +30,15 @@ class ReflecBeatGroovin(ReflecBeatBase):
     GAME_COMBO_TYPE_FULL_COMBO = 1
     GAME_COMBO_TYPE_FULL_COMBO_ALL_JUST = 3
 
+    RANKING_TOTALS = ['total', 'basic', 'medium', 'hard', 'special', 'new']
+
     def previous_version(self) -> Optional[ReflecBeatBase]:
         return ReflecBeatColette(self.data, self.config, self.model)
 
+    @property
+    def ranking_version(self) -> int:
+        return self.version
+
     @classmethod
     def get_settings(cls) -> Dict[str, Any]:
         """
@@ -732,103 +738,16 @@ class ReflecBeatGroovin(ReflecBeatBase):
         # various scores.
         current_scores = request.child_value('score')
 
-        # First, grab all scores on the network for this version, and all songs
-        # available so we know which songs are new to this version of the game.
-        all_scores = self.data.remote.music.get_all_scores(self.game, self.version)
-        all_songs = self.data.local.music.get_all_songs(self.game, self.version)
-
-        # Figure out what song IDs are new
-        new_songs = {song.id for song in all_songs if song.data.get_int('folder', 0) == self.version}
-
-        # Now grab all participating users that had scores
-        all_users = {userid for (userid, score) in all_scores}
-
-        # Now, group the scores by user, so we can add up the totals, only including
-        # scores where the user at least cleared the song.
-        scores_by_user = {
-            userid: [
-                score for (uid, score) in all_scores
-                if uid == userid and score.data.get_int('clear_type') >= self.CLEAR_TYPE_CLEARED]
-            for userid in all_users
-        }
-
-        # Now, sum up the scores into the six categories that the game expects.
-        total_scores = sorted(
-            [
-                sum([score.points for score in scores])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        basic_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_BASIC])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        medium_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_MEDIUM])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        hard_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_HARD])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        special_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_SPECIAL])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        new_scores = sorted(
-            [
-                sum([score.points for score in scores if score.id in new_songs])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-
-        # Guarantee that a zero score is at the end of every list, so that it makes
-        # the algorithm for figuring out place have no edge case.
-        total_scores.append(0)
-        basic_scores.append(0)
-        medium_scores.append(0)
-        hard_scores.append(0)
-        special_scores.append(0)
-        new_scores.append(0)
-
         # Now, figure out where we fit based on the scores sent from the game.
-        user_place = [1, 1, 1, 1, 1, 1]
-        which_score = [
-            total_scores,
-            basic_scores,
-            medium_scores,
-            hard_scores,
-            special_scores,
-            new_scores,
-        ]
-        for i in range(len(user_place)):
-            current_score = current_scores[i]
-            scores = which_score[i]
-            for score in scores:
-                if current_score >= score:
-                    break
-                user_place[i] = user_place[i] + 1
+        user_place = self.get_ranking_places(current_scores)
+        all_players = self.data.local.music.get_score_total_count(self.game, self.ranking_version, 'total')
 
         root = Node.void('player')
         scorenode = Node.void('score')
         root.add_child(scorenode)
         scorenode.add_child(Node.s32_array('rank', user_place))
         scorenode.add_child(Node.s32_array('score', [0] * 6))
-        scorenode.add_child(Node.s32_array('allrank', [len(total_scores)] * 6))
+        scorenode.add_child(Node.s32_array('allrank', [all_players + 1] * 6))
         return root
 
     def handle_player_rb4delete_request(self, request: Node) -> Node:
@@ -18,6 +18,10 @@ class ReflecBeatVolzza(ReflecBeatVolzzaBase):
     def previous_version(self) -> Optional[ReflecBeatBase]:
         return ReflecBeatGroovin(self.data, self.config, self.model)
 
+    @property
+    def ranking_version(self) -> int:
+        return self.version
+
     @classmethod
     def get_settings(cls) -> Dict[str, Any]:
         """
@@ -178,97 +182,8 @@ class ReflecBeatVolzza(ReflecBeatVolzzaBase):
         current_scores = request.child_value('sc')
         current_minigame_score = request.child_value('mg_sc')
 
-        # First, grab all scores on the network for this version.
-        all_scores = self.data.remote.music.get_all_scores(self.game, self.version)
-
-        # Now grab all participating users that had scores
-        all_users = {userid for (userid, score) in all_scores}
-
-        # Now, group the scores by user, so we can add up the totals, only including
-        # scores where the user at least cleared the song.
-        scores_by_user = {
-            userid: [
-                score for (uid, score) in all_scores
-                if uid == userid and score.data.get_int('clear_type') >= self.CLEAR_TYPE_CLEARED]
-            for userid in all_users
-        }
-
-        # Now grab all user profiles for this game
-        all_profiles = {
-            profile[0]: profile[1] for profile in
-            self.data.remote.user.get_all_profiles(self.game, self.version)
-        }
-
-        # Now, sum up the scores into the five categories that the game expects.
-        total_scores = sorted(
-            [
-                sum([score.points for score in scores])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        basic_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_BASIC])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        medium_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_MEDIUM])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        hard_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_HARD])
-                for userid, scores in scores_by_user.items()
-            ],
-        )
-        special_scores = sorted(
-            [
-                sum([score.points for score in scores if score.chart == self.CHART_TYPE_SPECIAL])
-                for userid, scores in scores_by_user.items()
-            ],
-            reverse=True,
-        )
-        minigame_scores = sorted(
-            [
-                all_profiles.get(userid, ValidatedDict()).get_int('mgsc')
-                for userid in all_users
-            ],
-            reverse=True,
-        )
-
-        # Guarantee that a zero score is at the end of every list, so that it makes
-        # the algorithm for figuring out place have no edge case.
-        total_scores.append(0)
-        basic_scores.append(0)
-        medium_scores.append(0)
-        hard_scores.append(0)
-        special_scores.append(0)
-        minigame_scores.append(0)
-
         # Now, figure out where we fit based on the scores sent from the game.
-        user_place = [1, 1, 1, 1, 1, 1]
-        which_score = [
-            total_scores,
-            basic_scores,
-            medium_scores,
-            hard_scores,
-            special_scores,
-            minigame_scores,
-        ]
-        earned_scores = current_scores + [current_minigame_score]
-        for i in range(len(user_place)):
-            earned_score = earned_scores[i]
-            scores = which_score[i]
-            for score in scores:
-                if earned_score >= score:
-                    break
-                user_place[i] = user_place[i] + 1
+        user_place = self.get_ranking_places(current_scores + [current_minigame_score])
 
         # Separate out minigame rank from scores
         minigame_rank = user_place[-1]
@@ -569,6 +484,12 @@ class ReflecBeatVolzza(ReflecBeatVolzzaBase):
         newprofile.replace_int('class_ar', request.child_value('pdata/base/class_ar'))
         newprofile.replace_int('mgid', request.child_value('pdata/minigame/mgid'))
         newprofile.replace_int('mgsc', request.child_value('pdata/minigame/sc'))
+        self.data.local.music.put_score_totals(
+            self.game,
+            self.ranking_version,
+            userid,
+            {'minigame': newprofile.get_int('mgsc')},
+        )
         newprofile.replace_int_array('favorites', 30, request.child_value('pdata/mylist/list/mlst'))
 
         # Save player config
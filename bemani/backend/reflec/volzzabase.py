@@ -25,6 +25,8 @@ class ReflecBeatVolzzaBase(ReflecBeatBase):
     GAME_COMBO_TYPE_FULL_COMBO = 1
     GAME_COMBO_TYPE_FULL_COMBO_ALL_JUST = 3
 
+    RANKING_TOTALS = ['total', 'basic', 'medium', 'hard', 'special', 'minigame']
+
     def _db_to_game_clear_type(self, db_status: int) -> int:
         return {
             self.CLEAR_TYPE_NO_PLAY: self.GAME_CLEAR_TYPE_NO_PLAY,
@@ -3371,8 +3371,12 @@ class SoundVoltexVividWave(
         skill_course = Node.void('skill_course')
         game.add_child(skill_course)
 
-        achievements = self.data.local.user.get_all_achievements(self.game, self.version)
-        courserates: Dict[Tuple[int, int], Dict[str, int]] = {}
+        # Course achievement IDs encode both the season and the course.
+        coursestats = self.data.local.user.get_achievement_stats(self.game, self.version, 'course', 'score', 'clear_type', 2)
+        courserates: Dict[Tuple[int, int], Dict[str, int]] = {
+            (courseid % 100, int(courseid / 100)): stats
+            for courseid, stats in coursestats.items()
+        }
 
         def getrates(season_id: int, course_id: int) -> Dict[str, int]:
             if (course_id, season_id) in courserates:
@@ -3384,20 +3388,6 @@ class SoundVoltexVividWave(
                     'total_score': 0,
                 }
 
-        for _, achievement in achievements:
-            if achievement.type != 'course':
-                continue
-
-            course_id = achievement.id % 100
-            season_id = int(achievement.id / 100)
-            rate = getrates(season_id, course_id)
-
-            rate['attempts'] += 1
-            if achievement.data.get_int('clear_type') >= 2:
-                rate['clears'] += 1
-            rate['total_score'] = achievement.data.get_int('score')
-            courserates[(course_id, season_id)] = rate
-
         seasons = self.__get_skill_analyzer_seasons()
         skill_levels = self.__get_skill_analyzer_skill_levels()
         courses = self.__get_skill_analyzer_courses()
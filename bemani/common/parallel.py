@@ -1,35 +1,105 @@
 import concurrent.futures
-from typing import Any, Callable, List, TypeVar
+import functools
+import os
+import threading
+from typing import Any, Callable, List, Optional, TypeVar
 
 T = TypeVar('T')
 
 
+class _Task:
+    """
+    A single callable handed to the shared executor. Whichever of a worker thread or
+    the thread waiting on the result gets to it first runs it, so that a caller never
+    waits on work that is stuck behind other work in a busy executor.
+    """
+
+    def __init__(self, call: Callable[[], Any]) -> None:
+        self.__call = call
+        self.__lock = threading.Lock()
+        self.__claimed = False
+        self.__done = threading.Event()
+        self.__result: Any = None
+        self.__exception: Optional[BaseException] = None
+
+    def run(self) -> None:
+        with self.__lock:
+            if self.__claimed:
+                return
+            self.__claimed = True
+
+        try:
+            self.__result = self.__call()
+        except BaseException as e:
+            self.__exception = e
+        finally:
+            self.__done.set()
+
+    def result(self) -> Any:
+        self.__done.wait()
+        if self.__exception is not None:
+            raise self.__exception
+        return self.__result
+
+
 class Parallel:
     """
     Utilities for executing parallel operations. This is used as a convenience
     so that we don't have to plumb async/await support (yuck) through the network,
     but we can still make multiple queries at once to remote services and the DB.
+
+    All operations share a single bounded pool of threads per process. Callers
+    also run any of their own work that no thread has picked up yet, so nesting
+    parallel operations can't exhaust the pool and deadlock.
     """
 
+    # Maximum number of threads in the shared pool.
+    MAX_WORKERS = 32
+
+    __lock = threading.Lock()
+    __executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    __pid: Optional[int] = None
+
     @staticmethod
-    def execute(lambdas: List[Callable[[], Any]]) -> List[Any]:
+    def __get_executor() -> concurrent.futures.ThreadPoolExecutor:
+        with Parallel.__lock:
+            # Threads don't survive a fork, so a forked worker needs its own pool.
+            if Parallel.__executor is None or Parallel.__pid != os.getpid():
+                Parallel.__executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=Parallel.MAX_WORKERS,
+                    thread_name_prefix='parallel',
+                )
+                Parallel.__pid = os.getpid()
+            return Parallel.__executor
+
+    @staticmethod
+    def __run(calls: List[Callable[[], Any]]) -> List[Any]:
         """
-        Given a list of callables, execute them and return a list of their returns.
-        Guarantees order of return based on order of callable.
+        Given a list of callables, run them on the shared pool and return a list of
+        their returns in the same order.
         """
-
-        if len(lambdas) == 0:
+        if len(calls) == 0:
             return []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(lambdas)) as executor:
-            futures = {executor.submit(lambdas[pos]): pos for pos in range(len(lambdas))}
-            results = []  # List: Tuple[Any, int]
+        if len(calls) == 1:
+            return [calls[0]()]
 
-            for future in concurrent.futures.as_completed(futures):
-                pos = futures[future]
-                data = future.result()
-                results.append((data, pos))
+        tasks = [_Task(call) for call in calls]
+        executor = Parallel.__get_executor()
+        for task in tasks[1:]:
+            executor.submit(task.run)
 
-            return [r[0] for r in sorted(results, key=lambda r: r[1])]
+        # Run whatever hasn't been picked up yet ourselves, starting with the first.
+        for task in tasks:
+            task.run()
+        return [task.result() for task in tasks]
+
+    @staticmethod
+    def execute(lambdas: List[Callable[[], Any]]) -> List[Any]:
+        """
+        Given a list of callables, execute them and return a list of their returns.
+        Guarantees order of return based on order of callable.
+        """
+        return Parallel.__run(lambdas)
 
     @staticmethod
     def map(lam: Callable[[T], Any], params: List[T]) -> List[Any]:
@@ -38,19 +108,7 @@ class Parallel:
         of params in the list and returns a list of their returns. Guarantees order
         of return.
         """
-
-        if len(params) == 0:
-            return []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(params)) as executor:
-            futures = {executor.submit(lam, params[pos]): pos for pos in range(len(params))}
-            results = []  # List: Tuple[Any, int]
-
-            for future in concurrent.futures.as_completed(futures):
-                pos = futures[future]
-                data = future.result()
-                results.append((data, pos))
-
-            return [r[0] for r in sorted(results, key=lambda r: r[1])]
+        return Parallel.__run([functools.partial(lam, param) for param in params])
 
     @staticmethod
     def call(lambdas: 'List[Callable[..., Any]]', *params: Any) -> List[Any]:
@@ -60,19 +118,7 @@ class Parallel:
         callables in parallel. Returns a list of returns, garanteed to be in the
         same order as the lambdas.
         """
-
-        if len(lambdas) == 0:
-            return []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(lambdas)) as executor:
-            futures = {executor.submit(lambdas[pos], *params): pos for pos in range(len(lambdas))}
-            results = []  # List: Tuple[Any, int]
-
-            for future in concurrent.futures.as_completed(futures):
-                pos = futures[future]
-                data = future.result()
-                results.append((data, pos))
-
-            return [r[0] for r in sorted(results, key=lambda r: r[1])]
+        return Parallel.__run([functools.partial(call, *params) for call in lambdas])
 
     @staticmethod
     def flatten(lists: List[List[Any]]) -> List[Any]:
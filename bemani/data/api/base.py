@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from bemani.data.api.client import APIClient
 from bemani.data.interfaces import APIProviderInterface
@@ -8,12 +8,19 @@ class BaseGlobalData:
 
     def __init__(self, api: APIProviderInterface) -> None:
         self.__localapi = api
-        self.__apiclients: Optional[List[APIClient]] = None
+        self.__apiservers: Optional[List[Tuple[int, APIClient]]] = None
 
     @property
-    def clients(self) -> List[APIClient]:
-        if self.__apiclients is None:
+    def servers(self) -> List[Tuple[int, APIClient]]:
+        if self.__apiservers is None:
             servers = self.__localapi.get_all_servers()
-            self.__apiclients = [APIClient(server.uri, server.token, server.allow_stats, server.allow_scores) for server in servers]
+            self.__apiservers = [
+                (server.id, APIClient(server.uri, server.token, server.allow_stats, server.allow_scores))
+                for server in servers
+            ]
+
+        return self.__apiservers
 
-        return self.__apiclients
+    @property
+    def clients(self) -> List[APIClient]:
+        return [client for (_, client) in self.servers]
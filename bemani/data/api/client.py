@@ -1,8 +1,12 @@
 import json
 import requests
-from typing import Tuple, Dict, List, Any, Optional
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from typing import Final, Tuple, Dict, List, Any, Optional
 
-from bemani.common import GameConstants, VersionConstants, DBConstants, ValidatedDict
+from bemani.common import GameConstants, VersionConstants, DBConstants, Parallel, ValidatedDict
+from bemani.data.mysql.base import DataCache
 
 
 class APIException(Exception):
@@ -29,6 +33,47 @@ class RemoteServerErrorAPIException(APIException):
     pass
 
 
+class _RemoteServer:
+    """
+    Connection state shared by every client talking to the same remote server. This
+    keeps a pool of open connections around between requests, and tracks failures
+    so that a server which is down is skipped instead of costing every request a
+    full timeout.
+    """
+
+    # Number of consecutive failures before we stop talking to a server for a while.
+    FAILURE_THRESHOLD = 3
+
+    # Number of seconds to leave a failing server alone before trying it again.
+    RETRY_INTERVAL = 60.0
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Parallel.MAX_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__retry_at = 0.0
+
+    def available(self) -> bool:
+        """
+        Returns whether a request should be attempted against this server.
+        """
+        with self.__lock:
+            return self.__failures < self.FAILURE_THRESHOLD or time.monotonic() >= self.__retry_at
+
+    def succeeded(self) -> None:
+        with self.__lock:
+            self.__failures = 0
+
+    def failed(self) -> None:
+        with self.__lock:
+            self.__failures += 1
+            if self.__failures >= self.FAILURE_THRESHOLD:
+                self.__retry_at = time.monotonic() + self.RETRY_INTERVAL
+
+
 class APIClient:
     """
     A client that fully speaks BEMAPI and can pull information from a remote server.
@@ -36,12 +81,43 @@ class APIClient:
 
     API_VERSION = 'v1'
 
+    # Number of seconds to wait for a connection to a remote server.
+    CONNECT_TIMEOUT = 3.0
+
+    # Number of seconds to wait for a response from a remote server, by the type of
+    # object requested. Catalogs are large and only fetched when bootstrapping, while
+    # everything else is fetched during game requests which a cabinet is waiting on.
+    READ_TIMEOUTS: Final[Dict[str, float]] = {
+        'server': 5.0,
+        'profile': 5.0,
+        'records': 5.0,
+        'statistics': 5.0,
+        'catalog': 60.0,
+    }
+
+    # Responses that many requests ask for and that don't need to be up to the second
+    # are kept around for a short while. The cache is shared between clients, since
+    # a new client is created for every request.
+    CATALOG_CACHE: Final[DataCache] = DataCache('api_catalog', size=64, ttl=300.0)
+    STATISTICS_CACHE: Final[DataCache] = DataCache('api_statistics', size=256, ttl=60.0)
+    RECORDS_CACHE: Final[DataCache] = DataCache('api_records', size=256, ttl=10.0)
+
+    __servers: Dict[str, _RemoteServer] = {}
+    __servers_lock = threading.Lock()
+
     def __init__(self, base_uri: str, token: str, allow_stats: bool, allow_scores: bool) -> None:
         self.base_uri = base_uri
         self.token = token
         self.allow_stats = allow_stats
         self.allow_scores = allow_scores
 
+    @property
+    def __server(self) -> _RemoteServer:
+        with APIClient.__servers_lock:
+            if self.base_uri not in APIClient.__servers:
+                APIClient.__servers[self.base_uri] = _RemoteServer()
+            return APIClient.__servers[self.base_uri]
+
     def _content_type_valid(self, content_type: str) -> bool:
         if ';' in content_type:
             left, right = content_type.split(';', 1)
@@ -58,7 +134,13 @@ class APIClient:
                     return True
         return False
 
-    def __exchange_data(self, request_uri: str, request_args: Dict[str, Any]) -> Dict[str, Any]:
+    def __exchange_data(
+        self,
+        request_uri: str,
+        request_args: Dict[str, Any],
+        objecttype: str,
+        cache: Optional[DataCache]=None,
+    ) -> Dict[str, Any]:
         if self.base_uri[-1:] != '/':
             uri = f'{self.base_uri}/{request_uri}'
         else:
@@ -68,29 +150,50 @@ class APIClient:
             'Authorization': f'Token {self.token}',
             'Content-Type': 'application/json; charset=utf-8',
         }
-        data = json.dumps(request_args).encode('utf8')
+        data = json.dumps(request_args, sort_keys=True).encode('utf8')
+
+        cachekey = (uri, self.token, data)
+        if cache is not None:
+            found, jsondata = cache.get(cachekey)
+            if found:
+                return jsondata
+
+        server = self.__server
+        if not server.available():
+            raise APIException('Remote server is failing, not querying it for now!')
 
         try:
-            r = requests.request(
+            r = server.session.request(
                 'GET',
                 uri,
                 headers=headers,
                 data=data,
                 allow_redirects=False,
-                timeout=10,
+                timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUTS[objecttype]),
             )
         except Exception:
+            server.failed()
             raise APIException('Failed to query remote server!')
 
         # Verify that content type is in the form of "application/json; charset=utf-8".
         if not self._content_type_valid(r.headers['content-type']):
+            server.failed()
             raise APIException(f'API returned invalid content type \'{r.headers["content-type"]}\'!')
 
         jsondata = r.json()
 
         if r.status_code == 200:
+            server.succeeded()
+            if cache is not None:
+                cache.put(cachekey, jsondata)
             return jsondata
 
+        # The server is up and talking to us, even if it didn't like the request.
+        if r.status_code == 500:
+            server.failed()
+        else:
+            server.succeeded()
+
         if 'error' not in jsondata:
             raise APIException(f'API returned error code {r.status_code} but did not include \'error\' attribute in response JSON!')
         error = jsondata['error']
@@ -193,7 +296,7 @@ class APIClient:
         return (servergame, serverversion)
 
     def get_server_info(self) -> ValidatedDict:
-        resp = self.__exchange_data('', {})
+        resp = self.__exchange_data('', {}, 'server')
         return ValidatedDict({
             'name': resp['name'],
             'email': resp['email'],
@@ -214,6 +317,7 @@ class APIClient:
                     'type': idtype,
                     'objects': ['profile'],
                 },
+                'profile',
             )
             return resp['profile']
         except APIException:
@@ -247,6 +351,8 @@ class APIClient:
             resp = self.__exchange_data(
                 f'{self.API_VERSION}/{servergame}/{serverversion}',
                 data,
+                'records',
+                APIClient.RECORDS_CACHE,
             )
             return resp['records']
         except APIException:
@@ -267,6 +373,8 @@ class APIClient:
                     'type': idtype,
                     'objects': ['statistics'],
                 },
+                'statistics',
+                APIClient.STATISTICS_CACHE,
             )
             return resp['statistics']
         except APIException:
@@ -285,6 +393,8 @@ class APIClient:
                     'type': 'server',
                     'objects': ['catalog'],
                 },
+                'catalog',
+                APIClient.CATALOG_CACHE,
             )
             return resp['catalog']
         except APIException:
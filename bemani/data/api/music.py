@@ -1,8 +1,10 @@
+import functools
 from typing import List, Optional, Dict, Any, Tuple, Set
 
 from bemani.common import APIConstants, GameConstants, VersionConstants, DBConstants, Parallel
 from bemani.data.interfaces import APIProviderInterface
 from bemani.data.api.base import BaseGlobalData
+from bemani.data.mysql.api import APIData
 from bemani.data.mysql.user import UserData
 from bemani.data.mysql.music import MusicData
 from bemani.data.remoteuser import RemoteUser
@@ -11,10 +13,17 @@ from bemani.data.types import UserID, Score, Song
 
 class GlobalMusicData(BaseGlobalData):
 
-    def __init__(self, api: APIProviderInterface, user: UserData, music: MusicData) -> None:
+    def __init__(
+        self,
+        api: APIProviderInterface,
+        user: UserData,
+        music: MusicData,
+        mirror: Optional[APIData]=None,
+    ) -> None:
         super().__init__(api)
         self.user = user
         self.music = music
+        self.mirror = mirror
 
     def __get_cardids(self, userid: UserID) -> List[str]:
         if RemoteUser.is_remote(userid):
@@ -22,6 +31,74 @@ class GlobalMusicData(BaseGlobalData):
         else:
             return self.user.get_cards(userid)
 
+    def __get_remote_records(
+        self,
+        game: str,
+        version: int,
+        idtype: str,
+        ids: List[Any],
+        since: Optional[int]=None,
+        until: Optional[int]=None,
+    ) -> List[Dict[str, Any]]:
+        if self.mirror is None:
+            return Parallel.flatten(Parallel.call(
+                [client.get_records for client in self.clients],
+                game,
+                version,
+                idtype,
+                ids,
+                since,
+                until,
+            ))
+
+        # Serve out of our local copy of remote records instead of waiting on
+        # every remote server. The copy is kept fresh by refresh_remote_scores().
+        serverids = [serverid for (serverid, client) in self.servers if client.allow_scores]
+        if idtype == APIConstants.ID_TYPE_INSTANCE:
+            songid, songchart, cardid = ids
+            return self.mirror.get_remote_records(
+                serverids, game, version, songid=songid, songchart=songchart, cards=[cardid], since=since, until=until,
+            )
+        if idtype == APIConstants.ID_TYPE_CARD:
+            return self.mirror.get_remote_records(serverids, game, version, cards=ids, since=since, until=until)
+        if idtype == APIConstants.ID_TYPE_SONG:
+            songid = ids[0]
+            songchart = ids[1] if len(ids) > 1 else None
+            return self.mirror.get_remote_records(
+                serverids, game, version, songid=songid, songchart=songchart, since=since, until=until,
+            )
+        return self.mirror.get_remote_records(serverids, game, version, since=since, until=until)
+
+    def refresh_remote_scores(self, game: str, version: int) -> int:
+        """
+        Fetch any records that changed on remote servers since we last fetched
+        them and update our local copy of them.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+
+        Returns:
+            The number of records that were fetched.
+        """
+        mirror = self.mirror
+        if mirror is None:
+            # Nowhere to keep a copy of remote records.
+            return 0
+
+        servers = [(serverid, client) for (serverid, client) in self.servers if client.allow_scores]
+        cursors = [mirror.get_remote_records_cursor(serverid, game, version) for (serverid, _) in servers]
+        records = Parallel.execute(
+            [
+                functools.partial(client.get_records, game, version, APIConstants.ID_TYPE_SERVER, [], cursor)
+                for ((_, client), cursor) in zip(servers, cursors)
+            ],
+        )
+
+        for (serverid, _), serverrecords in zip(servers, records):
+            mirror.put_remote_records(serverid, game, version, serverrecords)
+        return sum(len(serverrecords) for serverrecords in records)
+
     def __min(self, int1: int, int2: int) -> int:
         # -1 is used as a 'no value' so it should not overwrite a 0
         if int1 == -1:
@@ -457,14 +534,13 @@ class GlobalMusicData(BaseGlobalData):
 
     def get_score(self, game: str, version: int, userid: UserID, songid: int, songchart: int) -> Optional[Score]:
         # Helper function so we can iterate over all servers for a single card
-        def get_scores_for_card(cardid: str) -> List[Score]:
-            return Parallel.flatten(Parallel.call(
-                [client.get_records for client in self.clients],
+        def get_scores_for_card(cardid: str) -> List[Dict[str, Any]]:
+            return self.__get_remote_records(
                 game,
                 version,
                 APIConstants.ID_TYPE_INSTANCE,
                 [songid, songchart, cardid],
-            ))
+            )
 
         relevant_cards = self.__get_cardids(userid)
         if RemoteUser.is_remote(userid):
@@ -513,28 +589,26 @@ class GlobalMusicData(BaseGlobalData):
         relevant_cards = self.__get_cardids(userid)
         if RemoteUser.is_remote(userid):
             # No need to look up local score for this user
-            scores = Parallel.flatten(Parallel.call(
-                [client.get_records for client in self.clients],
+            scores = self.__get_remote_records(
                 game,
                 version,
                 APIConstants.ID_TYPE_CARD,
                 relevant_cards,
                 since,
                 until,
-            ))
+            )
             localscores: List[Score] = []
         else:
             localscores, scores = Parallel.execute([
                 lambda: self.music.get_scores(game, version, userid, since, until),
-                lambda: Parallel.flatten(Parallel.call(
-                    [client.get_records for client in self.clients],
+                lambda: self.__get_remote_records(
                     game,
                     version,
                     APIConstants.ID_TYPE_CARD,
                     relevant_cards,
                     since,
                     until,
-                )),
+                ),
             ])
 
         allscores: Dict[int, Dict[int, Score]] = {}
@@ -657,19 +731,60 @@ class GlobalMusicData(BaseGlobalData):
         localcards, localscores, remotescores = Parallel.execute([
             self.user.get_all_cards,
             lambda: self.music.get_all_scores(game, version, userid, songid, songchart, since, until),
-            lambda: Parallel.flatten(Parallel.call(
-                [client.get_records for client in self.clients],
+            lambda: self.__get_remote_records(
                 game,
                 version,
                 APIConstants.ID_TYPE_SONG,
                 songkey,
                 since,
                 until,
-            )),
+            ),
         ])
 
         return self.__merge_global_scores(game, version, localcards, localscores, remotescores)
 
+    def __get_sorted_scores(self, game: str, version: int, songid: int, songchart: int) -> List[Tuple[UserID, Score]]:
+        return sorted(
+            self.get_all_scores(game=game, version=version, songid=songid, songchart=songchart),
+            key=lambda s: (s[1].points, s[1].timestamp),
+            reverse=True,
+        )
+
+    def get_leaderboard_rank(
+        self,
+        game: str,
+        version: int,
+        userid: UserID,
+        songid: int,
+        songchart: int,
+    ) -> Optional[int]:
+        # If nobody shares scores with us, the local leaderboard is the whole leaderboard
+        if not any(client.allow_scores for client in self.clients):
+            return self.music.get_leaderboard_rank(game, version, userid, songid, songchart)
+
+        for i, (uid, _) in enumerate(self.__get_sorted_scores(game, version, songid, songchart)):
+            if uid == userid:
+                return i
+        return None
+
+    def get_leaderboard(
+        self,
+        game: str,
+        version: int,
+        songid: int,
+        songchart: int,
+        offset: int=0,
+        limit: Optional[int]=None,
+    ) -> List[Tuple[UserID, Score]]:
+        # If nobody shares scores with us, the local leaderboard is the whole leaderboard
+        if not any(client.allow_scores for client in self.clients):
+            return self.music.get_leaderboard(game, version, songid, songchart, offset, limit)
+
+        scores = self.__get_sorted_scores(game, version, songid, songchart)[offset:]
+        if limit is not None:
+            scores = scores[:limit]
+        return scores
+
     def get_all_records(
         self,
         game: str,
@@ -689,13 +804,12 @@ class GlobalMusicData(BaseGlobalData):
         localcards, localscores, remotescores = Parallel.execute([
             self.user.get_all_cards,
             lambda: self.music.get_all_records(game, version, userlist, locationlist),
-            lambda: Parallel.flatten(Parallel.call(
-                [client.get_records for client in self.clients],
+            lambda: self.__get_remote_records(
                 game,
                 version,
                 APIConstants.ID_TYPE_SERVER,
                 [],
-            )),
+            ),
         ])
 
         return self.__merge_global_scores(game, version, localcards, localscores, remotescores)
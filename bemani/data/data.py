@@ -63,6 +63,7 @@ class GlobalProvider:
     def __init__(
         self,
         local: LocalProvider,
+        mirror: bool=False,
     ) -> None:
         self.user = GlobalUserData(
             local.api,
@@ -72,6 +73,7 @@ class GlobalProvider:
             local.api,
             local.user,
             local.music,
+            local.api if mirror else None,
         )
         self.game = GlobalGameData(
             local.api,
@@ -117,7 +119,7 @@ class Data:
             self.__lobby,
             self.__api,
         )
-        self.remote = GlobalProvider(self.local)
+        self.remote = GlobalProvider(self.local, config.get('mirror_remote_scores', False))
 
     @classmethod
     def sqlalchemy_url(cls, config: Dict[str, Any]) -> str:
@@ -128,6 +130,9 @@ class Data:
         return create_engine(
             Data.sqlalchemy_url(config),
             pool_recycle=3600,
+            pool_size=config['database'].get('pool_size', 5),
+            max_overflow=config['database'].get('max_overflow', 10),
+            pool_pre_ping=config['database'].get('pool_pre_ping', False),
         )
 
     def __exists(self) -> bool:
@@ -204,6 +209,20 @@ class Data:
             'head',
         )
 
+    def release(self) -> None:
+        """
+        Release the current thread's DB connection back to the pool, leaving this
+        object usable for the next request. This allows long-lived processes to
+        create a single Data object and release it at the end of every request
+        instead of creating and closing a new one each time.
+        """
+        if self.__session is not None:
+            self.__session.remove()
+
+        # Remote servers are looked up once and remembered, so start fresh in
+        # case they were changed while we were handling the last request.
+        self.remote = GlobalProvider(self.local, self.__config.get('mirror_remote_scores', False))
+
     def close(self) -> None:
         """
         Close any open data connection.
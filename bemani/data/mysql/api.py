@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Table, Column  # type: ignore
-from sqlalchemy.types import String, Integer  # type: ignore
+from sqlalchemy import Table, Column, Index, UniqueConstraint  # type: ignore
+from sqlalchemy.types import String, Integer, JSON  # type: ignore
 from typing import Any, Dict, List, Optional
 
 from bemani.common import Time
@@ -37,6 +37,29 @@ server = Table(
     mysql_charset='utf8mb4',
 )
 
+"""
+Table for storing a local copy of high scores from remote servers, as returned
+by their records API, so that they can be looked up without waiting on those
+servers. Each record is stored under the first of its cards, which is also how
+remote scores are attributed to users when they are merged with local ones.
+"""
+remote_record = Table(
+    'remote_record',
+    metadata,
+    Column('serverid', Integer, nullable=False),
+    Column('game', String(32), nullable=False),
+    Column('version', Integer, nullable=False),
+    Column('songid', Integer, nullable=False),
+    Column('chart', Integer, nullable=False),
+    Column('card', String(16), nullable=False),
+    Column('update', Integer, nullable=False),
+    Column('data', JSON, nullable=False),
+    UniqueConstraint('serverid', 'game', 'version', 'songid', 'chart', 'card', name='serverid_game_version_songid_chart_card'),
+    Index('game_version_songid_chart', 'game', 'version', 'songid', 'chart'),
+    Index('game_version_card', 'game', 'version', 'card'),
+    mysql_charset='utf8mb4',
+)
+
 
 class APIData(APIProviderInterface, BaseData):
 
@@ -234,3 +257,119 @@ class APIData(APIProviderInterface, BaseData):
         """
         sql = "DELETE FROM server WHERE id = :id LIMIT 1"
         self.execute(sql, {'id': serverid})
+        sql = "DELETE FROM remote_record WHERE serverid = :id"
+        self.execute(sql, {'id': serverid})
+
+    def get_remote_records_cursor(self, serverid: int, game: str, version: int) -> Optional[int]:
+        """
+        Given a server ID and a game/version, look up the newest update time of any
+        record we have a copy of, so that only newer records need to be fetched.
+
+        Parameters:
+            serverid - Integer specifying server ID.
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+
+        Returns:
+            The newest update timestamp, or None if we have no records.
+        """
+        sql = (
+            "SELECT MAX(`update`) AS `update` FROM remote_record " +
+            "WHERE serverid = :serverid AND game = :game AND version = :version"
+        )
+        cursor = self.execute(sql, {'serverid': serverid, 'game': game, 'version': version})
+        result = cursor.fetchone()
+        return result['update'] if result is not None else None
+
+    def put_remote_records(self, serverid: int, game: str, version: int, records: List[Dict[str, Any]]) -> None:
+        """
+        Given a server ID and a game/version, save a copy of records returned by that
+        server, replacing any older copy of the same records.
+
+        Parameters:
+            serverid - Integer specifying server ID.
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            records - A list of records exactly as returned by the remote server.
+        """
+        rows = []
+        for record in records:
+            cards = sorted([card.upper() for card in record.get('cards', [])])
+            if len(cards) == 0:
+                continue
+            rows.append({
+                'songid': int(record['song']),
+                'chart': int(record['chart']),
+                'card': cards[0],
+                'update': int(max(record.get('timestamp', -1), record.get('updated', -1))),
+                'data': self.serialize(record),
+            })
+
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            params: Dict[str, Any] = {'serverid': serverid, 'game': game, 'version': version}
+            values = []
+            for i, row in enumerate(rows[start:(start + self.BATCH_SIZE)]):
+                values.append(f"(:serverid, :game, :version, :songid{i}, :chart{i}, :card{i}, :update{i}, :data{i})")
+                for key, value in row.items():
+                    params[f'{key}{i}'] = value
+            sql = (
+                "INSERT INTO remote_record (serverid, game, version, songid, chart, card, `update`, data) " +
+                f"VALUES {', '.join(values)} " +
+                "ON DUPLICATE KEY UPDATE `update` = VALUES(`update`), data = VALUES(data)"
+            )
+            self.execute(sql, params)
+
+    def get_remote_records(
+        self,
+        serverids: List[int],
+        game: str,
+        version: int,
+        songid: Optional[int]=None,
+        songchart: Optional[int]=None,
+        cards: Optional[List[str]]=None,
+        since: Optional[int]=None,
+        until: Optional[int]=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Given some server IDs and a game/version, look up our copy of records from
+        those servers, optionally limited to a song, chart, set of cards or time range.
+
+        Parameters:
+            serverids - List of integers specifying server IDs.
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            songid - Optional song ID according to the game.
+            songchart - Optional chart number according to the game.
+            cards - Optional list of card IDs the records must belong to.
+            since - Optional timestamp, only records updated at or after this are returned.
+            until - Optional timestamp, only records updated before this are returned.
+
+        Returns:
+            A list of records exactly as returned by the remote servers.
+        """
+        if not serverids or (cards is not None and not cards):
+            return []
+
+        sql = (
+            "SELECT data FROM remote_record WHERE game = :game AND version = :version AND " +
+            f"serverid IN ({','.join(str(int(serverid)) for serverid in serverids)})"
+        )
+        params: Dict[str, Any] = {'game': game, 'version': version}
+        if songid is not None:
+            sql += " AND songid = :songid"
+            params['songid'] = songid
+        if songchart is not None:
+            sql += " AND chart = :chart"
+            params['chart'] = songchart
+        if cards is not None:
+            sql += f" AND card IN ({', '.join(f':card{i}' for i in range(len(cards)))})"
+            for i, card in enumerate(cards):
+                params[f'card{i}'] = card.upper()
+        if since is not None:
+            sql += " AND `update` >= :since"
+            params['since'] = since
+        if until is not None:
+            sql += " AND `update` < :until"
+            params['until'] = until
+        cursor = self.execute(sql, params)
+        return [self.deserialize(result['data']) for result in cursor.fetchall()]
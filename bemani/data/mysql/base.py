@@ -1,6 +1,12 @@
+import base64
+import copy
 import json
 import random
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Hashable, Iterator, Optional, Tuple, TypeVar
 
 from bemani.common import Time
 
@@ -10,6 +16,13 @@ from sqlalchemy.sql import text  # type: ignore
 from sqlalchemy.types import String, Integer  # type: ignore
 from sqlalchemy import Table, Column, MetaData  # type: ignore
 
+try:
+    # If the faster JSON library is installed, we can use it instead!
+    import orjson  # type: ignore
+except ImportError:
+    # If not, then fall back to the standard library for everything.
+    orjson = None
+
 metadata = MetaData()
 
 """
@@ -26,19 +39,124 @@ session = Table(
     mysql_charset='utf8mb4',
 )
 
+"""
+Table for storing version counters for caches of DB objects. Whenever an object
+that may be cached is modified, its counter is incremented so that other processes
+know to drop their cached copies.
+"""
+cache_version = Table(
+    'cache_version',
+    metadata,
+    Column('name', String(32), nullable=False, primary_key=True),
+    Column('version', Integer, nullable=False),
+    mysql_charset='utf8mb4',
+)
+
+T = TypeVar('T')
+
+
+class DataCache:
+    """
+    A bounded, process-wide cache of objects looked up from the DB. Entries expire
+    after a short time, and the whole cache is dropped whenever the matching counter
+    in the cache_version table changes, so that edits made in another process (such
+    as the frontend) apply promptly. Objects are copied going in and out unless asked
+    otherwise, so callers are free to modify what they get back.
+    """
+
+    def __init__(self, name: str, size: int=1024, ttl: float=60.0, poll_interval: float=1.0, copy: bool=True) -> None:
+        """
+        Initialize the cache.
+
+        Parameters:
+            name - Name of the counter in the cache_version table for this cache.
+            size - Maximum number of objects to keep, least recently used are dropped first.
+            ttl - Number of seconds an object can be cached before it is looked up again.
+            poll_interval - Number of seconds between checks of the version counter.
+            copy - Whether to copy objects going in and out. Only disable this for
+                   objects that are never modified once looked up.
+        """
+        self.name = name
+        self.copy = copy
+        self.size = size
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.__lock = threading.Lock()
+        self.__entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self.__version: Optional[int] = None
+        self.__polled: Optional[float] = None
+
+    def needs_poll(self) -> bool:
+        """
+        Returns whether the version counter should be checked before trusting the cache.
+        """
+        polled = self.__polled
+        return polled is None or (time.monotonic() - polled) >= self.poll_interval
+
+    def set_version(self, version: int) -> None:
+        """
+        Record the current version counter, dropping everything if it has changed.
+        """
+        with self.__lock:
+            if version != self.__version:
+                self.__entries.clear()
+                self.__version = version
+            self.__polled = time.monotonic()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up an object by key.
+
+        Returns:
+            A tuple of whether the object was found, and a copy of the object itself.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return (False, None)
+            if entry[0] <= time.monotonic():
+                del self.__entries[key]
+                return (False, None)
+            self.__entries.move_to_end(key)
+            return (True, copy.deepcopy(entry[1]) if self.copy else entry[1])
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache an object by key, evicting the least recently used object if we are full.
+        """
+        if self.copy:
+            value = copy.deepcopy(value)
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable]=None) -> None:
+        """
+        Drop a single object by key, or everything if no key is given.
+        """
+        with self.__lock:
+            if key is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(key, None)
+
 
-class _BytesEncoder(json.JSONEncoder):
-    def default(self, obj: Any) -> Any:
-        if isinstance(obj, bytes):
-            # We're abusing lists here, we have a mixed type
-            return ['__bytes__'] + [b for b in obj]  # type: ignore
-        return json.JSONEncoder.default(self, obj)
+def _encode_bytes(obj: Any) -> Any:
+    if isinstance(obj, bytes):
+        # Bytes are stored as base64 under a marker key, since JSON has no binary type.
+        return {'__bytes64__': base64.b64encode(obj).decode('ascii')}
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
 
 
 class BaseData:
 
     SESSION_LENGTH = 32
 
+    # Maximum number of IDs to place in a single IN clause when looking things up in bulk.
+    BATCH_SIZE = 500
+
     def __init__(self, config: Dict[str, Any], conn: Connection) -> None:
         """
         Initialize any DB singleton.
@@ -79,11 +197,27 @@ class BaseData:
             params if params is not None else {},
         )
 
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Group every statement executed within this context into a single transaction,
+        so that they are committed together, or not at all if an exception is raised.
+        """
+        with self.__conn.begin():
+            yield
+
     def serialize(self, data: Dict[str, Any]) -> str:
         """
         Given an arbitrary dict, serialize it to JSON.
         """
-        return json.dumps(data, cls=_BytesEncoder)
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=_encode_bytes, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except orjson.JSONEncodeError:
+                # Anything the faster library refuses, such as integers wider than 64
+                # bits, is left for the standard library to have a go at.
+                pass
+        return json.dumps(data, default=_encode_bytes)
 
     def deserialize(self, data: Optional[str]) -> Dict[str, Any]:
         """
@@ -92,8 +226,17 @@ class BaseData:
         if data is None:
             return {}
 
+        loaded = orjson.loads(data) if orjson is not None else json.loads(data)
+        if '"__bytes' not in data:
+            # Nothing was serialized as bytes, so there's nothing to fix up.
+            return loaded
+
         def fix(jd: Any) -> Any:
             if type(jd) == dict:
+                if len(jd) == 1 and '__bytes64__' in jd:
+                    # This is a serialized bytestring
+                    return base64.b64decode(jd['__bytes64__'])
+
                 # Fix each element in the dictionary.
                 for key in jd:
                     jd[key] = fix(jd[key])
@@ -102,7 +245,8 @@ class BaseData:
             if type(jd) == list:
                 # Could be serialized by us, could be a normal list.
                 if len(jd) >= 1 and jd[0] == '__bytes__':
-                    # This is a serialized bytestring
+                    # This is a bytestring serialized before we switched to base64,
+                    # it will be rewritten in the new format next time it is saved.
                     return bytes(jd[1:])
 
                 # Possibly one of these is a dictionary/list/serialized.
@@ -113,7 +257,49 @@ class BaseData:
             # Normal value, its deserialized version is itself.
             return jd
 
-        return fix(json.loads(data))
+        return fix(loaded)
+
+    def _cached(self, cache: DataCache, key: Hashable, lookup: Callable[[], T]) -> T:
+        """
+        Look up an object through a cache, calling lookup to fetch it from the DB if
+        it isn't cached or is no longer fresh.
+
+        Parameters:
+            cache - The DataCache to look in.
+            key - Any hashable key that identifies the object in the cache.
+            lookup - A function which returns the object from the DB.
+
+        Returns:
+            The object, or a copy of it if it came from the cache.
+        """
+        if cache.needs_poll():
+            sql = "SELECT version FROM cache_version WHERE name = :name"
+            cursor = self.execute(sql, {'name': cache.name})
+            cache.set_version(cursor.fetchone()['version'] if cursor.rowcount == 1 else 0)
+
+        found, value = cache.get(key)
+        if found:
+            return value
+
+        value = lookup()
+        cache.put(key, value)
+        return value
+
+    def _invalidate(self, cache: DataCache, key: Optional[Hashable]=None) -> None:
+        """
+        Drop an object from a cache after it was modified, and bump the version counter
+        for the cache so that other processes drop everything they have cached as well.
+
+        Parameters:
+            cache - The DataCache that might hold the object.
+            key - The key of the modified object, or None to drop everything.
+        """
+        cache.invalidate(key)
+        sql = (
+            "INSERT INTO cache_version (name, version) VALUES (:name, 1) " +
+            "ON DUPLICATE KEY UPDATE version = version + 1"
+        )
+        self.execute(sql, {'name': cache.name}, safe_write_operation=True)
 
     def _from_session(self, session: str, sesstype: str) -> Optional[int]:
         """
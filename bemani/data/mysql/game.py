@@ -100,6 +100,28 @@ class GameData(BaseData):
         result = cursor.fetchone()
         return ValidatedDict(self.deserialize(result['data']))
 
+    def get_settings_for_users(self, game: str, userids: List[UserID]) -> Dict[UserID, ValidatedDict]:
+        """
+        Given a game and a list of user IDs, look up game-wide settings for each user in bulk.
+
+        Parameters:
+            game - String identifying a game series.
+            userids - List of integers identifying users, as possibly looked up by UserData.
+
+        Returns:
+            A dictionary keyed by user ID of the game settings stored by a game class. Users
+            without any settings for this game are omitted.
+        """
+        settings: Dict[UserID, ValidatedDict] = {}
+        unique_userids = list(set(userids))
+        for i in range(0, len(unique_userids), BaseData.BATCH_SIZE):
+            batch = unique_userids[i:(i + BaseData.BATCH_SIZE)]
+            sql = f"SELECT userid, data FROM game_settings WHERE game = :game AND userid IN ({','.join(str(int(userid)) for userid in batch)})"
+            cursor = self.execute(sql, {'game': game})
+            for result in cursor.fetchall():
+                settings[UserID(result['userid'])] = ValidatedDict(self.deserialize(result['data']))
+        return settings
+
     def put_settings(self, game: str, userid: UserID, settings: Dict[str, Any]) -> None:
         """
         Given a game and a user ID, save game-wide settings to the DB.
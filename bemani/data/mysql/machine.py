@@ -1,10 +1,10 @@
 from sqlalchemy import Table, Column, UniqueConstraint  # type: ignore
 from sqlalchemy.types import String, Integer, JSON  # type: ignore
 from sqlalchemy.dialects.mysql import BIGINT as BigInteger  # type: ignore
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, Final, List, Tuple, Any
 
 from bemani.common import ValidatedDict
-from bemani.data.mysql.base import BaseData, metadata
+from bemani.data.mysql.base import BaseData, DataCache, metadata
 from bemani.data.types import Machine, Arcade, UserID, ArcadeID
 
 """
@@ -79,6 +79,11 @@ class ArcadeCreationException(Exception):
 
 class MachineData(BaseData):
 
+    # Machines and arcades are looked up on nearly every request from a game, but
+    # are rarely modified, so keep them around instead of querying every time.
+    MACHINE_CACHE: Final[DataCache] = DataCache('machine')
+    ARCADE_CACHE: Final[DataCache] = DataCache('arcade')
+
     def from_port(self, port: int) -> Optional[str]:
         """
         Given a port, look up the PCBID attached to that port.
@@ -158,6 +163,9 @@ class MachineData(BaseData):
         Returns:
             A Machine object representing a machine, or None if not found.
         """
+        return self._cached(MachineData.MACHINE_CACHE, pcbid, lambda: self.__get_machine(pcbid))
+
+    def __get_machine(self, pcbid: str) -> Optional[Machine]:
         sql = "SELECT name, description, arcadeid, id, port, game, version, data FROM machine WHERE pcbid = :pcbid"
         cursor = self.execute(sql, {'pcbid': pcbid})
         if cursor.rowcount != 1:
@@ -230,6 +238,7 @@ class MachineData(BaseData):
                 'data': self.serialize(machine.data)
             },
         )
+        self._invalidate(MachineData.MACHINE_CACHE, machine.pcbid)
 
     def create_machine(self, pcbid: str, name: str='なし', description: str='', arcade: Optional[ArcadeID]=None) -> Machine:
         """
@@ -274,6 +283,8 @@ class MachineData(BaseData):
                 # Failed to add machine, try with new port
                 continue
 
+            # We might have cached that this machine didn't exist.
+            self._invalidate(MachineData.MACHINE_CACHE, pcbid)
             machine = self.get_machine(pcbid)
             if machine is not None:
                 return machine
@@ -287,6 +298,7 @@ class MachineData(BaseData):
         """
         sql = "DELETE FROM `machine` WHERE pcbid = :pcbid LIMIT 1"
         self.execute(sql, {'pcbid': pcbid})
+        self._invalidate(MachineData.MACHINE_CACHE, pcbid)
 
     def create_arcade(self, name: str, description: str, data: Dict[str, Any], owners: List[UserID]) -> Arcade:
         """
@@ -313,6 +325,7 @@ class MachineData(BaseData):
         for owner in owners:
             sql = "INSERT INTO arcade_owner (userid, arcadeid) VALUES(:userid, :arcadeid)"
             self.execute(sql, {'userid': owner, 'arcadeid': arcadeid})
+        self._invalidate(MachineData.ARCADE_CACHE, arcadeid)
         new_arcade = self.get_arcade(arcadeid)
         if new_arcade is None:
             raise Exception("Failed to create an arcade!")
@@ -328,6 +341,9 @@ class MachineData(BaseData):
         Returns:
             An Arcade object if this arcade was found, or None otherwise.
         """
+        return self._cached(MachineData.ARCADE_CACHE, arcadeid, lambda: self.__get_arcade(arcadeid))
+
+    def __get_arcade(self, arcadeid: ArcadeID) -> Optional[Arcade]:
         sql = (
             "SELECT name, description, pin, data FROM arcade WHERE id = :id"
         )
@@ -378,6 +394,7 @@ class MachineData(BaseData):
         for owner in arcade.owners:
             sql = "INSERT INTO arcade_owner (userid, arcadeid) VALUES(:userid, :arcadeid)"
             self.execute(sql, {'userid': owner, 'arcadeid': arcade.id})
+        self._invalidate(MachineData.ARCADE_CACHE, arcade.id)
 
     def destroy_arcade(self, arcadeid: ArcadeID) -> None:
         """
@@ -393,6 +410,8 @@ class MachineData(BaseData):
         self.execute(sql, {'arcadeid': arcadeid})
         sql = "UPDATE `machine` SET arcadeid = NULL WHERE arcadeid = :arcadeid"
         self.execute(sql, {'arcadeid': arcadeid})
+        self._invalidate(MachineData.ARCADE_CACHE, arcadeid)
+        self._invalidate(MachineData.MACHINE_CACHE)
 
     def get_all_arcades(self) -> List[Arcade]:
         """
@@ -1,12 +1,12 @@
-from sqlalchemy import Table, Column, UniqueConstraint  # type: ignore
+from sqlalchemy import Table, Column, Index, UniqueConstraint  # type: ignore
 from sqlalchemy.exc import IntegrityError  # type: ignore
 from sqlalchemy.types import String, Integer, JSON  # type: ignore
 from sqlalchemy.dialects.mysql import BIGINT as BigInteger  # type: ignore
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, Final, List, Set, Tuple, Any
 
-from bemani.common import Time
+from bemani.common import DBConstants, GameConstants, Time, ValidatedDict
 from bemani.data.exceptions import ScoreSaveException
-from bemani.data.mysql.base import BaseData, metadata
+from bemani.data.mysql.base import BaseData, DataCache, metadata
 from bemani.data.types import Score, Attempt, Song, UserID
 
 """
@@ -17,7 +17,8 @@ ghost, etc.
 
 Note that this is NOT keyed by game song id and chart, but by an internal musicid
 managed by the music table. This is so we can support keeping the same score across
-multiple games, even if the game changes the ID it refers to the song by.
+multiple games, even if the game changes the ID it refers to the song by. The plays
+column mirrors the number of score_history entries for the same userid and musicid.
 """
 score = Table(
     'score',
@@ -29,8 +30,10 @@ score = Table(
     Column('timestamp', Integer, nullable=False, index=True),
     Column('update', Integer, nullable=False, index=True),
     Column('lid', Integer, nullable=False, index=True),
+    Column('plays', Integer, nullable=False, server_default='0'),
     Column('data', JSON, nullable=False),
     UniqueConstraint('userid', 'musicid', name='userid_musicid'),
+    Index('musicid_points_timestamp', 'musicid', 'points', 'timestamp'),
     mysql_charset='utf8mb4',
 )
 
@@ -79,10 +82,74 @@ music = Table(
     mysql_charset='utf8mb4',
 )
 
+"""
+Table for storing running totals of plays, clears and full combos for every musicid,
+so that clear rates don't need to be computed from the whole score_history table.
+Every attempt written to score_history is also counted here. Since a musicid is only
+ever shared between versions of the same game, this is implicitly keyed by game and
+the versions a song appears in, exactly like score_history.
+"""
+music_stats = Table(
+    'music_stats',
+    metadata,
+    Column('musicid', Integer, nullable=False, primary_key=True),
+    Column('plays', Integer, nullable=False),
+    Column('clears', Integer, nullable=False),
+    Column('combos', Integer, nullable=False),
+    Column('points', BigInteger, nullable=False),
+    mysql_charset='utf8mb4',
+)
+
+
+"""
+Table for storing named per-user score totals for a game/version, such as the sum
+of a player's best scores on every chart, for games that rank players by them. These
+are kept up to date by the game as scores are saved, so ranking a player is a count
+over the game/version/name/total index instead of a pass over every score.
+"""
+score_total = Table(
+    'score_total',
+    metadata,
+    Column('game', String(32), nullable=False),
+    Column('version', Integer, nullable=False),
+    Column('userid', BigInteger(unsigned=True), nullable=False),
+    Column('name', String(32), nullable=False),
+    Column('total', BigInteger, nullable=False),
+    UniqueConstraint('game', 'version', 'userid', 'name', name='game_version_userid_name'),
+    Index('game_version_name_total', 'game', 'version', 'name', 'total'),
+    mysql_charset='utf8mb4',
+)
+
 
 class MusicData(BaseData):
 
-    def __get_musicid(self, game: str, version: int, songid: int, songchart: int) -> int:
+    # The music table only changes when read.py imports a catalog, so the mapping of
+    # game songs to music IDs is loaded once per game version and kept around until
+    # the catalog changes. The maps are shared and never modified, so aren't copied.
+    MUSICID_CACHE: Final[DataCache] = DataCache('music', size=64, ttl=3600.0, copy=False)
+
+    # The full catalog for a game version is looked up on boot by many games, so it is
+    # cached the same way and dropped alongside the music IDs when the catalog changes.
+    # Deserializing every chart again is what we're avoiding here, so the songs are
+    # shared between callers and must not be modified.
+    SONG_CACHE: Final[DataCache] = DataCache('music', size=64, ttl=3600.0, copy=False)
+
+    def __get_musicids(self, game: str, version: int) -> Dict[Tuple[int, int], int]:
+        """
+        Given a game/version, look up the unique music ID for every song and chart.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+
+        Returns:
+            A dictionary keyed by songid/chart tuples whose values are music IDs.
+        """
+        sql = "SELECT songid, chart, id FROM music WHERE game = :game AND version = :version"
+        cursor = self.execute(sql, {'game': game, 'version': version})
+        return {(result['songid'], result['chart']): result['id'] for result in cursor.fetchall()}
+
+    def __lookup_musicid(self, game: str, version: int, songid: int, songchart: int) -> Optional[int]:
         """
         Given a game/version/songid/chart, look up the unique music ID for this song.
 
@@ -93,18 +160,147 @@ class MusicData(BaseData):
             songchart - Chart number according to the game.
 
         Returns:
-            Integer representing music ID if found or raises an exception otherwise.
+            Integer representing music ID if found or None otherwise.
         """
+        musicids = self._cached(MusicData.MUSICID_CACHE, (game, version), lambda: self.__get_musicids(game, version))
+        musicid = musicids.get((songid, songchart))
+        if musicid is not None:
+            return musicid
+
+        # The song could have been added after we loaded the catalog, so check for it directly.
         sql = (
             "SELECT id FROM music WHERE songid = :songid AND chart = :chart AND game = :game AND version = :version"
         )
         cursor = self.execute(sql, {'songid': songid, 'chart': songchart, 'game': game, 'version': version})
         if cursor.rowcount != 1:
             # music doesn't exist
-            raise Exception(f'Song {songid} chart {songchart} doesn\'t exist for game {game} version {version}')
+            return None
         result = cursor.fetchone()
         return result['id']
 
+    def __get_musicid(self, game: str, version: int, songid: int, songchart: int) -> int:
+        """
+        Given a game/version/songid/chart, look up the unique music ID for this song.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            songid - ID of the song according to the game.
+            songchart - Chart number according to the game.
+
+        Returns:
+            Integer representing music ID if found or raises an exception otherwise.
+        """
+        musicid = self.__lookup_musicid(game, version, songid, songchart)
+        if musicid is None:
+            raise Exception(f'Song {songid} chart {songchart} doesn\'t exist for game {game} version {version}')
+        return musicid
+
+    def __music_join(self, table: str, version: Optional[int]) -> str:
+        """
+        Given a table keyed by musicid and an optional version, construct a join which makes
+        the game songid and chart of every row available as music.songid and music.chart. If
+        no version is given, the songid and chart from the newest version of the game is used.
+
+        Parameters:
+            table - The name of the table being joined against music.
+            version - Integer representing which version of the game.
+
+        Returns:
+            A SQL fragment expecting a :game parameter and a :version parameter if one is given.
+        """
+        if version is not None:
+            return f"JOIN music ON music.id = {table}.musicid AND music.game = :game AND music.version = :version"
+        return (
+            f"JOIN (SELECT id, MAX(version) AS version FROM music WHERE game = :game GROUP BY id) latest ON latest.id = {table}.musicid " +
+            "JOIN music ON music.id = latest.id AND music.game = :game AND music.version = latest.version"
+        )
+
+    def get_attempt_stats(self, game: str, data: Dict[str, Any]) -> Tuple[bool, bool, bool]:
+        """
+        Given a game and the data stored with a score attempt, classify the attempt for the
+        purpose of clear rate statistics.
+
+        Parameters:
+            game - String representing a game series.
+            data - Data that the game recorded along with the attempt.
+
+        Returns:
+            A tuple of booleans representing whether this attempt counts as a play, a clear
+            and a full combo. An attempt that isn't a play is never a clear or a full combo.
+            Attempts that aren't plays, such as IIDX and SDVX NO PLAY attempts, are left out
+            of clear rate totals and average scores.
+        """
+        attempt = ValidatedDict(data)
+
+        if game == GameConstants.IIDX:
+            play = attempt.get_int('clear_status') != DBConstants.IIDX_CLEAR_STATUS_NO_PLAY
+        elif game == GameConstants.REFLEC_BEAT:
+            play = attempt.get_int('clear_type') != DBConstants.REFLEC_BEAT_CLEAR_TYPE_NO_PLAY
+        elif game == GameConstants.SDVX:
+            play = attempt.get_int('clear_type') != DBConstants.SDVX_CLEAR_TYPE_NO_PLAY
+        else:
+            play = game in [
+                GameConstants.DDR,
+                GameConstants.JUBEAT,
+                GameConstants.MUSECA,
+                GameConstants.POPN_MUSIC,
+            ]
+        if not play:
+            return (False, False, False)
+
+        if game == GameConstants.DDR:
+            clear = attempt.get_int('rank') != DBConstants.DDR_RANK_E
+            combo = attempt.get_int('halo') != DBConstants.DDR_HALO_NONE
+        elif game == GameConstants.IIDX:
+            clear = attempt.get_int('clear_status') != DBConstants.IIDX_CLEAR_STATUS_FAILED
+            combo = attempt.get_int('clear_status') == DBConstants.IIDX_CLEAR_STATUS_FULL_COMBO
+        elif game == GameConstants.JUBEAT:
+            clear = attempt.get_int('medal') != DBConstants.JUBEAT_PLAY_MEDAL_FAILED
+            combo = attempt.get_int('medal') in [
+                DBConstants.JUBEAT_PLAY_MEDAL_FULL_COMBO,
+                DBConstants.JUBEAT_PLAY_MEDAL_NEARLY_EXCELLENT,
+                DBConstants.JUBEAT_PLAY_MEDAL_EXCELLENT,
+            ]
+        elif game == GameConstants.MUSECA:
+            clear = attempt.get_int('clear_type') != DBConstants.MUSECA_CLEAR_TYPE_FAILED
+            combo = attempt.get_int('clear_type') == DBConstants.MUSECA_CLEAR_TYPE_FULL_COMBO
+        elif game == GameConstants.POPN_MUSIC:
+            clear = attempt.get_int('medal') not in [
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_CIRCLE_FAILED,
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_DIAMOND_FAILED,
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_STAR_FAILED,
+            ]
+            combo = attempt.get_int('medal') in [
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_CIRCLE_FULL_COMBO,
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_DIAMOND_FULL_COMBO,
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_STAR_FULL_COMBO,
+                DBConstants.POPN_MUSIC_PLAY_MEDAL_PERFECT,
+            ]
+        elif game == GameConstants.REFLEC_BEAT:
+            clear = attempt.get_int('clear_type') != DBConstants.REFLEC_BEAT_CLEAR_TYPE_FAILED
+            combo = attempt.get_int('combo_type') in [
+                DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO,
+                DBConstants.REFLEC_BEAT_COMBO_TYPE_FULL_COMBO_ALL_JUST,
+            ]
+        elif game == GameConstants.SDVX:
+            clear = (
+                attempt.get_int('grade') != DBConstants.SDVX_GRADE_NO_PLAY and
+                attempt.get_int('clear_type') not in [
+                    DBConstants.SDVX_CLEAR_TYPE_NO_PLAY,
+                    DBConstants.SDVX_CLEAR_TYPE_FAILED,
+                ]
+            )
+            combo = attempt.get_int('clear_type') in [
+                DBConstants.SDVX_CLEAR_TYPE_ULTIMATE_CHAIN,
+                DBConstants.SDVX_CLEAR_TYPE_PERFECT_ULTIMATE_CHAIN,
+            ]
+        else:
+            clear = False
+            combo = False
+
+        return (True, clear, combo)
+
     def put_score(
         self,
         game: str,
@@ -201,28 +397,243 @@ class MusicData(BaseData):
         musicid = self.__get_musicid(game, version, songid, songchart)
         ts = timestamp if timestamp is not None else Time.now()
 
-        # Add to score history
-        sql = (
-            "INSERT INTO `score_history` (userid, musicid, timestamp, lid, new_record, points, data) " +
-            "VALUES (:userid, :musicid, :timestamp, :location, :new_record, :points, :data)"
-        )
-        try:
-            self.execute(
-                sql,
-                {
-                    'userid': userid if userid is not None else 0,
-                    'musicid': musicid,
-                    'timestamp': ts,
-                    'location': location,
-                    'new_record': 1 if new_record else 0,
-                    'points': points,
-                    'data': self.serialize(data),
-                },
+        # Write the history and everything kept in sync with it together, so a failure
+        # part way through can never leave the totals out of step with the history.
+        with self._transaction():
+            # Add to score history
+            sql = (
+                "INSERT INTO `score_history` (userid, musicid, timestamp, lid, new_record, points, data) " +
+                "VALUES (:userid, :musicid, :timestamp, :location, :new_record, :points, :data)"
             )
-        except IntegrityError:
-            raise ScoreSaveException(
-                f'There is already an attempt by {userid if userid is not None else 0} for music id {musicid} at {ts}'
+            try:
+                self.execute(
+                    sql,
+                    {
+                        'userid': userid if userid is not None else 0,
+                        'musicid': musicid,
+                        'timestamp': ts,
+                        'location': location,
+                        'new_record': 1 if new_record else 0,
+                        'points': points,
+                        'data': self.serialize(data),
+                    },
+                )
+            except IntegrityError:
+                raise ScoreSaveException(
+                    f'There is already an attempt by {userid if userid is not None else 0} for music id {musicid} at {ts}'
+                )
+
+            # Keep the user's play count on their high score in sync with their history.
+            if userid is not None:
+                sql = "UPDATE `score` SET plays = plays + 1 WHERE userid = :userid AND musicid = :musicid"
+                self.execute(sql, {'userid': userid, 'musicid': musicid})
+
+            # Keep the running clear rate totals in sync with the history we just wrote.
+            play, clear, combo = self.get_attempt_stats(game, data)
+            if play:
+                sql = (
+                    "INSERT INTO `music_stats` (musicid, plays, clears, combos, points) " +
+                    "VALUES (:musicid, 1, :clears, :combos, :points) " +
+                    "ON DUPLICATE KEY UPDATE plays = plays + 1, clears = clears + VALUES(clears), " +
+                    "combos = combos + VALUES(combos), points = points + VALUES(points)"
+                )
+                self.execute(
+                    sql,
+                    {
+                        'musicid': musicid,
+                        'clears': 1 if clear else 0,
+                        'combos': 1 if combo else 0,
+                        'points': points,
+                    },
+                )
+
+    def put_scores_and_attempts(
+        self,
+        game: str,
+        version: int,
+        userid: Optional[UserID],
+        scores: List[Score],
+        attempts: List[Attempt],
+    ) -> None:
+        """
+        Given a game/version and user ID, save several new/updated high scores and score
+        attempts at once, such as every song played in a single credit. This is equivalent
+        to calling put_score and put_attempt for each, but takes a fixed number of queries
+        and commits everything together.
+
+        Note that unlike put_score, every score is written exactly as given, so callers
+        should leave the timestamp and location alone when a score is not a new record.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            userid - Integer representing a user, or None if the attempts were anonymous.
+                     Scores are only saved when a user is given.
+            scores - A list of Score objects to save. The key and plays are ignored.
+            attempts - A list of Attempt objects to save. The key is ignored. Attempts on
+                       the same chart at the same time as an earlier one are dropped.
+        """
+        if userid is None:
+            scores = []
+        if not scores and not attempts:
+            return
+
+        # The catalog is cached, so this only looks up songs we haven't seen before.
+        songs = {(score.id, score.chart) for score in scores} | {(attempt.id, attempt.chart) for attempt in attempts}
+        musicids = {
+            (songid, songchart): self.__get_musicid(game, version, songid, songchart)
+            for (songid, songchart) in songs
+        }
+
+        # History only keeps one attempt per chart at a given time, so drop any repeats
+        # here rather than failing the whole batch, leaving the first one as put_attempt would.
+        seen: Set[Tuple[int, int]] = set()
+        unique: List[Attempt] = []
+        for attempt in attempts:
+            key = (musicids[(attempt.id, attempt.chart)], attempt.timestamp)
+            if key not in seen:
+                seen.add(key)
+                unique.append(attempt)
+        attempts = unique
+
+        with self._transaction():
+            if scores:
+                params: Dict[str, Any] = {'userid': userid}
+                values = []
+                for i, score in enumerate(scores):
+                    values.append(f"(:userid, :musicid{i}, :points{i}, :data{i}, :timestamp{i}, :update{i}, :location{i})")
+                    params[f'musicid{i}'] = musicids[(score.id, score.chart)]
+                    params[f'points{i}'] = score.points
+                    params[f'data{i}'] = self.serialize(score.data)
+                    params[f'timestamp{i}'] = score.timestamp
+                    params[f'update{i}'] = score.update
+                    params[f'location{i}'] = score.location
+                sql = (
+                    "INSERT INTO `score` (`userid`, `musicid`, `points`, `data`, `timestamp`, `update`, `lid`) " +
+                    f"VALUES {', '.join(values)} " +
+                    "ON DUPLICATE KEY UPDATE data = VALUES(data), points = VALUES(points), " +
+                    "timestamp = VALUES(timestamp), `update` = VALUES(`update`), lid = VALUES(lid)"
+                )
+                self.execute(sql, params)
+
+            if attempts:
+                params = {'userid': userid if userid is not None else 0}
+                values = []
+                for i, attempt in enumerate(attempts):
+                    values.append(f"(:userid, :musicid{i}, :timestamp{i}, :location{i}, :new_record{i}, :points{i}, :data{i})")
+                    params[f'musicid{i}'] = musicids[(attempt.id, attempt.chart)]
+                    params[f'timestamp{i}'] = attempt.timestamp
+                    params[f'location{i}'] = attempt.location
+                    params[f'new_record{i}'] = 1 if attempt.new_record else 0
+                    params[f'points{i}'] = attempt.points
+                    params[f'data{i}'] = self.serialize(attempt.data)
+                sql = (
+                    "INSERT INTO `score_history` (userid, musicid, timestamp, lid, new_record, points, data) " +
+                    f"VALUES {', '.join(values)}"
+                )
+                try:
+                    self.execute(sql, params)
+                except IntegrityError:
+                    raise ScoreSaveException(
+                        f'There is already an attempt by {userid if userid is not None else 0} for one of music ids ' +
+                        f'{sorted(set(params[f"musicid{i}"] for i in range(len(attempts))))}'
+                    )
+
+                # Keep the user's play counts on their high scores in sync with their history,
+                # grouping songs that were played the same number of times together.
+                if userid is not None:
+                    plays: Dict[int, int] = {}
+                    for attempt in attempts:
+                        musicid = musicids[(attempt.id, attempt.chart)]
+                        plays[musicid] = plays.get(musicid, 0) + 1
+                    by_count: Dict[int, List[int]] = {}
+                    for musicid, count in plays.items():
+                        by_count.setdefault(count, []).append(musicid)
+                    for count, ids in by_count.items():
+                        sql = (
+                            "UPDATE `score` SET plays = plays + :count WHERE userid = :userid AND " +
+                            f"musicid IN ({','.join(str(int(musicid)) for musicid in ids)})"
+                        )
+                        self.execute(sql, {'count': count, 'userid': userid})
+
+                # Keep the running clear rate totals in sync with the history we just wrote.
+                stats: Dict[int, Dict[str, int]] = {}
+                for attempt in attempts:
+                    play, clear, combo = self.get_attempt_stats(game, attempt.data)
+                    if not play:
+                        continue
+                    musicid = musicids[(attempt.id, attempt.chart)]
+                    stat = stats.setdefault(musicid, {'plays': 0, 'clears': 0, 'combos': 0, 'points': 0})
+                    stat['plays'] += 1
+                    stat['clears'] += 1 if clear else 0
+                    stat['combos'] += 1 if combo else 0
+                    stat['points'] += attempt.points
+                if stats:
+                    params = {}
+                    values = []
+                    for i, (musicid, stat) in enumerate(stats.items()):
+                        values.append(f"(:musicid{i}, :plays{i}, :clears{i}, :combos{i}, :points{i})")
+                        params[f'musicid{i}'] = musicid
+                        for name, value in stat.items():
+                            params[f'{name}{i}'] = value
+                    sql = (
+                        "INSERT INTO `music_stats` (musicid, plays, clears, combos, points) " +
+                        f"VALUES {', '.join(values)} " +
+                        "ON DUPLICATE KEY UPDATE plays = plays + VALUES(plays), clears = clears + VALUES(clears), " +
+                        "combos = combos + VALUES(combos), points = points + VALUES(points)"
+                    )
+                    self.execute(sql, params)
+
+    def get_scores_by_song(
+        self,
+        game: str,
+        version: int,
+        userid: UserID,
+        songs: List[Tuple[int, int]],
+    ) -> Dict[Tuple[int, int], Score]:
+        """
+        Look up a user's previous high scores on several song/chart combos at once.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            userid - Integer representing a user. Usually looked up with UserData.
+            songs - A list of tuples of song ID and chart number according to the game.
+
+        Returns:
+            A dictionary keyed by song ID/chart tuples, whose values are Score objects.
+            Songs the user has no score on are left out.
+        """
+        musicids: Dict[int, Tuple[int, int]] = {}
+        for songid, songchart in songs:
+            musicid = self.__lookup_musicid(game, version, songid, songchart)
+            if musicid is not None:
+                musicids[musicid] = (songid, songchart)
+        if not musicids:
+            return {}
+
+        sql = (
+            "SELECT score.id AS scorekey, score.musicid AS musicid, score.timestamp AS timestamp, score.update AS `update`, " +
+            "score.lid AS lid, score.plays AS plays, score.points AS points, score.data AS data FROM score " +
+            f"WHERE score.userid = :userid AND score.musicid IN ({','.join(str(int(musicid)) for musicid in musicids)})"
+        )
+        cursor = self.execute(sql, {'userid': userid})
+
+        scores = {}
+        for result in cursor.fetchall():
+            songid, songchart = musicids[result['musicid']]
+            scores[(songid, songchart)] = Score(
+                result['scorekey'],
+                songid,
+                songchart,
+                result['points'],
+                result['timestamp'],
+                result['update'],
+                result['lid'],
+                result['plays'],
+                self.deserialize(result['data']),
             )
+        return scores
 
     def get_score(self, game: str, version: int, userid: UserID, songid: int, songchart: int) -> Optional[Score]:
         """
@@ -238,20 +649,20 @@ class MusicData(BaseData):
         Returns:
             The optional data stored by the game previously, or None if no score exists.
         """
+        musicid = self.__lookup_musicid(game, version, songid, songchart)
+        if musicid is None:
+            # song doesn't exist, so neither can a score
+            return None
+
         sql = (
-            "SELECT music.songid AS songid, music.chart AS chart, score.id AS scorekey, score.timestamp AS timestamp, score.update AS `update`, score.lid AS lid, " +
-            "(select COUNT(score_history.timestamp) FROM score_history WHERE score_history.musicid = music.id AND score_history.userid = :userid) AS plays, " +
-            "score.points AS points, score.data AS data FROM score, music WHERE score.userid = :userid AND score.musicid = music.id " +
-            "AND music.game = :game AND music.version = :version AND music.songid = :songid AND music.chart = :songchart"
+            "SELECT score.id AS scorekey, score.timestamp AS timestamp, score.update AS `update`, score.lid AS lid, " +
+            "score.plays AS plays, score.points AS points, score.data AS data FROM score WHERE score.userid = :userid AND score.musicid = :musicid"
         )
         cursor = self.execute(
             sql,
             {
                 'userid': userid,
-                'game': game,
-                'version': version,
-                'songid': songid,
-                'songchart': songchart,
+                'musicid': musicid,
             },
         )
         if cursor.rowcount != 1:
@@ -261,8 +672,8 @@ class MusicData(BaseData):
         result = cursor.fetchone()
         return Score(
             result['scorekey'],
-            result['songid'],
-            result['chart'],
+            songid,
+            songchart,
             result['points'],
             result['timestamp'],
             result['update'],
@@ -285,8 +696,7 @@ class MusicData(BaseData):
         """
         sql = (
             "SELECT music.songid AS songid, music.chart AS chart, score.id AS scorekey, score.timestamp AS timestamp, score.update AS `update`, " +
-            "score.userid AS userid, score.lid AS lid, " +
-            "(select COUNT(score_history.timestamp) FROM score_history WHERE score_history.musicid = music.id AND score_history.userid = score.userid) AS plays, " +
+            "score.userid AS userid, score.lid AS lid, score.plays AS plays, " +
             "score.points AS points, score.data AS data FROM score, music WHERE score.id = :scorekey AND score.musicid = music.id " +
             "AND music.game = :game AND music.version = :version"
         )
@@ -339,8 +749,7 @@ class MusicData(BaseData):
         """
         sql = (
             "SELECT music.songid AS songid, music.chart AS chart, score.id AS scorekey, score.timestamp AS timestamp, score.update AS `update`, score.lid AS lid, " +
-            "(select COUNT(score_history.timestamp) FROM score_history WHERE score_history.musicid = music.id AND score_history.userid = :userid) AS plays, " +
-            "score.points AS points, score.data AS data FROM score, music WHERE score.userid = :userid AND score.musicid = music.id " +
+            "score.plays AS plays, score.points AS points, score.data AS data FROM score, music WHERE score.userid = :userid AND score.musicid = music.id " +
             "AND music.game = :game AND music.version = :version"
         )
         if since is not None:
@@ -504,11 +913,7 @@ class MusicData(BaseData):
             self.deserialize(result['data']),
         )
 
-    def get_all_songs(
-        self,
-        game: str,
-        version: Optional[int]=None,
-    ) -> List[Song]:
+    def __get_all_songs(self, game: str, version: Optional[int]) -> Tuple[Song, ...]:
         """
         Given a game and a version, look up all song/chart combos associated with that game.
 
@@ -517,7 +922,7 @@ class MusicData(BaseData):
             version - Integer representing which version of the game.
 
         Returns:
-            A list of Song objects detailing the song information for each song.
+            A tuple of Song objects detailing the song information for each song.
         """
         sql = (
             "SELECT version, songid, chart, name, artist, genre, data FROM music "
@@ -531,22 +936,37 @@ class MusicData(BaseData):
             sql += " ORDER BY music.version DESC"
         cursor = self.execute(sql, params)
 
-        all_songs = []
-        for result in cursor.fetchall():
-            all_songs.append(
-                Song(
-                    game,
-                    result['version'],
-                    result['songid'],
-                    result['chart'],
-                    result['name'],
-                    result['artist'],
-                    result['genre'],
-                    self.deserialize(result['data']),
-                )
+        return tuple(
+            Song(
+                game,
+                result['version'],
+                result['songid'],
+                result['chart'],
+                result['name'],
+                result['artist'],
+                result['genre'],
+                self.deserialize(result['data']),
             )
+            for result in cursor.fetchall()
+        )
 
-        return all_songs
+    def get_all_songs(
+        self,
+        game: str,
+        version: Optional[int]=None,
+    ) -> List[Song]:
+        """
+        Given a game and a version, look up all song/chart combos associated with that game.
+        The returned songs are shared with other callers, so they should not be modified.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+
+        Returns:
+            A list of Song objects detailing the song information for each song.
+        """
+        return list(self._cached(MusicData.SONG_CACHE, (game, version), lambda: self.__get_all_songs(game, version)))
 
     def get_all_versions_of_song(
         self,
@@ -612,51 +1032,33 @@ class MusicData(BaseData):
         Returns:
             A list of UserID, Score objects representing all high scores for a game.
         """
-        # First, construct the queries for grabbing the songid/chart
-        if version is not None:
-            songidquery = (
-                'SELECT songid FROM music WHERE music.id = score.musicid AND game = :game AND version = :version'
-            )
-            chartquery = (
-                'SELECT chart FROM music WHERE music.id = score.musicid AND game = :game AND version = :version'
-            )
-        else:
-            songidquery = (
-                'SELECT songid FROM music WHERE music.id = score.musicid AND game = :game ORDER BY version DESC LIMIT 1'
-            )
-            chartquery = (
-                'SELECT chart FROM music WHERE music.id = score.musicid AND game = :game ORDER BY version DESC LIMIT 1'
-            )
-
-        # Select statement for getting play count
-        playselect = (
-            'SELECT COUNT(timestamp) FROM score_history WHERE score_history.musicid = score.musicid AND score_history.userid = score.userid'
-        )
-
-        # Now, construct the inner select statement so we can choose which scores we care about
-        innerselect = (
-            'SELECT DISTINCT(id) FROM music WHERE game = :game'
-        )
-        if version is not None:
-            innerselect = innerselect + ' AND version = :version'
-        if songid is not None:
-            innerselect = innerselect + ' AND songid = :songid'
-        if songchart is not None:
-            innerselect = innerselect + ' AND chart = :songchart'
-
-        # Finally, construct the full query
         sql = (
-            "SELECT ({}) AS songid, ({}) AS chart, id AS scorekey, points, timestamp, `update`, lid, data, userid, ({}) AS plays "
-            "FROM score WHERE musicid IN ({})"
-        ).format(songidquery, chartquery, playselect, innerselect)
+            "SELECT music.songid AS songid, music.chart AS chart, score.id AS scorekey, score.points AS points, " +
+            "score.timestamp AS timestamp, score.update AS `update`, score.lid AS lid, score.data AS data, " +
+            f"score.userid AS userid, score.plays AS plays FROM score {self.__music_join('score', version)}"
+        )
+        conditions = []
+        if songid is not None or songchart is not None:
+            # Without a version this matches any version of the song, even though the
+            # songid and chart reported are from the newest version.
+            innerselect = 'SELECT id FROM music WHERE game = :game'
+            if version is not None:
+                innerselect = innerselect + ' AND version = :version'
+            if songid is not None:
+                innerselect = innerselect + ' AND songid = :songid'
+            if songchart is not None:
+                innerselect = innerselect + ' AND chart = :songchart'
+            conditions.append(f'score.musicid IN ({innerselect})')
 
         # Now, limit the query
         if userid is not None:
-            sql = sql + ' AND userid = :userid'
+            conditions.append('score.userid = :userid')
         if since is not None:
-            sql = sql + ' AND score.update >= :since'
+            conditions.append('score.update >= :since')
         if until is not None:
-            sql = sql + ' AND score.update < :until'
+            conditions.append('score.update < :until')
+        if conditions:
+            sql = sql + ' WHERE ' + ' AND '.join(conditions)
 
         # Now, query itself
         cursor = self.execute(sql, {
@@ -691,12 +1093,116 @@ class MusicData(BaseData):
 
         return scores
 
+    def get_leaderboard_rank(
+        self,
+        game: str,
+        version: int,
+        userid: UserID,
+        songid: int,
+        songchart: int,
+    ) -> Optional[int]:
+        """
+        Look up where a user's high score places on the leaderboard for a song/chart. The
+        leaderboard is ordered by points, with ties going to the score that was set last.
+        This is answered from the musicid/points/timestamp index, so it doesn't need to
+        load every score for the chart.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            userid - Integer representing a user. Usually looked up with UserData.
+            songid - ID of the song according to the game.
+            songchart - Chart number according to the game.
+
+        Returns:
+            The zero-based position of the user's score, or None if they have no score.
+        """
+        musicid = self.__lookup_musicid(game, version, songid, songchart)
+        if musicid is None:
+            return None
+
+        sql = "SELECT points, timestamp FROM score WHERE userid = :userid AND musicid = :musicid"
+        cursor = self.execute(sql, {'userid': userid, 'musicid': musicid})
+        if cursor.rowcount != 1:
+            # score doesn't exist
+            return None
+        result = cursor.fetchone()
+
+        sql = (
+            "SELECT COUNT(*) AS position FROM score WHERE musicid = :musicid AND " +
+            "(points > :points OR (points = :points AND timestamp > :timestamp))"
+        )
+        cursor = self.execute(sql, {'musicid': musicid, 'points': result['points'], 'timestamp': result['timestamp']})
+        return cursor.fetchone()['position']
+
+    def get_leaderboard(
+        self,
+        game: str,
+        version: int,
+        songid: int,
+        songchart: int,
+        offset: int=0,
+        limit: Optional[int]=None,
+    ) -> List[Tuple[UserID, Score]]:
+        """
+        Look up a window of the leaderboard for a song/chart, in the same order used by
+        get_leaderboard_rank above.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            songid - ID of the song according to the game.
+            songchart - Chart number according to the game.
+            offset - Zero-based position of the first score to return.
+            limit - Optional maximum number of scores to return.
+
+        Returns:
+            A list of UserID, Score objects ordered from highest to lowest position.
+        """
+        musicid = self.__lookup_musicid(game, version, songid, songchart)
+        if musicid is None:
+            return []
+
+        sql = (
+            "SELECT id AS scorekey, points, timestamp, `update`, lid, data, userid, plays " +
+            "FROM score WHERE musicid = :musicid ORDER BY points DESC, timestamp DESC"
+        )
+        if limit is not None:
+            sql = sql + ' LIMIT :limit OFFSET :offset'
+        elif offset > 0:
+            # MySQL needs a limit in order to specify an offset.
+            sql = sql + ' LIMIT 18446744073709551615 OFFSET :offset'
+        cursor = self.execute(sql, {'musicid': musicid, 'limit': limit, 'offset': offset})
+
+        return [
+            (
+                UserID(result['userid']),
+                Score(
+                    result['scorekey'],
+                    songid,
+                    songchart,
+                    result['points'],
+                    result['timestamp'],
+                    result['update'],
+                    result['lid'],
+                    result['plays'],
+                    self.deserialize(result['data']),
+                ),
+            )
+            for result in cursor.fetchall()
+        ]
+
     def get_all_records(
         self,
         game: str,
         version: Optional[int]=None,
         userlist: Optional[List[UserID]]=None,
         locationlist: Optional[List[int]]=None,
+        songids: Optional[List[int]]=None,
+        songchart: Optional[int]=None,
+        since: Optional[int]=None,
+        after: Optional[Tuple[int, int, int]]=None,
+        limit: Optional[int]=None,
     ) -> List[Tuple[UserID, Score]]:
         """
         Look up all of a game's records, only returning the top score for each song. For score ties,
@@ -710,41 +1216,24 @@ class MusicData(BaseData):
             version - Integer representing which version of the game.
             userlist - List of UserIDs to limit the search to.
             locationlist - A list of location IDs to limit searches to.
+            songids - List of song IDs according to the game to limit the search to.
+            songchart - Integer representing the chart to limit the search to.
+            since - Only return records whose score was updated at or after this timestamp.
+            after - Tuple of song ID, chart and score key of the last record on the previous
+                    page. Only records ordered after it are returned.
+            limit - Maximum number of records to return, ordered by song ID, chart and key.
 
         Returns:
             A list of UserID, Score objects representing all high scores for a game.
         """
-        # First, construct the queries for grabbing the songid/chart
-        if version is not None:
-            songidquery = (
-                'SELECT songid FROM music WHERE music.id = score.musicid AND game = :game AND version = :version'
-            )
-            chartquery = (
-                'SELECT chart FROM music WHERE music.id = score.musicid AND game = :game AND version = :version'
-            )
-        else:
-            songidquery = (
-                'SELECT songid FROM music WHERE music.id = score.musicid AND game = :game ORDER BY version DESC LIMIT 1'
-            )
-            chartquery = (
-                'SELECT chart FROM music WHERE music.id = score.musicid AND game = :game ORDER BY version DESC LIMIT 1'
-            )
-
-        # Next, get a list of all songs that were played given the input criteria
-        musicid_sql = (
-            "SELECT DISTINCT(score.musicid) FROM score, music WHERE score.musicid = music.id AND music.game = :game"
-        )
-        params: Dict[str, Any] = {'game': game}
-        if version is not None:
-            musicid_sql = musicid_sql + ' AND music.version = :version'
-            params['version'] = version
+        params: Dict[str, Any] = {'game': game, 'version': version}
 
         # Figure out where the record was earned
         if locationlist is not None:
             if len(locationlist) == 0:
                 # We don't have any locations, but SQL will shit the bed, so lets add a default one.
                 locationlist.append(-1)
-            location_sql = "AND score.lid IN :locationlist"
+            location_sql = "AND {table}.lid IN :locationlist"
             params['locationlist'] = tuple(locationlist)
         else:
             location_sql = ""
@@ -754,19 +1243,62 @@ class MusicData(BaseData):
             if len(userlist) == 0:
                 # We don't have any users, but SQL will shit the bed, so lets add a fake one.
                 userlist.append(UserID(-1))
-            user_sql = f"SELECT userid FROM score WHERE score.musicid = played.musicid AND score.userid IN :userlist {location_sql} ORDER BY points DESC, timestamp DESC LIMIT 1"
+            user_sql = "AND {table}.userid IN :userlist"
             params['userlist'] = tuple(userlist)
         else:
-            user_sql = f"SELECT userid FROM score WHERE score.musicid = played.musicid {location_sql} ORDER BY points DESC, timestamp DESC LIMIT 1"
-        records_sql = f"SELECT ({user_sql}) AS userid, musicid FROM ({musicid_sql}) played"
+            user_sql = ""
+        filter_sql = f"{location_sql} {user_sql}"
+
+        # Figure out which charts we care about. These apply to the plays totals too, so
+        # that a filtered or paged lookup only adds up plays for the charts it returns.
+        music_sql = ""
+        if songids is not None:
+            if len(songids) == 0:
+                # We don't have any songs, but SQL will shit the bed, so lets add a fake one.
+                songids.append(-1)
+            music_sql = music_sql + " AND music.songid IN :songids"
+            params['songids'] = tuple(songids)
+        if songchart is not None:
+            music_sql = music_sql + " AND music.chart = :songchart"
+            params['songchart'] = songchart
+        if after is not None:
+            music_sql = music_sql + " AND (music.songid, music.chart) >= (:after_songid, :after_chart)"
+            params['after_songid'], params['after_chart'], params['after_key'] = after
+
+        # A score is the record if no other eligible score on the same chart beats it. This
+        # walks the musicid/points/timestamp index instead of sorting every chart's scores.
+        better_sql = (
+            "LEFT JOIN score better ON better.musicid = score.musicid AND (better.points > score.points OR " +
+            "(better.points = score.points AND (better.timestamp > score.timestamp OR " +
+            "(better.timestamp = score.timestamp AND better.id > score.id)))) " +
+            filter_sql.format(table='better')
+        )
+
+        # Plays for a record are the plays of everyone who has a score on the chart.
+        plays_sql = (
+            f"SELECT score.musicid AS musicid, CAST(SUM(score.plays) AS UNSIGNED) AS plays FROM score {self.__music_join('score', version)}{music_sql} " +
+            "GROUP BY score.musicid"
+        )
 
-        # Now, join it up against the score and music table to grab the info we need
         sql = (
-            "SELECT ({}) AS songid, ({}) AS chart, score.points AS points, score.userid AS userid, score.id AS scorekey, score.data AS data, " +
-            "score.timestamp AS timestamp, score.update AS `update`, " +
-            "score.lid AS lid, (select COUNT(score_history.timestamp) FROM score_history WHERE score_history.musicid = score.musicid) AS plays " +
-            "FROM score, ({}) records WHERE records.userid = score.userid AND records.musicid = score.musicid"
-        ).format(songidquery, chartquery, records_sql)
+            "SELECT music.songid AS songid, music.chart AS chart, score.points AS points, score.userid AS userid, score.id AS scorekey, " +
+            "score.data AS data, score.timestamp AS timestamp, score.update AS `update`, score.lid AS lid, totals.plays AS plays " +
+            f"FROM score {self.__music_join('score', version)} " +
+            f"JOIN ({plays_sql}) totals ON totals.musicid = score.musicid " +
+            f"{better_sql} WHERE better.id IS NULL {filter_sql.format(table='score')} {music_sql}"
+        )
+        if since is not None:
+            sql = sql + " AND score.update >= :since"
+            params['since'] = since
+        if after is not None:
+            sql = sql + " AND (music.songid, music.chart, score.id) > (:after_songid, :after_chart, :after_key)"
+        if after is not None or limit is not None:
+            # Page by key rather than by offset, so each page only looks at the charts after
+            # the last one, and records set between pages can't shift what a page holds.
+            sql = sql + " ORDER BY music.songid, music.chart, score.id"
+            if limit is not None:
+                sql = sql + " LIMIT :limit"
+                params['limit'] = limit
         cursor = self.execute(sql, params)
 
         scores = []
@@ -844,6 +1376,8 @@ class MusicData(BaseData):
         timelimit: Optional[int]=None,
         limit: Optional[int]=None,
         offset: Optional[int]=None,
+        since_id: Optional[int]=None,
+        until_id: Optional[int]=None,
     ) -> List[Tuple[Optional[UserID], Attempt]]:
         """
         Look up all of the attempts to score for a particular game.
@@ -851,9 +1385,12 @@ class MusicData(BaseData):
         Parameters:
             game - String representing a game series.
             version - Integer representing which version of the game.
+            since_id - Only return attempts whose key is at least this, for fetching newer attempts.
+            until_id - Only return attempts whose key is below this, for fetching older attempts.
 
         Returns:
             A list of UserID, Attempt objects representing all score attempts for a game, sorted newest to oldest attempts.
+            If since_id or until_id is given, attempts are sorted by key instead of by timestamp.
         """
         # First, construct the queries for grabbing the songid/chart
         if version is not None:
@@ -893,7 +1430,16 @@ class MusicData(BaseData):
             sql = sql + ' AND userid = :userid'
         if timelimit is not None:
             sql = sql + ' AND timestamp >= :timestamp'
-        sql = sql + ' ORDER BY timestamp DESC'
+        if since_id is not None:
+            sql = sql + ' AND id >= :since_id'
+        if until_id is not None:
+            sql = sql + ' AND id < :until_id'
+        if since_id is not None or until_id is not None:
+            # Callers page through attempts by key, and timestamps can be supplied by
+            # games, so they don't follow keys. Order by key so no attempt is skipped.
+            sql = sql + ' ORDER BY id DESC'
+        else:
+            sql = sql + ' ORDER BY timestamp DESC'
         if limit is not None:
             sql = sql + ' LIMIT :limit'
         if offset is not None:
@@ -909,6 +1455,8 @@ class MusicData(BaseData):
             'timestamp': timelimit,
             'limit': limit,
             'offset': offset,
+            'since_id': since_id,
+            'until_id': until_id,
         })
 
         # Now objectify the attempts
@@ -931,3 +1479,227 @@ class MusicData(BaseData):
             )
 
         return attempts
+
+    def get_clear_rates(
+        self,
+        game: str,
+        version: int,
+        songid: Optional[int]=None,
+        songchart: Optional[int]=None,
+    ) -> Dict[int, Dict[int, Dict[str, int]]]:
+        """
+        Look up the running clear rate totals for a game/version, optionally limited to a
+        single song or a single song/chart.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            songid - Optional ID of the song according to the game.
+            songchart - Optional chart number according to the game.
+
+        Returns:
+            A dictionary keyed by songid, whose values are a dictionary keyed by chart,
+            whose values are a dictionary containing integer counts keyed by 'plays',
+            'clears', 'combos' and the average points earned keyed by 'average'. Songs
+            that have never been played will not be present.
+        """
+        sql = (
+            "SELECT music.songid AS songid, music.chart AS chart, music_stats.plays AS plays, " +
+            "music_stats.clears AS clears, music_stats.combos AS combos, music_stats.points AS points " +
+            "FROM music_stats, music WHERE music.id = music_stats.musicid AND music.game = :game AND music.version = :version"
+        )
+        if songid is not None:
+            sql = sql + ' AND music.songid = :songid'
+        if songchart is not None:
+            sql = sql + ' AND music.chart = :songchart'
+        cursor = self.execute(sql, {'game': game, 'version': version, 'songid': songid, 'songchart': songchart})
+
+        rates: Dict[int, Dict[int, Dict[str, int]]] = {}
+        for result in cursor.fetchall():
+            if result['songid'] not in rates:
+                rates[result['songid']] = {}
+            rates[result['songid']][result['chart']] = {
+                'plays': result['plays'],
+                'clears': result['clears'],
+                'combos': result['combos'],
+                'average': int(result['points'] / result['plays']) if result['plays'] > 0 else 0,
+            }
+        return rates
+
+    def rebuild_clear_stats(self, game: Optional[str]=None) -> int:
+        """
+        Recompute the running clear rate totals from score history. This only needs to be
+        done once after the totals are introduced, or if the classification of attempts
+        into plays, clears and full combos changes. Attempts saved while this is running
+        may not be counted, so it should be run while the network is not accepting scores.
+
+        Parameters:
+            game - Optional string representing a game series. If not given, totals for
+                   every game are rebuilt.
+
+        Returns:
+            The number of music IDs that have at least one play.
+        """
+        if game is None:
+            cursor = self.execute("SELECT DISTINCT(game) AS game FROM music")
+            games = [result['game'] for result in cursor.fetchall()]
+        else:
+            games = [game]
+
+        total = 0
+        for series in games:
+            cursor = self.execute("SELECT DISTINCT(id) AS id FROM music WHERE game = :game", {'game': series})
+            musicids = [result['id'] for result in cursor.fetchall()]
+
+            for batch in [musicids[i:(i + self.BATCH_SIZE)] for i in range(0, len(musicids), self.BATCH_SIZE)]:
+                stats: Dict[int, Dict[str, int]] = {}
+                inclause = ','.join(str(int(musicid)) for musicid in batch)
+                cursor = self.execute(f"SELECT musicid, points, data FROM score_history WHERE musicid IN ({inclause})")
+                for result in cursor:
+                    play, clear, combo = self.get_attempt_stats(series, self.deserialize(result['data']))
+                    if not play:
+                        continue
+                    if result['musicid'] not in stats:
+                        stats[result['musicid']] = {'plays': 0, 'clears': 0, 'combos': 0, 'points': 0}
+                    stats[result['musicid']]['plays'] += 1
+                    stats[result['musicid']]['clears'] += 1 if clear else 0
+                    stats[result['musicid']]['combos'] += 1 if combo else 0
+                    stats[result['musicid']]['points'] += result['points']
+
+                # Replace the totals together, so readers never see a batch with no totals.
+                with self._transaction():
+                    self.execute(f"DELETE FROM music_stats WHERE musicid IN ({inclause})")
+                    if stats:
+                        params: Dict[str, Any] = {}
+                        values = []
+                        for i, (musicid, stat) in enumerate(stats.items()):
+                            values.append(f"(:musicid{i}, :plays{i}, :clears{i}, :combos{i}, :points{i})")
+                            params[f'musicid{i}'] = musicid
+                            for name, value in stat.items():
+                                params[f'{name}{i}'] = value
+                        sql = (
+                            "INSERT INTO `music_stats` (musicid, plays, clears, combos, points) " +
+                            f"VALUES {', '.join(values)}"
+                        )
+                        self.execute(sql, params)
+                total += len(stats)
+
+        return total
+
+    def update_score_totals(self, game: str, version: int, userid: UserID, deltas: Dict[str, int]) -> None:
+        """
+        Given a game/version and a user ID, adjust some of the user's score totals.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            userid - Integer representing a user. Usually looked up with UserData.
+            deltas - Dictionary keyed by total name, whose values are added to the totals.
+        """
+        sql = (
+            "INSERT INTO `score_total` (game, version, userid, name, total) " +
+            "VALUES (:game, :version, :userid, :name, :total) " +
+            "ON DUPLICATE KEY UPDATE total = total + VALUES(total)"
+        )
+        for name, delta in deltas.items():
+            self.execute(sql, {'game': game, 'version': version, 'userid': userid, 'name': name, 'total': delta})
+
+    def put_score_totals(self, game: str, version: int, userid: UserID, totals: Dict[str, int]) -> None:
+        """
+        Given a game/version and a user ID, overwrite some of the user's score totals.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            userid - Integer representing a user. Usually looked up with UserData.
+            totals - Dictionary keyed by total name, whose values replace the totals.
+        """
+        sql = (
+            "INSERT INTO `score_total` (game, version, userid, name, total) " +
+            "VALUES (:game, :version, :userid, :name, :total) " +
+            "ON DUPLICATE KEY UPDATE total = VALUES(total)"
+        )
+        for name, total in totals.items():
+            self.execute(sql, {'game': game, 'version': version, 'userid': userid, 'name': name, 'total': total})
+
+    def replace_score_totals(self, game: str, version: int, totals: Dict[UserID, Dict[str, int]]) -> None:
+        """
+        Given a game/version, throw away every user's score totals and replace them. This
+        is used to periodically recount totals from scratch.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            totals - Dictionary keyed by user ID, whose values are dictionaries of totals
+                     keyed by total name.
+        """
+        rows = [
+            (userid, name, total)
+            for userid, usertotals in totals.items()
+            for name, total in usertotals.items()
+        ]
+
+        # Replace everything in one transaction, so ranks are never looked up against a
+        # partially rebuilt table, and updates made while rebuilding wait for it to finish.
+        with self._transaction():
+            self.execute("DELETE FROM `score_total` WHERE game = :game AND version = :version", {'game': game, 'version': version})
+            for batch in [rows[i:(i + self.BATCH_SIZE)] for i in range(0, len(rows), self.BATCH_SIZE)]:
+                params: Dict[str, Any] = {'game': game, 'version': version}
+                values = []
+                for i, (userid, name, total) in enumerate(batch):
+                    values.append(f"(:game, :version, :userid{i}, :name{i}, :total{i})")
+                    params[f'userid{i}'] = userid
+                    params[f'name{i}'] = name
+                    params[f'total{i}'] = total
+                sql = (
+                    "INSERT INTO `score_total` (game, version, userid, name, total) " +
+                    f"VALUES {', '.join(values)}"
+                )
+                self.execute(sql, params)
+
+    def get_score_total_ranks(self, game: str, version: int, totals: Dict[str, int]) -> Dict[str, int]:
+        """
+        Given a game/version and some totals, look up where those totals would place
+        amongst every user's totals of the same name.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            totals - Dictionary keyed by total name, whose values are the totals to rank.
+
+        Returns:
+            A dictionary keyed by total name, whose values are one-based ranks.
+        """
+        if not totals:
+            return {}
+
+        names = list(totals.keys())
+        params: Dict[str, Any] = {'game': game, 'version': version}
+        conditions = []
+        for i, name in enumerate(names):
+            conditions.append(f"(name = :name{i} AND total > :total{i})")
+            params[f'name{i}'] = name
+            params[f'total{i}'] = totals[name]
+        sql = (
+            "SELECT name, COUNT(*) AS ahead FROM `score_total` WHERE game = :game AND version = :version " +
+            f"AND ({' OR '.join(conditions)}) GROUP BY name"
+        )
+        cursor = self.execute(sql, params)
+        ahead = {result['name']: result['ahead'] for result in cursor.fetchall()}
+        return {name: ahead.get(name, 0) + 1 for name in names}
+
+    def get_score_total_count(self, game: str, version: int, name: str) -> int:
+        """
+        Given a game/version and a total name, look up how many users have that total.
+
+        Parameters:
+            game - String representing a game series.
+            version - Integer representing which version of the game.
+            name - The name of the total.
+
+        Returns:
+            The number of users with the named total.
+        """
+        sql = "SELECT COUNT(*) AS count FROM `score_total` WHERE game = :game AND version = :version AND name = :name"
+        cursor = self.execute(sql, {'game': game, 'version': version, 'name': name})
+        return cursor.fetchone()['count']
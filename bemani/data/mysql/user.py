@@ -1,10 +1,10 @@
 import copy
 import random
-from sqlalchemy import Table, Column, UniqueConstraint  # type: ignore
+from sqlalchemy import Table, Column, Index, UniqueConstraint  # type: ignore
 from sqlalchemy.types import String, Integer, JSON  # type: ignore
 from sqlalchemy.dialects.mysql import BIGINT as BigInteger  # type: ignore
 from sqlalchemy.exc import IntegrityError  # type: ignore
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Set, Tuple, Any
 from passlib.hash import pbkdf2_sha512  # type: ignore
 
 from bemani.common import ValidatedDict, Time
@@ -104,6 +104,7 @@ achievement = Table(
     Column('type', String(64), nullable=False),
     Column('data', JSON, nullable=False),
     UniqueConstraint('refid', 'id', 'type', name='refid_id_type'),
+    Index('type_id', 'type', 'id'),
     mysql_charset='utf8mb4',
 )
 
@@ -294,6 +295,24 @@ class UserData(BaseData):
         result = cursor.fetchone()
         return User(userid, result['username'], result['email'], result['admin'] == 1)
 
+    def get_usernames(self, userids: List[UserID]) -> Dict[UserID, Optional[str]]:
+        """
+        Given a list of userids, look up the username for each account in one query.
+
+        Parameters:
+            userids - List of integer user IDs, as looked up by one of the above functions.
+
+        Returns:
+            A dictionary mapping each user ID that was found to its username, which may
+            be None if the account has no username.
+        """
+        if len(userids) == 0:
+            return {}
+
+        sql = "SELECT id, username FROM user WHERE id IN :userids"
+        cursor = self.execute(sql, {'userids': tuple(userids)})
+        return {UserID(result['id']): result['username'] for result in cursor.fetchall()}
+
     def get_all_users(self) -> List[User]:
         """
         Look up all users in the system.
@@ -531,21 +550,13 @@ class UserData(BaseData):
         Returns:
             A dictionary previously stored by a game class if found, or None otherwise.
         """
-        played = self.get_games_played(userid)
-        versions = [p[1] for p in played if p[0] == game]
-        versions.sort(reverse=True)
-
-        if version in versions:
-            return self.get_profile(game, version, userid)
-        elif len(versions) > 0:
-            return self.get_profile(game, versions[0], userid)
-        else:
-            return None
+        return self.get_any_profiles(game, version, [userid])[0][1]
 
     def get_any_profiles(self, game: str, version: int, userids: List[UserID]) -> List[Tuple[UserID, Optional[ValidatedDict]]]:
         """
         Does the exact same thing as get_any_profile but across a list of users instead of one.
-        Provided purely as a convenience function.
+        This looks up all users in a fixed number of queries, regardless of how many users
+        are requested.
 
         Parameters:
             game - String identifier of the game looking up the user.
@@ -556,10 +567,95 @@ class UserData(BaseData):
             A List of tuples containing a userid and a dictionary previously stored by a game class if found,
             or None otherwise.
         """
-        return [
-            (userid, self.get_any_profile(game, version, userid))
-            for userid in userids
-        ]
+        # First, figure out which version of each user's profile we want, preferring
+        # the requested version and falling back to the newest one.
+        unique_userids = list(set(userids))
+        chosen: Dict[UserID, Dict[str, Any]] = {}
+        for i in range(0, len(unique_userids), BaseData.BATCH_SIZE):
+            batch = unique_userids[i:(i + BaseData.BATCH_SIZE)]
+            sql = (
+                "SELECT refid.userid AS userid, refid.version AS version, refid.refid AS refid, extid.extid AS extid " +
+                "FROM refid LEFT JOIN extid ON extid.userid = refid.userid AND extid.game = refid.game " +
+                f"WHERE refid.game = :game AND refid.userid IN ({','.join(str(int(userid)) for userid in batch)})"
+            )
+            cursor = self.execute(sql, {'game': game})
+            for result in cursor.fetchall():
+                userid = UserID(result['userid'])
+                existing = chosen.get(userid)
+                if existing is None or (
+                    existing['version'] != version and
+                    (result['version'] == version or result['version'] > existing['version'])
+                ):
+                    chosen[userid] = {
+                        'refid': result['refid'],
+                        'extid': result['extid'],
+                        'game': game,
+                        'version': result['version'],
+                    }
+
+        # Now, look up the profiles themselves.
+        refids = [profile['refid'] for profile in chosen.values() if profile['extid'] is not None]
+        data: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(refids), BaseData.BATCH_SIZE):
+            batch = refids[i:(i + BaseData.BATCH_SIZE)]
+            sql = f"SELECT refid, data FROM profile WHERE refid IN ({','.join(f':refid{j}' for j in range(len(batch)))})"
+            cursor = self.execute(sql, {f'refid{j}': refid for j, refid in enumerate(batch)})
+            for result in cursor.fetchall():
+                data[result['refid']] = self.deserialize(result['data'])
+
+        profiles: Dict[UserID, ValidatedDict] = {}
+        for userid, profile in chosen.items():
+            if profile['refid'] in data:
+                profile.update(data[profile['refid']])
+                profiles[userid] = ValidatedDict(profile)
+
+        # Make sure that a user requested more than once doesn't share a profile object.
+        results: List[Tuple[UserID, Optional[ValidatedDict]]] = []
+        seen: Set[UserID] = set()
+        for userid in userids:
+            found = profiles.get(userid)
+            if found is not None and userid in seen:
+                found = copy.deepcopy(found)
+            seen.add(userid)
+            results.append((userid, found))
+        return results
+
+    def get_all_versions_of_profiles(self, game: str, userids: List[UserID]) -> Dict[UserID, Dict[int, ValidatedDict]]:
+        """
+        Given a game and a list of users, look up every version of each user's profile for that
+        game. This looks up all users in a fixed number of queries, regardless of how many users
+        are requested.
+
+        Parameters:
+            game - String identifier of the game we want user profiles for.
+            userids - List of Integer user IDs, as looked up by one of the above functions.
+
+        Returns:
+            A dictionary keyed by user ID, whose values are dictionaries keyed by version of the
+            profiles previously stored by a game class. Users without any profile are omitted.
+        """
+        unique_userids = list(set(userids))
+        profiles: Dict[UserID, Dict[int, ValidatedDict]] = {}
+        for i in range(0, len(unique_userids), BaseData.BATCH_SIZE):
+            batch = unique_userids[i:(i + BaseData.BATCH_SIZE)]
+            sql = (
+                "SELECT refid.userid AS userid, refid.version AS version, refid.refid AS refid, extid.extid AS extid, profile.data AS data " +
+                "FROM refid, profile, extid " +
+                f"WHERE refid.game = :game AND refid.userid IN ({','.join(str(int(userid)) for userid in batch)}) " +
+                "AND refid.refid = profile.refid AND extid.game = refid.game AND extid.userid = refid.userid"
+            )
+            cursor = self.execute(sql, {'game': game})
+            for result in cursor.fetchall():
+                profile = {
+                    'refid': result['refid'],
+                    'extid': result['extid'],
+                    'game': game,
+                    'version': result['version'],
+                }
+                profile.update(self.deserialize(result['data']))
+                profiles.setdefault(UserID(result['userid']), {})[result['version']] = ValidatedDict(profile)
+
+        return profiles
 
     def get_games_played(self, userid: UserID) -> List[Tuple[str, int]]:
         """
@@ -634,13 +730,21 @@ class UserData(BaseData):
 
         return [UserID(result['userid']) for result in cursor.fetchall()]
 
-    def get_all_achievements(self, game: str, version: int) -> List[Tuple[UserID, Achievement]]:
+    def get_all_achievements(
+        self,
+        game: str,
+        version: int,
+        achievementid: Optional[int]=None,
+        achievementtype: Optional[str]=None,
+    ) -> List[Tuple[UserID, Achievement]]:
         """
         Given a game/version, find all achievements for al players.
 
         Parameters:
             game - String identifier of the game looking up the user.
             version - Integer version of the game looking up the user.
+            achievementid - Optionally, only return achievements with this ID.
+            achievementtype - Optionally, only return achievements of this type.
 
         Returns:
             A list of (UserID, Achievement) objects.
@@ -650,7 +754,14 @@ class UserData(BaseData):
             "refid.userid AS userid FROM achievement, refid WHERE refid.game = :game AND "
             "refid.version = :version AND refid.refid = achievement.refid"
         )
-        cursor = self.execute(sql, {'game': game, 'version': version})
+        params: Dict[str, Any] = {'game': game, 'version': version}
+        if achievementid is not None:
+            sql += " AND achievement.id = :id"
+            params['id'] = achievementid
+        if achievementtype is not None:
+            sql += " AND achievement.type = :type"
+            params['type'] = achievementtype
+        cursor = self.execute(sql, params)
 
         achievements = []
         for result in cursor.fetchall():
@@ -668,6 +779,80 @@ class UserData(BaseData):
 
         return achievements
 
+    def count_achievements(self, game: str, version: int, achievementid: int, achievementtype: str) -> int:
+        """
+        Given a game/version and an achievement ID/type, count how many players have
+        earned that achievement.
+
+        Parameters:
+            game - String identifier of the game looking up the user.
+            version - Integer version of the game looking up the user.
+            achievementid - Integer ID, as provided by a game.
+            achievementtype - The type of achievement.
+
+        Returns:
+            The number of players with this achievement.
+        """
+        sql = (
+            "SELECT COUNT(*) AS count FROM achievement, refid WHERE refid.game = :game AND "
+            "refid.version = :version AND refid.refid = achievement.refid AND "
+            "achievement.id = :id AND achievement.type = :type"
+        )
+        cursor = self.execute(sql, {'game': game, 'version': version, 'id': achievementid, 'type': achievementtype})
+        return cursor.fetchone()['count']
+
+    def get_achievement_stats(
+        self,
+        game: str,
+        version: int,
+        achievementtype: str,
+        scorekey: str,
+        clearkey: str,
+        clearvalue: int,
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Given a game/version and an achievement type, summarize how every achievement
+        ID of that type has been played, without loading each player's achievement.
+
+        Parameters:
+            game - String identifier of the game looking up the user.
+            version - Integer version of the game looking up the user.
+            achievementtype - The type of achievement.
+            scorekey - The key in the achievement data holding the score to total up.
+            clearkey - The key in the achievement data holding the clear status.
+            clearvalue - The lowest clear status that counts as a clear.
+
+        Returns:
+            A dictionary keyed by achievement ID, whose values are dictionaries
+            containing the number of 'attempts' and 'clears', and the 'total_score'.
+        """
+        sql = (
+            "SELECT achievement.id AS id, COUNT(*) AS attempts, "
+            "SUM(COALESCE(CAST(JSON_EXTRACT(achievement.data, :clearpath) AS SIGNED), 0) >= :clearvalue) AS clears, "
+            "SUM(COALESCE(CAST(JSON_EXTRACT(achievement.data, :scorepath) AS SIGNED), 0)) AS total_score "
+            "FROM achievement, refid WHERE refid.game = :game AND refid.version = :version AND "
+            "refid.refid = achievement.refid AND achievement.type = :type GROUP BY achievement.id"
+        )
+        cursor = self.execute(
+            sql,
+            {
+                'game': game,
+                'version': version,
+                'type': achievementtype,
+                'clearpath': f'$.{clearkey}',
+                'clearvalue': clearvalue,
+                'scorepath': f'$.{scorekey}',
+            },
+        )
+        return {
+            result['id']: {
+                'attempts': int(result['attempts']),
+                'clears': int(result['clears'] or 0),
+                'total_score': int(result['total_score'] or 0),
+            }
+            for result in cursor.fetchall()
+        }
+
     def put_profile(self, game: str, version: int, userid: UserID, profile: Dict[str, Any]) -> None:
         """
         Given a game/version/userid, save an associated profile.
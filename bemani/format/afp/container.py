@@ -1064,7 +1064,7 @@ class TXP2File(TrackedCoverage, VerboseOutput):
         # Now, put down the strings that were new in this pman structure.
         return self.write_strings(data, pending_strings)
 
-    def unparse(self) -> bytes:
+    def unparse(self, compress_level: Optional[int] = None) -> bytes:
         if self.read_only:
             raise Exception("This file is read-only because we can't parse some of it!")
 
@@ -1191,7 +1191,7 @@ class TXP2File(TrackedCoverage, VerboseOutput):
                         compressed_texture = texture.compressed
                     else:
                         # We need to compress the raw texture.
-                        lz77 = Lz77()
+                        lz77 = Lz77(level=compress_level)
                         compressed_texture = lz77.compress(raw_texture)
 
                     # Construct the mini-header and the texture itself.
@@ -1,10 +1,12 @@
+import json
 import random
-from typing import Dict, Tuple, Any, Optional
-from flask import Blueprint, request, Response, render_template, url_for
+import time
+from typing import Dict, Iterator, List, Set, Tuple, Any, Optional
+from flask import Blueprint, request, Response, abort, render_template, stream_with_context, url_for
 
 from bemani.backend.base import Base
 from bemani.common import CardCipher, CardCipherException, GameConstants
-from bemani.data import Arcade, Machine, User, UserID, News, Event, Server, Client
+from bemani.data import Arcade, ArcadeID, Machine, User, UserID, News, Event, Server, Client
 from bemani.data.api.client import APIClient, NotAuthorizedAPIException, APIException
 from bemani.frontend.app import adminrequired, jsonify, valid_email, valid_username, valid_pin, render_react
 from bemani.frontend.iidx.iidx import IIDXFrontend
@@ -22,6 +24,14 @@ admin_pages = Blueprint(
     static_folder=static_location,
 )
 
+# How often an event stream checks for new events, and how long it stays open before
+# the browser reconnects, so that a stream never ties up a worker indefinitely. Each
+# open stream still holds a worker, so streaming is only offered when the network is
+# configured with 'event_stream' (meant for async/gevent workers). Otherwise the events
+# page polls for new events instead.
+EVENT_STREAM_INTERVAL = 2.0
+EVENT_STREAM_DURATION = 60.0
+
 
 def format_arcade(arcade: Arcade) -> Dict[str, Any]:
     owners = []
@@ -102,6 +112,28 @@ def format_event(event: Event) -> Dict[str, Any]:
     }
 
 
+def format_event_names(
+    events: List[Event],
+    users: Optional[Set[UserID]]=None,
+    arcades: Optional[Set[ArcadeID]]=None,
+) -> Tuple[Dict[UserID, Optional[str]], Dict[ArcadeID, str]]:
+    # Only look up names for users and arcades these events refer to, skipping any
+    # that were already looked up, so that we never need to scan every user.
+    users = users if users is not None else set()
+    arcades = arcades if arcades is not None else set()
+    newusers = {event.userid for event in events if event.userid is not None} - users
+    newarcades = {event.arcadeid for event in events if event.arcadeid is not None} - arcades
+    users.update(newusers)
+    arcades.update(newarcades)
+
+    arcadenames: Dict[ArcadeID, str] = {}
+    for arcadeid in newarcades:
+        arcade = g.data.local.machine.get_arcade(arcadeid)
+        if arcade is not None:
+            arcadenames[arcadeid] = arcade.name
+    return g.data.local.user.get_usernames(list(newusers)), arcadenames
+
+
 def format_client(client: Client) -> Dict[str, Any]:
     return {
         'id': client.id,
@@ -138,13 +170,15 @@ def viewevents() -> Response:
     iidx = IIDXFrontend(g.data, g.config, g.cache)
     jubeat = JubeatFrontend(g.data, g.config, g.cache)
     pnm = PopnMusicFrontend(g.data, g.config, g.cache)
+    events = g.data.local.network.get_events(limit=100)
+    usernames, arcadenames = format_event_names(events)
     return render_react(
         'Events',
         'admin/events.react.js',
         {
-            'events': [format_event(event) for event in g.data.local.network.get_events(limit=100)],
-            'users': {user.id: user.username for user in g.data.local.user.get_all_users()},
-            'arcades': {arcade.id: arcade.name for arcade in g.data.local.machine.get_all_arcades()},
+            'events': [format_event(event) for event in events],
+            'users': usernames,
+            'arcades': arcadenames,
             'iidxsongs': iidx.get_all_songs(),
             'jubeatsongs': jubeat.get_all_songs(),
             'pnmsongs': pnm.get_all_songs(),
@@ -154,6 +188,7 @@ def viewevents() -> Response:
         },
         {
             'refresh': url_for('admin_pages.listevents', since=-1),
+            'stream': url_for('admin_pages.streamevents', since=-1) if g.config.get('event_stream', False) else None,
             'backfill': url_for('admin_pages.backfillevents', until=-1),
             'viewuser': url_for('admin_pages.viewuser', userid=-1),
             'jubeatsong': url_for('jubeat_pages.viewtopscores', musicid=-1) if g.config.get('support', {}).get(GameConstants.JUBEAT, False) else None,
@@ -167,8 +202,12 @@ def viewevents() -> Response:
 @jsonify
 @adminrequired
 def backfillevents(until: int) -> Dict[str, Any]:
+    events = g.data.local.network.get_events(until_id=until, limit=1000)
+    usernames, arcadenames = format_event_names(events)
     return {
-        'events': [format_event(event) for event in g.data.local.network.get_events(until_id=until, limit=1000)],
+        'events': [format_event(event) for event in events],
+        'users': usernames,
+        'arcades': arcadenames,
     }
 
 
@@ -176,13 +215,59 @@ def backfillevents(until: int) -> Dict[str, Any]:
 @jsonify
 @adminrequired
 def listevents(since: int) -> Dict[str, Any]:
+    events = g.data.local.network.get_events(since_id=since)
+    usernames, arcadenames = format_event_names(events)
     return {
-        'events': [format_event(event) for event in g.data.local.network.get_events(since_id=since)],
-        'users': {user.id: user.username for user in g.data.local.user.get_all_users()},
-        'arcades': {arcade.id: arcade.name for arcade in g.data.local.machine.get_all_arcades()},
+        'events': [format_event(event) for event in events],
+        'users': usernames,
+        'arcades': arcadenames,
     }
 
 
+@admin_pages.route('/events/stream/<int:since>')
+@adminrequired
+def streamevents(since: int) -> Response:
+    if not g.config.get('event_stream', False):
+        abort(404)
+
+    # Browsers reconnect with the last event they saw, so pick up after that one.
+    last = request.headers.get('Last-Event-ID', type=int)
+    if last is not None:
+        since = last + 1
+
+    def stream() -> Iterator[str]:
+        cursor = since
+        users: Set[UserID] = set()
+        arcades: Set[ArcadeID] = set()
+        end = time.monotonic() + EVENT_STREAM_DURATION
+
+        yield f'retry: {int(EVENT_STREAM_INTERVAL * 1000)}\n\n'
+        while True:
+            events = g.data.local.network.get_events(since_id=cursor)
+            if events:
+                cursor = max(event.id for event in events) + 1
+                usernames, arcadenames = format_event_names(events, users, arcades)
+                data = json.dumps({
+                    'events': [format_event(event) for event in events],
+                    'users': usernames,
+                    'arcades': arcadenames,
+                })
+                yield f'id: {cursor - 1}\ndata: {data}\n\n'
+            else:
+                # Keep the connection alive, and notice when the browser goes away.
+                yield ':\n\n'
+
+            if time.monotonic() >= end:
+                return
+            time.sleep(EVENT_STREAM_INTERVAL)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'X-Accel-Buffering': 'no'},
+    )
+
+
 @admin_pages.route('/api')
 @adminrequired
 def viewapi() -> Response:
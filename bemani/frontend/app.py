@@ -1,14 +1,16 @@
+import json
 import os
 import re
 import traceback
-from typing import Callable, Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Iterator, Optional, List
 from react.jsx import JSXTransformer  # type: ignore
-from flask import Flask, flash, request, redirect, Response, url_for, send_file, render_template, got_request_exception, jsonify as flask_jsonify
-from flask_caching import Cache  # type: ignore
+from flask import Flask, flash, request, redirect, Response, url_for, send_file, send_from_directory, render_template, got_request_exception, jsonify as flask_jsonify
 from functools import wraps
 
 from bemani.common import AESCipher, GameConstants
 from bemani.data import Data
+from bemani.frontend.assets import COMPONENTS, compiled_location, components as jsx_components, load_manifest
+from bemani.frontend.cache import FrontendCache
 from bemani.frontend.types import g
 from bemani.frontend.templates import templates_location
 from bemani.frontend.static import static_location
@@ -19,16 +21,19 @@ app = Flask(
     static_folder=static_location,
 )
 config: Dict[str, Any] = {}
+cache: Optional[FrontendCache] = None
+manifest: Optional[Dict[str, str]] = None
 
 
 @app.before_request
 def before_request() -> None:
     global config
-    g.cache = Cache(app, config={
-        'CACHE_TYPE': 'filesystem',
-        'CACHE_DIR': config['cache_dir'],
-    })
-    if request.endpoint in ['jsx', 'static']:
+    global cache
+    if cache is None:
+        # Created once per process so the in-process tier is shared between requests
+        cache = FrontendCache(app, config)
+    g.cache = cache
+    if request.endpoint in ['jsx', 'compiled', 'static']:
         # This is just serving cached compiled frontends, skip loading from DB
         return
 
@@ -100,10 +105,33 @@ def loginprohibited(func: Callable) -> Callable:
     return decoratedfunction
 
 
+def stream_json(data: Dict[str, Any], batch: int=500) -> Iterator[str]:
+    """
+    Encode a JSON response a piece at a time, so that large lists such as network
+    records are sent to the browser as they are encoded instead of after building
+    one giant string. Lists are encoded in batches so the C encoder does most of
+    the work.
+    """
+    yield '{'
+    for i, (key, value) in enumerate(data.items()):
+        yield f'{"," if i > 0 else ""}{json.dumps(str(key))}:'
+        if isinstance(value, list):
+            yield '['
+            for start in range(0, len(value), batch):
+                chunk = json.dumps(value[start:(start + batch)], separators=(',', ':'))
+                yield f'{"," if start > 0 else ""}{chunk[1:-1]}'
+            yield ']'
+        else:
+            yield json.dumps(value, separators=(',', ':'))
+    yield '}'
+
+
 def jsonify(func: Callable) -> Callable:
     @wraps(func)
     def decoratedfunction(*args: Any, **kwargs: Any) -> Response:
         try:
+            if request.args.get('stream', type=int):
+                return Response(stream_json(func(*args, **kwargs)), mimetype='application/json')
             return flask_jsonify(func(*args, **kwargs))
         except Exception as e:
             print(traceback.format_exc())
@@ -132,16 +160,44 @@ def jsx(filename: str) -> Response:
     jsxfile = os.path.join(static_location, filename)
     mtime = os.path.getmtime(jsxfile)
     namespace = f'{mtime}.{jsxfile}'
-    jsx = g.cache.get(namespace)
+    jsx = g.cache.get('jsx', namespace)
     if jsx is None:
         with open(jsxfile, 'rb') as f:
             transformer = JSXTransformer()
             jsx = transformer.transform_string(f.read().decode('utf-8'))
         # Set the cache to one year, since we namespace on this file's update time
-        g.cache.set(namespace, jsx, timeout=86400 * 365)
+        g.cache.set('jsx', namespace, jsx, timeout=86400 * 365)
     return Response(jsx, mimetype='application/javascript')
 
 
+@app.route('/compiled/<path:filename>')
+@cacheable(86400 * 365)
+def compiled(filename: str) -> Response:
+    # Compiled files are named after their contents, so they will never change
+    response = send_from_directory(compiled_location, filename, mimetype='application/javascript')
+    response.cache_control.immutable = True
+    return response
+
+
+def jsx_manifest() -> Dict[str, str]:
+    global manifest
+    if manifest is None:
+        # Loaded once per process, since it only changes when the frontend is deployed
+        manifest = load_manifest()
+    return manifest
+
+
+def jsx_url(filename: str) -> str:
+    """
+    Returns the URL to load a JSX file from, preferring the precompiled version
+    of it if the frontend's static assets were built ahead of time.
+    """
+    compiled = jsx_manifest().get(filename)
+    if compiled is not None:
+        return url_for('compiled', filename=compiled)
+    return url_for('jsx', filename=filename)
+
+
 @app.route('/images/jubeat/emblem/<path:imagename>')
 @cacheable(86400)
 def emblem_images(imagename: str) -> Response:
@@ -167,7 +223,7 @@ def render_react(
         'react.html',
         **{
             'title': title,
-            'reactbase': os.path.join('controllers', controller),
+            'reactbase': jsx_url(os.path.join('controllers', controller)),
             'inits': inits,
             'links': links,
         },
@@ -242,12 +298,12 @@ def valid_pin(pin: str, type: str) -> bool:
 
 @app.context_processor
 def navigation() -> Dict[str, Any]:
-    # Look up JSX components we should provide for every page load
-    components = [
-        os.path.join('components', f)
-        for f in os.listdir(os.path.join(static_location, 'components'))
-        if re.search(r'\.react\.js$', f)
-    ]
+    # Look up JSX components we should provide for every page load, which are
+    # bundled into a single script if they were built ahead of time
+    if COMPONENTS in jsx_manifest():
+        components = [jsx_url(COMPONENTS)]
+    else:
+        components = [jsx_url(f) for f in jsx_components()]
 
     # Define useful functions for jnija2
     def jinja2_any(lval: Optional[List[Any]], pull: str, equals: str) -> bool:
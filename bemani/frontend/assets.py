@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+from react.jsx import JSXTransformer  # type: ignore
+
+from bemani.frontend.static import static_location
+
+try:
+    # If a minifier is installed, we can shrink what we send to browsers.
+    from rjsmin import jsmin  # type: ignore
+except ImportError:
+    def jsmin(script: str) -> str:
+        return script
+
+
+"""
+Directory that precompiled frontend scripts and their manifest are written to.
+"""
+compiled_location = os.path.join(static_location, 'compiled')
+
+"""
+Name of the manifest entry for the bundle of every shared component.
+"""
+COMPONENTS = 'components'
+
+
+def _compile(transformer: JSXTransformer, filename: str) -> str:
+    with open(os.path.join(static_location, filename), 'rb') as f:
+        return transformer.transform_string(f.read().decode('utf-8'))
+
+
+def _write(filename: str, script: str) -> str:
+    # Name the file after its contents, so it can be cached forever by browsers.
+    data = script.encode('utf-8')
+    base, ext = os.path.splitext(filename)
+    compiled = f'{base}.{hashlib.sha256(data).hexdigest()[:16]}{ext}'
+
+    path = os.path.join(compiled_location, compiled)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return compiled
+
+
+def components() -> List[str]:
+    """
+    Returns the filenames of all shared JSX components, relative to the static directory.
+    """
+    return sorted(
+        os.path.join('components', f)
+        for f in os.listdir(os.path.join(static_location, 'components'))
+        if f.endswith('.react.js')
+    )
+
+
+def build_assets() -> Dict[str, str]:
+    """
+    Precompile every JSX controller, and bundle all shared components into one
+    script, minifying them if possible. Compiled scripts are written with a hash
+    of their contents in their name, and a manifest mapping source filenames to
+    compiled filenames is written alongside them. Scripts from older builds are
+    left in place so that pages rendered before a deploy keep working.
+
+    Returns:
+        The manifest that was written.
+    """
+    transformer = JSXTransformer()
+    manifest: Dict[str, str] = {}
+
+    manifest[COMPONENTS] = _write(
+        f'{COMPONENTS}.js',
+        jsmin('\n'.join(_compile(transformer, filename) for filename in components())),
+    )
+
+    controllers = os.path.join(static_location, 'controllers')
+    for dirpath, _, filenames in os.walk(controllers):
+        for f in sorted(filenames):
+            if not f.endswith('.react.js'):
+                continue
+            filename = os.path.relpath(os.path.join(dirpath, f), static_location)
+            manifest[filename] = _write(filename, jsmin(_compile(transformer, filename)))
+
+    with open(os.path.join(compiled_location, 'manifest.json'), 'w') as mf:
+        json.dump(manifest, mf, indent=4, sort_keys=True)
+    return manifest
+
+
+def load_manifest() -> Dict[str, str]:
+    """
+    Load the manifest written by build_assets().
+
+    Returns:
+        A dictionary mapping source filenames to compiled filenames, or an empty
+        dictionary if nothing was precompiled.
+    """
+    try:
+        with open(os.path.join(compiled_location, 'manifest.json'), 'r') as mf:
+            return json.load(mf)
+    except FileNotFoundError:
+        return {}
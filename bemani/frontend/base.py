@@ -2,10 +2,9 @@
 import copy
 from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
-from flask_caching import Cache  # type: ignore
-
-from bemani.common import ValidatedDict, ID
+from bemani.common import ValidatedDict, ID, Time
 from bemani.data import Data, Score, Attempt, Link, Song, UserID, RemoteUser
+from bemani.frontend.cache import FrontendCache
 
 
 class FrontendBase:
@@ -33,7 +32,7 @@ class FrontendBase:
     """
     valid_rival_types: List[str] = []
 
-    def __init__(self, data: Data, config: Dict[str, Any], cache: Cache) -> None:
+    def __init__(self, data: Data, config: Dict[str, Any], cache: FrontendCache) -> None:
         self.data = data
         self.config = config
         self.cache = cache
@@ -58,6 +57,7 @@ class FrontendBase:
 
     def format_attempt(self, userid: UserID, attempt: Attempt) -> Dict[str, Any]:
         return {
+            'id': attempt.key,
             'userid': str(userid),
             'songid': attempt.id,
             'chart': attempt.chart,
@@ -91,13 +91,6 @@ class FrontendBase:
     def merge_song(self, existing: Dict[str, Any], new: Song) -> Dict[str, Any]:
         return existing
 
-    def round_to_ten(self, elems: List[Any]) -> List[Any]:
-        num = len(elems)
-        if num % 10 == 0:
-            return elems
-        else:
-            return elems[:-(num % 10)]
-
     def all_games(self) -> Iterator[Tuple[str, int, str]]:
         """
         Override this to return an interator based on a game series factory.
@@ -105,7 +98,7 @@ class FrontendBase:
 
     def get_all_songs(self, force_db_load: bool=False) -> Dict[int, Dict[str, Any]]:
         if not force_db_load:
-            cached_songs = self.cache.get(f'{self.game}.sorted_songs')
+            cached_songs = self.cache.get(self.game, 'sorted_songs')
             if cached_songs is not None:
                 return cached_songs
 
@@ -120,30 +113,52 @@ class FrontendBase:
             else:
                 songs[song.id] = self.merge_song(songs[song.id], song)
 
-        self.cache.set(f'{self.game}.sorted_songs', songs, timeout=600)
+        if force_db_load:
+            # Make sure other processes pick up the new song list instead of waiting
+            # for their own copy to expire.
+            self.cache.invalidate(self.game)
+        self.cache.set(self.game, 'sorted_songs', songs, timeout=600)
         return songs
 
     def get_all_player_info(self, userids: List[UserID], limit: Optional[int]=None, allow_remote: bool=False) -> Dict[UserID, Dict[int, Dict[str, Any]]]:
         info: Dict[UserID, Dict[int, Dict[str, Any]]] = {}
-        playstats: Dict[UserID, ValidatedDict] = {}
 
         # Find all versions of the users' profiles, sorted newest to oldest.
         versions = sorted([version for (game, version, name) in self.all_games()], reverse=True)
+
+        # Local profiles can be looked up all at once, remote ones need to be asked for individually.
+        profiles = self.data.local.user.get_all_versions_of_profiles(
+            self.game,
+            [userid for userid in userids if not RemoteUser.is_remote(userid)],
+        )
+        if allow_remote:
+            for userid in userids:
+                if not RemoteUser.is_remote(userid):
+                    continue
+
+                profiles[userid] = {}
+                userlimit = limit
+                for version in versions:
+                    profile = self.data.remote.user.get_profile(self.game, version, userid)
+                    if profile is not None:
+                        profiles[userid][version] = profile
+                        if userlimit is not None:
+                            userlimit = userlimit - 1
+                            if userlimit == 0:
+                                break
+
+        playstats = self.data.local.game.get_settings_for_users(
+            self.game,
+            [userid for userid in userids if profiles.get(userid)],
+        )
+
         for userid in userids:
             info[userid] = {}
             userlimit = limit
             for version in versions:
-                if allow_remote:
-                    profile = self.data.remote.user.get_profile(self.game, version, userid)
-                else:
-                    profile = self.data.local.user.get_profile(self.game, version, userid)
+                profile = profiles.get(userid, {}).get(version)
                 if profile is not None:
-                    if userid not in playstats:
-                        stats = self.data.local.game.get_settings(self.game, userid)
-                        if stats is None:
-                            stats = ValidatedDict()
-                        playstats[userid] = stats
-                    info[userid][version] = self.format_profile(profile, playstats[userid])
+                    info[userid][version] = self.format_profile(profile, playstats.get(userid, ValidatedDict()))
                     info[userid][version]['remote'] = RemoteUser.is_remote(userid)
                     # Exit out if we've hit the limit
                     if userlimit is not None:
@@ -174,12 +189,26 @@ class FrontendBase:
 
         return self.get_latest_player_info(list(userids))
 
-    def get_network_scores(self, limit: Optional[int]=None) -> Dict[str, Any]:
+    def get_network_scores(
+        self,
+        limit: Optional[int]=None,
+        since_id: Optional[int]=None,
+        until_id: Optional[int]=None,
+    ) -> Dict[str, Any]:
         userids: List[UserID] = []
 
-        # Find all attempts across all games
+        # Find all attempts across all games. Only players who made one of these attempts
+        # are returned, so callers paging through attempts should merge players as well.
+        # Score feeds page by attempt key, so always look attempts up in key order, even
+        # for the first page, or attempts between pages could be skipped.
         attempts = [
-            attempt for attempt in self.data.local.music.get_all_attempts(game=self.game, version=self.version, limit=limit)
+            attempt for attempt in self.data.local.music.get_all_attempts(
+                game=self.game,
+                version=self.version,
+                limit=limit,
+                since_id=since_id if since_id is not None else 0,
+                until_id=until_id,
+            )
             if attempt[0] is not None
         ]
         for attempt in attempts:
@@ -195,18 +224,51 @@ class FrontendBase:
             'players': self.get_latest_player_info(userids),
         }
 
-    def get_network_records(self) -> Dict[str, Any]:
+    def get_network_records(
+        self,
+        songids: Optional[List[int]]=None,
+        chart: Optional[int]=None,
+        userids: Optional[List[UserID]]=None,
+        since: Optional[int]=None,
+        after: Optional[Tuple[int, int, int]]=None,
+        limit: Optional[int]=None,
+    ) -> Dict[str, Any]:
         records: Dict[str, Tuple[UserID, Score]] = {}
-        userids: List[UserID] = []
-
-        # Find all high-scores across all games
-        highscores = self.data.local.music.get_all_records(game=self.game, version=self.version)
+        players: List[UserID] = []
+
+        # Grab the time before looking anything up, so that callers polling with it as
+        # since don't miss records set while we were building this response.
+        timestamp = Time.now()
+
+        if songids is not None:
+            # Records for a song can also come from a duplicate of it (revivals, omnimix,
+            # etc), so look those up as well.
+            wanted = set(songids)
+            for songid in self.get_all_songs():
+                for songchart in self.valid_charts:
+                    alternate = self.get_duplicate_id(songid, songchart)
+                    if alternate is not None and alternate[0] in wanted:
+                        wanted.add(songid)
+            songids = sorted(wanted)
+
+        # Find all high-scores across all games. Only players holding one of these records
+        # are returned, so callers paging through records should merge players as well.
+        highscores = self.data.local.music.get_all_records(
+            game=self.game,
+            version=self.version,
+            userlist=userids,
+            songids=songids,
+            songchart=chart,
+            since=since,
+            after=after,
+            limit=limit,
+        )
         for score in highscores:
             index = self.make_index(score[1].id, score[1].chart)
             if index not in records:
                 records[index] = score
-                if score[0] not in userids:
-                    userids.append(score[0])
+                if score[0] not in players:
+                    players.append(score[0])
             # Also take care of duplicate IDs (revivals, omnimix, etc)
             alternate = self.get_duplicate_id(score[1].id, score[1].chart)
             if alternate is not None:
@@ -217,8 +279,8 @@ class FrontendBase:
                     newscore[1].id = altid
                     newscore[1].chart = altchart
                     records[index] = newscore
-        players = self.get_latest_player_info(userids)
-        for i in list(players.values()):
+        playerinfo = self.get_latest_player_info(players)
+        for i in list(playerinfo.values()):
             i['common_chart'] = []
             i['pick_up_chart'] = []
             i['emblem'] = {}
@@ -226,13 +288,32 @@ class FrontendBase:
             'records': [
                 self.format_score(records[index][0], records[index][1]) for index in records
             ],
-            'players': players,
+            'players': playerinfo,
+            'timestamp': timestamp,
+            # Where the next page starts, or None if this was the last one.
+            'after': (
+                [highscores[-1][1].id, highscores[-1][1].chart, highscores[-1][1].key]
+                if limit is not None and len(highscores) == limit else None
+            ),
         }
 
-    def get_scores(self, userid: UserID, limit: Optional[int]=None) -> List[Dict[str, Any]]:
-        # Find all attempts across all games
+    def get_scores(
+        self,
+        userid: UserID,
+        limit: Optional[int]=None,
+        since_id: Optional[int]=None,
+        until_id: Optional[int]=None,
+    ) -> List[Dict[str, Any]]:
+        # Find all attempts across all games, in key order like get_network_scores()
         attempts = [
-            attempt for attempt in self.data.local.music.get_all_attempts(game=self.game, version=self.version, userid=userid, limit=limit)
+            attempt for attempt in self.data.local.music.get_all_attempts(
+                game=self.game,
+                version=self.version,
+                userid=userid,
+                limit=limit,
+                since_id=since_id if since_id is not None else 0,
+                until_id=until_id,
+            )
             if attempt[0] is not None
         ]
 
@@ -242,7 +323,12 @@ class FrontendBase:
             key=lambda attempt: (attempt['timestamp'], attempt['songid'], attempt['chart']),
         )
 
-    def get_records(self, userid: UserID) -> List[Dict[str, Any]]:
+    def get_records(
+        self,
+        userid: UserID,
+        chart: Optional[int]=None,
+        since: Optional[int]=None,
+    ) -> List[Dict[str, Any]]:
         records: Dict[str, Tuple[UserID, Score]] = {}
 
         # Find all high-scores across all games
@@ -275,10 +361,21 @@ class FrontendBase:
                     newscore[1].chart = altchart
                     records[newindex] = newscore
 
-        return [self.format_score(None, records[index][1]) for index in records]
+        # Personal records are built from every score a player has, so there's nothing
+        # to gain from paging them. Callers polling for changes can still narrow them down.
+        return [
+            self.format_score(None, records[index][1]) for index in records
+            if (chart is None or records[index][1].chart == chart) and
+            (since is None or records[index][1].update >= since)
+        ]
 
-    def get_top_scores(self, musicid: int) -> Dict[str, Any]:
-        scores = self.data.local.music.get_all_scores(game=self.game, version=self.version, songid=musicid)
+    def get_top_scores(self, musicid: int, chart: Optional[int]=None) -> Dict[str, Any]:
+        scores = self.data.local.music.get_all_scores(
+            game=self.game,
+            version=self.version,
+            songid=musicid,
+            songchart=chart,
+        )
         userids: List[UserID] = []
         for score in scores:
             if score[1].chart not in self.valid_charts:
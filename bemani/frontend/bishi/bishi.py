@@ -2,19 +2,18 @@
 import copy
 from typing import Any, Dict, Iterator, Tuple
 
-from flask_caching import Cache  # type: ignore
-
 from bemani.backend.bishi import BishiBashiFactory
 from bemani.common import ValidatedDict, ID, GameConstants
 from bemani.data import Data
 from bemani.frontend.base import FrontendBase
+from bemani.frontend.cache import FrontendCache
 
 
 class BishiBashiFrontend(FrontendBase):
 
     game = GameConstants.BISHI_BASHI
 
-    def __init__(self, data: Data, config: Dict[str, Any], cache: Cache) -> None:
+    def __init__(self, data: Data, config: Dict[str, Any], cache: FrontendCache) -> None:
         super().__init__(data, config, cache)
         self.machines: Dict[int, str] = {}
 
@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Any, Dict, Final, Hashable, Optional, Tuple
+
+from flask import Flask
+from flask_caching import Cache
+
+from bemani.data.mysql.base import DataCache
+
+
+class FrontendCache:
+    """
+    A cache for objects that the frontend builds out of the DB, such as song lists.
+    This is meant to be created once per process. Lookups check a bounded in-process
+    tier first and then a tier shared between processes, which can be any Flask-Caching
+    backend such as files in cache_dir, redis or memcached. Keys are grouped into
+    namespaces, and invalidating a namespace bumps its version in the shared tier so
+    that every process drops what it has cached for that namespace.
+
+    Objects are not copied going in or out of the in-process tier, so callers must
+    treat anything they get back as read-only.
+    """
+
+    LOCAL_SIZE: Final[int] = 256
+    LOCAL_TTL: Final[float] = 60.0
+    POLL_INTERVAL: Final[float] = 5.0
+
+    def __init__(self, app: Flask, config: Dict[str, Any]) -> None:
+        """
+        Initialize the cache.
+
+        Parameters:
+            app - The Flask app, which Flask-Caching needs to set up the shared tier.
+            config - Server configuration. If it has a 'cache' section, that is passed
+                     as-is to Flask-Caching. Otherwise, files in cache_dir are used.
+        """
+        self.shared = Cache(app, config=config.get('cache', {
+            'CACHE_TYPE': 'FileSystemCache',
+            'CACHE_DIR': config['cache_dir'],
+        }))
+        self.__lock = threading.Lock()
+        self.__local: Dict[str, DataCache] = {}
+        self.__versions: Dict[str, int] = {}
+
+    def __shared_version(self, namespace: str) -> int:
+        version = self.shared.get(f'{namespace}.version')
+        if version is None:
+            # The shared tier may have pruned the version even though it never expires, so
+            # start from the current time rather than zero. That way a namespace can never
+            # go back to a version that still has stale objects cached under it.
+            self.shared.add(f'{namespace}.version', time.time_ns(), timeout=0)
+            version = self.shared.get(f'{namespace}.version') or time.time_ns()
+        return version
+
+    def __namespace(self, namespace: str) -> Tuple[DataCache, int]:
+        with self.__lock:
+            local = self.__local.get(namespace)
+            if local is None:
+                local = DataCache(
+                    namespace,
+                    size=self.LOCAL_SIZE,
+                    ttl=self.LOCAL_TTL,
+                    poll_interval=self.POLL_INTERVAL,
+                    copy=False,
+                )
+                self.__local[namespace] = local
+
+        if local.needs_poll():
+            version = self.__shared_version(namespace)
+            self.__versions[namespace] = version
+            local.set_version(version)
+        return local, self.__versions.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """
+        Look up an object by namespace and key.
+
+        Returns:
+            The object, or None if it isn't cached.
+        """
+        local, version = self.__namespace(namespace)
+        found, value = local.get(key)
+        if found:
+            return value
+
+        value = self.shared.get(f'{namespace}.{version}.{key}')
+        if value is not None:
+            local.put(key, value)
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, timeout: Optional[int]=None) -> None:
+        """
+        Cache an object by namespace and key, for up to timeout seconds.
+        """
+        local, version = self.__namespace(namespace)
+        self.shared.set(f'{namespace}.{version}.{key}', value, timeout=timeout)
+        local.put(key, value)
+
+    def invalidate(self, namespace: str) -> None:
+        """
+        Drop everything in a namespace, in this process right away and in all other
+        processes the next time they check the namespace version.
+        """
+        local, _ = self.__namespace(namespace)
+        version = self.__shared_version(namespace) + 1
+        self.shared.set(f'{namespace}.version', version, timeout=0)
+        self.__versions[namespace] = version
+        local.set_version(version)
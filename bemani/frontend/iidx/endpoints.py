@@ -3,7 +3,7 @@ import re
 from typing import Any, Dict
 from flask import Blueprint, request, Response, url_for, abort
 
-from bemani.common import ID, GameConstants
+from bemani.common import ID, GameConstants, Time
 from bemani.data import UserID
 from bemani.frontend.app import loginrequired, jsonify, render_react
 from bemani.frontend.iidx.iidx import IIDXFrontend
@@ -26,8 +26,6 @@ def viewnetworkscores() -> Response:
     # Only load the last 100 results for the initial fetch, so we can render faster
     frontend = IIDXFrontend(g.data, g.config, g.cache)
     network_scores = frontend.get_network_scores(limit=100)
-    if len(network_scores['attempts']) > 10:
-        network_scores['attempts'] = frontend.round_to_ten(network_scores['attempts'])
 
     return render_react(
         'Global IIDX Scores',
@@ -41,19 +39,28 @@ def viewnetworkscores() -> Response:
             'shownewrecords': False,
         },
         {
-            'refresh': url_for('iidx_pages.listnetworkscores'),
+            'refresh': url_for('iidx_pages.listnetworkscores', since=-1),
+            'backfill': url_for('iidx_pages.backfillnetworkscores', until=-1),
             'player': url_for('iidx_pages.viewplayer', userid=-1),
             'individual_score': url_for('iidx_pages.viewtopscores', musicid=-1),
         },
     )
 
 
-@iidx_pages.route('/scores/list')
+@iidx_pages.route('/scores/list/<int:since>')
 @jsonify
 @loginrequired
-def listnetworkscores() -> Dict[str, Any]:
+def listnetworkscores(since: int) -> Dict[str, Any]:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
-    return frontend.get_network_scores()
+    return frontend.get_network_scores(since_id=since)
+
+
+@iidx_pages.route('/scores/backfill/<int:until>')
+@jsonify
+@loginrequired
+def backfillnetworkscores(until: int) -> Dict[str, Any]:
+    frontend = IIDXFrontend(g.data, g.config, g.cache)
+    return frontend.get_network_scores(limit=1000, until_id=until)
 
 
 @iidx_pages.route('/scores/<int:userid>')
@@ -65,8 +72,6 @@ def viewscores(userid: UserID) -> Response:
         abort(404)
 
     scores = frontend.get_scores(userid, limit=100)
-    if len(scores) > 10:
-        scores = frontend.round_to_ten(scores)
 
     return render_react(
         f'dj {djinfo["name"]}\'s IIDX Scores',
@@ -80,20 +85,32 @@ def viewscores(userid: UserID) -> Response:
             'shownewrecords': True,
         },
         {
-            'refresh': url_for('iidx_pages.listscores', userid=userid),
+            'refresh': url_for('iidx_pages.listscores', userid=userid, since=-1),
+            'backfill': url_for('iidx_pages.backfillscores', userid=userid, until=-1),
             'player': url_for('iidx_pages.viewplayer', userid=-1),
             'individual_score': url_for('iidx_pages.viewtopscores', musicid=-1),
         },
     )
 
 
-@iidx_pages.route('/scores/<int:userid>/list')
+@iidx_pages.route('/scores/<int:userid>/list/<int:since>')
+@jsonify
+@loginrequired
+def listscores(userid: UserID, since: int) -> Dict[str, Any]:
+    frontend = IIDXFrontend(g.data, g.config, g.cache)
+    return {
+        'attempts': frontend.get_scores(userid, since_id=since),
+        'players': {},
+    }
+
+
+@iidx_pages.route('/scores/<int:userid>/backfill/<int:until>')
 @jsonify
 @loginrequired
-def listscores(userid: UserID) -> Dict[str, Any]:
+def backfillscores(userid: UserID, until: int) -> Dict[str, Any]:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
     return {
-        'attempts': frontend.get_scores(userid),
+        'attempts': frontend.get_scores(userid, limit=1000, until_id=until),
         'players': {},
     }
 
@@ -102,19 +119,19 @@ def listscores(userid: UserID) -> Dict[str, Any]:
 @loginrequired
 def viewnetworkrecords() -> Response:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
-    network_records = frontend.get_network_records()
-
     return render_react(
         'Global IIDX Records',
         'iidx/records.react.js',
         {
-            'records': network_records['records'],
+            'records': [],
             'songs': frontend.get_all_songs(),
-            'players': network_records['players'],
+            'players': {},
             'versions': {version: name for (game, version, name) in frontend.all_games()},
             'showdjnames': True,
             'showpersonalsort': False,
             'filterempty': False,
+            'loadrecords': True,
+            'timestamp': Time.now(),
         },
         {
             'refresh': url_for('iidx_pages.listnetworkrecords'),
@@ -129,7 +146,15 @@ def viewnetworkrecords() -> Response:
 @loginrequired
 def listnetworkrecords() -> Dict[str, Any]:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
-    return frontend.get_network_records()
+    after = request.args.getlist('after', type=int)
+    return frontend.get_network_records(
+        songids=request.args.getlist('songid', type=int) or None,
+        chart=request.args.get('chart', type=int),
+        userids=[UserID(userid) for userid in request.args.getlist('userid', type=int)] or None,
+        since=request.args.get('since', type=int),
+        after=(after[0], after[1], after[2]) if len(after) == 3 else None,
+        limit=request.args.get('limit', type=int),
+    )
 
 
 @iidx_pages.route('/records/<int:userid>')
@@ -139,6 +164,8 @@ def viewrecords(userid: UserID) -> Response:
     djinfo = frontend.get_latest_player_info([userid]).get(userid)
     if djinfo is None:
         abort(404)
+    # Take this before looking up records so polling for changes can't miss any.
+    timestamp = Time.now()
 
     return render_react(
         f'dj {djinfo["name"]}\'s IIDX Records',
@@ -151,6 +178,8 @@ def viewrecords(userid: UserID) -> Response:
             'showdjnames': False,
             'showpersonalsort': True,
             'filterempty': True,
+            'loadrecords': False,
+            'timestamp': timestamp,
         },
         {
             'refresh': url_for('iidx_pages.listrecords', userid=userid),
@@ -165,9 +194,15 @@ def viewrecords(userid: UserID) -> Response:
 @loginrequired
 def listrecords(userid: UserID) -> Dict[str, Any]:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
+    timestamp = Time.now()
     return {
-        'records': frontend.get_records(userid),
+        'records': frontend.get_records(
+            userid,
+            chart=request.args.get('chart', type=int),
+            since=request.args.get('since', type=int),
+        ),
         'players': {},
+        'timestamp': timestamp,
     }
 
 
@@ -227,7 +262,7 @@ def viewtopscores(musicid: int) -> Response:
 @loginrequired
 def listtopscores(musicid: int) -> Dict[str, Any]:
     frontend = IIDXFrontend(g.data, g.config, g.cache)
-    return frontend.get_top_scores(musicid)
+    return frontend.get_top_scores(musicid, chart=request.args.get('chart', type=int))
 
 
 @iidx_pages.route('/players')
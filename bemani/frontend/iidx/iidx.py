@@ -1,12 +1,11 @@
 # vim: set fileencoding=utf-8
 from typing import Any, Dict, Iterator, Optional, Tuple
 
-from flask_caching import Cache  # type: ignore
-
 from bemani.backend.iidx import IIDXFactory, IIDXBase
 from bemani.common import ValidatedDict, GameConstants
 from bemani.data import Attempt, Data, Score, Song, UserID
 from bemani.frontend.base import FrontendBase
+from bemani.frontend.cache import FrontendCache
 
 
 class IIDXFrontend(FrontendBase):
@@ -27,7 +26,7 @@ class IIDXFrontend(FrontendBase):
         'dp_rival',
     ]
 
-    def __init__(self, data: Data, config: Dict[str, Any], cache: Cache) -> None:
+    def __init__(self, data: Data, config: Dict[str, Any], cache: FrontendCache) -> None:
         super().__init__(data, config, cache)
         self.machines: Dict[int, str] = {}
 
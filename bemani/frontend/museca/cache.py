@@ -1,9 +1,8 @@
 from typing import Dict, Any
 
-from flask_caching import Cache  # type: ignore
-
 from bemani.data import Data
 from bemani.frontend.app import app
+from bemani.frontend.cache import FrontendCache
 from bemani.frontend.museca.museca import MusecaFrontend
 
 
@@ -11,9 +10,6 @@ class MusecaCache:
 
     @classmethod
     def preload(cls, data: Data, config: Dict[str, Any]) -> None:
-        cache = Cache(app, config={
-            'CACHE_TYPE': 'filesystem',
-            'CACHE_DIR': config['cache_dir'],
-        })
+        cache = FrontendCache(app, config)
         frontend = MusecaFrontend(data, config, cache)
         frontend.get_all_songs(force_db_load=True)
@@ -1,12 +1,11 @@
 # vim: set fileencoding=utf-8
 from typing import Any, Dict, Iterator, Tuple
 
-from flask_caching import Cache  # type: ignore
-
 from bemani.backend.museca import MusecaFactory, MusecaBase
 from bemani.common import GameConstants, VersionConstants, DBConstants, ValidatedDict
 from bemani.data import Attempt, Data, Score, Song, UserID
 from bemani.frontend.base import FrontendBase
+from bemani.frontend.cache import FrontendCache
 
 
 class MusecaFrontend(FrontendBase):
@@ -19,7 +18,7 @@ class MusecaFrontend(FrontendBase):
         MusecaBase.CHART_TYPE_RED,
     ]
 
-    def __init__(self, data: Data, config: Dict[str, Any], cache: Cache) -> None:
+    def __init__(self, data: Data, config: Dict[str, Any], cache: FrontendCache) -> None:
         super().__init__(data, config, cache)
 
     def all_games(self) -> Iterator[Tuple[str, int, str]]:
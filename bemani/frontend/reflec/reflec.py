@@ -1,12 +1,11 @@
 # vim: set fileencoding=utf-8
 from typing import Any, Dict, Iterator, Tuple
 
-from flask_caching import Cache  # type: ignore
-
 from bemani.backend.reflec import ReflecBeatFactory, ReflecBeatBase
 from bemani.common import GameConstants, ValidatedDict
 from bemani.data import Attempt, Data, Score, Song, UserID
 from bemani.frontend.base import FrontendBase
+from bemani.frontend.cache import FrontendCache
 
 
 class ReflecBeatFrontend(FrontendBase):
@@ -26,7 +25,7 @@ class ReflecBeatFrontend(FrontendBase):
         'rival',
     ]
 
-    def __init__(self, data: Data, config: Dict[str, Any], cache: Cache) -> None:
+    def __init__(self, data: Data, config: Dict[str, Any], cache: FrontendCache) -> None:
         super().__init__(data, config, cache)
 
     def all_games(self) -> Iterator[Tuple[str, int, str]]:
@@ -3,7 +3,7 @@ import re
 from typing import Any, Dict
 from flask import Blueprint, request, Response, url_for, abort
 
-from bemani.common import ID, GameConstants, VersionConstants
+from bemani.common import ID, GameConstants, VersionConstants, Time
 from bemani.data import UserID
 from bemani.frontend.app import loginrequired, jsonify, render_react
 from bemani.frontend.sdvx.sdvx import SoundVoltexFrontend
@@ -27,8 +27,6 @@ def viewnetworkscores() -> Response:
     # Only load the last 100 results for the initial fetch, so we can render faster
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
     network_scores = frontend.get_network_scores(limit=100)
-    if len(network_scores['attempts']) > 10:
-        network_scores['attempts'] = frontend.round_to_ten(network_scores['attempts'])
 
     return render_react(
         'Global SDVX Scores',
@@ -41,19 +39,28 @@ def viewnetworkscores() -> Response:
             'shownewrecords': False,
         },
         {
-            'refresh': url_for('sdvx_pages.listnetworkscores'),
+            'refresh': url_for('sdvx_pages.listnetworkscores', since=-1),
+            'backfill': url_for('sdvx_pages.backfillnetworkscores', until=-1),
             'player': url_for('sdvx_pages.viewplayer', userid=-1),
             'individual_score': url_for('sdvx_pages.viewtopscores', musicid=-1),
         },
     )
 
 
-@sdvx_pages.route('/scores/list')
+@sdvx_pages.route('/scores/list/<int:since>')
 @jsonify
 @loginrequired
-def listnetworkscores() -> Dict[str, Any]:
+def listnetworkscores(since: int) -> Dict[str, Any]:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
-    return frontend.get_network_scores()
+    return frontend.get_network_scores(since_id=since)
+
+
+@sdvx_pages.route('/scores/backfill/<int:until>')
+@jsonify
+@loginrequired
+def backfillnetworkscores(until: int) -> Dict[str, Any]:
+    frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
+    return frontend.get_network_scores(limit=1000, until_id=until)
 
 
 @sdvx_pages.route('/scores/<int:userid>')
@@ -65,8 +72,6 @@ def viewscores(userid: UserID) -> Response:
         abort(404)
 
     scores = frontend.get_scores(userid, limit=100)
-    if len(scores) > 10:
-        scores = frontend.round_to_ten(scores)
 
     return render_react(
         f'{info["name"]}\'s SDVX Scores',
@@ -79,20 +84,32 @@ def viewscores(userid: UserID) -> Response:
             'shownewrecords': True,
         },
         {
-            'refresh': url_for('sdvx_pages.listscores', userid=userid),
+            'refresh': url_for('sdvx_pages.listscores', userid=userid, since=-1),
+            'backfill': url_for('sdvx_pages.backfillscores', userid=userid, until=-1),
             'player': url_for('sdvx_pages.viewplayer', userid=-1),
             'individual_score': url_for('sdvx_pages.viewtopscores', musicid=-1),
         },
     )
 
 
-@sdvx_pages.route('/scores/<int:userid>/list')
+@sdvx_pages.route('/scores/<int:userid>/list/<int:since>')
 @jsonify
 @loginrequired
-def listscores(userid: UserID) -> Dict[str, Any]:
+def listscores(userid: UserID, since: int) -> Dict[str, Any]:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
     return {
-        'attempts': frontend.get_scores(userid),
+        'attempts': frontend.get_scores(userid, since_id=since),
+        'players': {},
+    }
+
+
+@sdvx_pages.route('/scores/<int:userid>/backfill/<int:until>')
+@jsonify
+@loginrequired
+def backfillscores(userid: UserID, until: int) -> Dict[str, Any]:
+    frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
+    return {
+        'attempts': frontend.get_scores(userid, limit=1000, until_id=until),
         'players': {},
     }
 
@@ -101,20 +118,21 @@ def listscores(userid: UserID) -> Dict[str, Any]:
 @loginrequired
 def viewnetworkrecords() -> Response:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
-    network_records = frontend.get_network_records()
     versions = {version: name for (game, version, name) in frontend.all_games()}
 
     return render_react(
         'Global SDVX Records',
         'sdvx/records.react.js',
         {
-            'records': network_records['records'],
+            'records': [],
             'songs': frontend.get_all_songs(),
-            'players': network_records['players'],
+            'players': {},
             'versions': versions,
             'shownames': True,
             'showpersonalsort': False,
             'filterempty': False,
+            'loadrecords': True,
+            'timestamp': Time.now(),
         },
         {
             'refresh': url_for('sdvx_pages.listnetworkrecords'),
@@ -129,7 +147,15 @@ def viewnetworkrecords() -> Response:
 @loginrequired
 def listnetworkrecords() -> Dict[str, Any]:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
-    return frontend.get_network_records()
+    after = request.args.getlist('after', type=int)
+    return frontend.get_network_records(
+        songids=request.args.getlist('songid', type=int) or None,
+        chart=request.args.get('chart', type=int),
+        userids=[UserID(userid) for userid in request.args.getlist('userid', type=int)] or None,
+        since=request.args.get('since', type=int),
+        after=(after[0], after[1], after[2]) if len(after) == 3 else None,
+        limit=request.args.get('limit', type=int),
+    )
 
 
 @sdvx_pages.route('/records/<int:userid>')
@@ -139,6 +165,8 @@ def viewrecords(userid: UserID) -> Response:
     info = frontend.get_latest_player_info([userid]).get(userid)
     if info is None:
         abort(404)
+    # Take this before looking up records so polling for changes can't miss any.
+    timestamp = Time.now()
     versions = {version: name for (game, version, name) in frontend.all_games()}
 
     return render_react(
@@ -152,6 +180,8 @@ def viewrecords(userid: UserID) -> Response:
             'shownames': False,
             'showpersonalsort': True,
             'filterempty': True,
+            'loadrecords': False,
+            'timestamp': timestamp,
         },
         {
             'refresh': url_for('sdvx_pages.listrecords', userid=userid),
@@ -166,9 +196,15 @@ def viewrecords(userid: UserID) -> Response:
 @loginrequired
 def listrecords(userid: UserID) -> Dict[str, Any]:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
+    timestamp = Time.now()
     return {
-        'records': frontend.get_records(userid),
+        'records': frontend.get_records(
+            userid,
+            chart=request.args.get('chart', type=int),
+            since=request.args.get('since', type=int),
+        ),
         'players': {},
+        'timestamp': timestamp,
     }
 
 
@@ -219,7 +255,7 @@ def viewtopscores(musicid: int) -> Response:
 @loginrequired
 def listtopscores(musicid: int) -> Dict[str, Any]:
     frontend = SoundVoltexFrontend(g.data, g.config, g.cache)
-    return frontend.get_top_scores(musicid)
+    return frontend.get_top_scores(musicid, chart=request.args.get('chart', type=int))
 
 
 @sdvx_pages.route('/players')
@@ -26,6 +26,13 @@ var event_names = {
 
 var mergehandler = new MergeManager(function(evt) { return evt.id; }, MergeManager.MERGE_POLICY_DROP);
 
+function merge_names(names, newnames) {
+    var merged = {};
+    Object.keys(names).map(function(id) { merged[id] = names[id]; });
+    Object.keys(newnames).map(function(id) { merged[id] = newnames[id]; });
+    return merged;
+}
+
 var audit_events = React.createClass({
     getInitialState: function(props) {
         return {
@@ -46,7 +53,26 @@ var audit_events = React.createClass({
 
     componentDidMount: function() {
         this.loadOldEvents();
-        this.refreshEvents();
+        if (window.EventSource && Link.get('stream')) {
+            this.streamEvents();
+        } else {
+            this.refreshEvents();
+        }
+    },
+
+    mergeEvents: function(response) {
+        this.setState({
+            events: mergehandler.add(response.events),
+            users: merge_names(this.state.users, response.users),
+            arcades: merge_names(this.state.arcades, response.arcades),
+        });
+    },
+
+    getMaxID: function() {
+        return this.state.events.reduce(function(a, b) {
+            if (!a) { return b.id; }
+            return a > b.id ? a : b.id;
+        }, 0);
     },
 
     loadOldEvents: function() {
@@ -59,9 +85,7 @@ var audit_events = React.createClass({
         AJAX.get(
             Link.get('backfill', min_id),
             function(response) {
-                this.setState({
-                    events: mergehandler.add(response.events),
-                });
+                this.mergeEvents(response);
                 // Keep loading until we grab all events
                 if (response.events.length > 0) {
                     setTimeout(this.loadOldEvents, 1);
@@ -70,20 +94,27 @@ var audit_events = React.createClass({
         );
     },
 
+    streamEvents: function() {
+        // The server pushes new events as they happen, and the browser reconnects
+        // on its own from the last event it saw whenever the stream ends.
+        var source = new EventSource(Link.get('stream', this.getMaxID() + 1));
+        source.onmessage = function(message) {
+            this.mergeEvents(JSON.parse(message.data));
+        }.bind(this);
+        source.onerror = function() {
+            if (source.readyState == EventSource.CLOSED) {
+                // The stream isn't available, so fall back to polling
+                this.refreshEvents();
+            }
+        }.bind(this);
+    },
+
     refreshEvents: function() {
-        var max_id = this.state.events.reduce(function(a, b) {
-            if (!a) { return b.id; }
-            return a > b.id ? a : b.id;
-        }, 0);
         AJAX.get(
-            Link.get('refresh', max_id),
+            Link.get('refresh', this.getMaxID()),
             function(response) {
-                this.setState({
-                    events: mergehandler.add(response.events),
-                    users: response.users,
-                    arcades: response.arcades,
-                });
-                // Refresh every 15 seconds
+                this.mergeEvents(response);
+                // Refresh every 5 seconds
                 setTimeout(this.refreshEvents, 5000);
             }.bind(this)
         );
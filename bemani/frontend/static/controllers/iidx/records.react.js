@@ -1,5 +1,29 @@
 /*** @jsx React.DOM */
 
+// Network records are loaded for songs as they are shown, this many songs at a time.
+var records_batch = 100;
+// Sorting by popularity needs every record, which is loaded this many records at a time.
+var records_page = 1000;
+
+function merge_players(players, newplayers) {
+    var merged = {};
+    Object.keys(players).map(function(userid) { merged[userid] = players[userid]; });
+    Object.keys(newplayers).map(function(userid) { merged[userid] = newplayers[userid]; });
+    return merged;
+}
+
+function merge_records(records, newrecords) {
+    var merged = {};
+    Object.keys(records).map(function(songid) { merged[songid] = records[songid]; });
+    Object.keys(newrecords).map(function(songid) {
+        var charts = {};
+        Object.keys(merged[songid] || {}).map(function(chart) { charts[chart] = merged[songid][chart]; });
+        Object.keys(newrecords[songid]).map(function(chart) { charts[chart] = newrecords[songid][chart]; });
+        merged[songid] = charts;
+    });
+    return merged;
+}
+
 var valid_sorts = ['series', 'name', 'popularity'];
 var valid_charts = ['SPN', 'SPH', 'SPA', 'DPN', 'DPH', 'DPA'];
 var valid_mixes = Object.keys(window.versions).map(function(mix) {
@@ -83,9 +107,15 @@ var network_records = React.createClass({
     },
 
     getInitialState: function(props) {
+        this.requested = {};
+        this.pending = [];
+        this.loadingall = false;
         return {
             songs: window.songs,
             records: this.sortRecords(window.records),
+            // Personal records come with the page, network records are loaded as needed.
+            complete: !window.loadrecords,
+            timestamp: window.timestamp,
             players: window.players,
             versions: window.versions,
             sort: pagenav.getInitialState('series', '0'),
@@ -114,16 +144,77 @@ var network_records = React.createClass({
             var subtab = this.getSubIndex(sort, subsort);
             this.setState({sort: sort, offset: 0, subtab: subtab});
         }.bind(this));
-        this.refreshRecords();
+        this.loadAllRecordsIfNeeded();
+        // Refresh every 15 seconds
+        setTimeout(this.refreshRecords, 15000);
+    },
+
+    componentDidUpdate: function() {
+        this.loadAllRecordsIfNeeded();
+    },
+
+    getRecords: function(songid) {
+        // Only ask for a song's records once it is shown, batching up every song that
+        // is shown at the same time into one request.
+        if (!this.state.complete && !(songid in this.requested)) {
+            this.requested[songid] = true;
+            this.pending.push(songid);
+            if (this.pending.length == 1) {
+                setTimeout(this.loadPendingRecords, 1);
+            }
+        }
+        return this.state.records[songid];
+    },
+
+    loadPendingRecords: function() {
+        var songids = this.pending.splice(0, records_batch);
+        if (this.pending.length > 0) {
+            setTimeout(this.loadPendingRecords, 1);
+        }
+        AJAX.get(
+            Link.get('refresh') + '?' + songids.map(function(songid) { return 'songid=' + songid; }).join('&'),
+            function(response) {
+                this.setState({
+                    records: merge_records(this.state.records, this.sortRecords(response.records)),
+                    players: merge_players(this.state.players, response.players),
+                });
+            }.bind(this)
+        );
+    },
+
+    loadAllRecordsIfNeeded: function() {
+        if (this.state.sort == 'popularity' && !this.state.complete && !this.loadingall) {
+            this.loadingall = true;
+            this.loadAllRecords(null);
+        }
+    },
+
+    loadAllRecords: function(after) {
+        var cursor = after ? after.map(function(value) { return '&after=' + value; }).join('') : '';
+        AJAX.get(
+            Link.get('refresh') + '?stream=1&limit=' + records_page + cursor,
+            function(response) {
+                this.setState({
+                    records: merge_records(this.state.records, this.sortRecords(response.records)),
+                    players: merge_players(this.state.players, response.players),
+                    complete: !response.after,
+                });
+                if (response.after) {
+                    // Keep loading until we grab all records
+                    setTimeout(function() { this.loadAllRecords(response.after); }.bind(this), 1);
+                }
+            }.bind(this)
+        );
     },
 
     refreshRecords: function() {
         AJAX.get(
-            Link.get('refresh'),
+            Link.get('refresh') + '?since=' + this.state.timestamp,
             function(response) {
                 this.setState({
-                    records: this.sortRecords(response.records),
-                    players: response.players,
+                    records: merge_records(this.state.records, this.sortRecords(response.records)),
+                    players: merge_players(this.state.players, response.players),
+                    timestamp: response.timestamp,
                 });
                 // Refresh every 15 seconds
                 setTimeout(this.refreshRecords, 15000);
@@ -242,7 +333,7 @@ var network_records = React.createClass({
                                 } else {
                                     if (paginate && curpage != this.state.subtab) { return null; }
 
-                                    var records = this.state.records[songid];
+                                    var records = this.getRecords(songid);
                                     if (!records) {
                                         records = {};
                                     }
@@ -494,7 +585,7 @@ var network_records = React.createClass({
                             return null;
                         }
 
-                        var records = this.state.records[songid];
+                        var records = this.getRecords(songid);
                         if (!records) {
                             records = {};
                         }
@@ -1,10 +1,29 @@
 /*** @jsx React.DOM */
 
+var mergehandler = new MergeManager(function(attempt) { return attempt.id; }, MergeManager.MERGE_POLICY_DROP);
+
+// How many attempt IDs before the newest one we have to ask for again on each refresh.
+var REFRESH_OVERLAP = 50;
+
+function sort_attempts(attempts) {
+    return attempts.sort(function(a, b) {
+        if (a.timestamp != b.timestamp) { return b.timestamp - a.timestamp; }
+        return b.id - a.id;
+    });
+}
+
+function merge_players(players, newplayers) {
+    var merged = {};
+    Object.keys(players).map(function(userid) { merged[userid] = players[userid]; });
+    Object.keys(newplayers).map(function(userid) { merged[userid] = newplayers[userid]; });
+    return merged;
+}
+
 var network_scores = React.createClass({
     getInitialState: function(props) {
         return {
             songs: window.songs,
-            attempts: window.attempts,
+            attempts: sort_attempts(mergehandler.add(window.attempts)),
             players: window.players,
             loading: true,
             offset: 0,
@@ -13,17 +32,48 @@ var network_scores = React.createClass({
     },
 
     componentDidMount: function() {
+        this.loadOldScores();
         this.refreshScores();
     },
 
+    loadOldScores: function() {
+        // If there's no scores on the network, don't try loading old ones
+        if (this.state.attempts.length == 0) {
+            this.setState({loading: false});
+            return;
+        }
+
+        var min_id = this.state.attempts.reduce(function(a, b) {
+            return a < b.id ? a : b.id;
+        }, this.state.attempts[0].id);
+        AJAX.get(
+            Link.get('backfill', min_id),
+            function(response) {
+                this.setState({
+                    attempts: sort_attempts(mergehandler.add(response.attempts)),
+                    players: merge_players(this.state.players, response.players),
+                    loading: response.attempts.length > 0,
+                });
+                // Keep loading until we grab all scores
+                if (response.attempts.length > 0) {
+                    setTimeout(this.loadOldScores, 1);
+                }
+            }.bind(this)
+        );
+    },
+
     refreshScores: function() {
+        var max_id = this.state.attempts.reduce(function(a, b) {
+            return a > b.id ? a : b.id;
+        }, 0);
+        // Attempts can be saved out of order, so ask again for a few before the newest
+        // one we have. The merge handler drops any that we already have.
         AJAX.get(
-            Link.get('refresh'),
+            Link.get('refresh', Math.max(max_id - REFRESH_OVERLAP, 1)),
             function(response) {
                 this.setState({
-                    attempts: response.attempts,
-                    players: response.players,
-                    loading: false,
+                    attempts: sort_attempts(mergehandler.add(response.attempts)),
+                    players: merge_players(this.state.players, response.players),
                 });
                 // Refresh every 15 seconds
                 setTimeout(this.refreshScores, 15000);
@@ -3,13 +3,13 @@ from typing import Any, Dict, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from flask.ctx import _AppCtxGlobals
-    from flask_caching import Cache  # type: ignore
 
     from bemani.data import Data, UserID
+    from bemani.frontend.cache import FrontendCache
 
     class RequestGlobals(_AppCtxGlobals):
         config: Dict[str, Any]
-        cache: Cache
+        cache: FrontendCache
         data: Data
         sessionID: Optional[str]
         userID: Optional[UserID]
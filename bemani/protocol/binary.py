@@ -1,5 +1,7 @@
+import array
 import struct
-from typing import Optional, Final, List, Dict, Any
+import sys
+from typing import Optional, Final, List, Dict, Any, Tuple
 
 from bemani.protocol.stream import InputStream, OutputStream
 from bemani.protocol.node import Node
@@ -11,6 +13,13 @@ class BinaryEncodingException(Exception):
     """
 
 
+class BinaryFastPathException(Exception):
+    """
+    Exception thrown when the fast encoder or decoder comes across a tree it doesn't
+    support, signifying that the reference implementation should be used instead.
+    """
+
+
 class PackedOrdering:
     """
     A class that helps us encapsulate Konami's batshit backtracking hole-fill algorithm.
@@ -704,6 +713,526 @@ class BinaryEncoder:
         ])
 
 
+class PackedAllocator:
+    """
+    A constant time replacement for PackedOrdering's hole scans. Since values are always
+    placed in order, the only holes that can ever exist are the unused slots in the last
+    4 byte chunk that bytes were packed into and the last 4 byte chunk that shorts were
+    packed into. Everything else goes at the end of the allocated space. So, instead of
+    tracking every byte in the buffer, we track those two partially filled chunks and the
+    end of the allocated space. This has exactly the same interface and results as
+    PackedOrdering, which is kept as the reference implementation.
+    """
+
+    def __init__(self, size: int, allow_expansion: bool=False) -> None:
+        """
+        Initialize with a known size. See PackedOrdering for details.
+
+        Parameters:
+            size - Number of bytes to work with as an integer
+            allow_expansion - Boolean describing whether to add to the end of the order when needed
+        """
+        self.size = size
+        self.expand = allow_expansion
+        self.end = 0
+        self.next_byte: Optional[int] = None
+        self.next_short: Optional[int] = None
+
+    def mark_used(self, size: int, offset: int, round_to: int=1) -> None:
+        """
+        Mark size bytes at offset as being used. If needed, round to the nearest byte/half/integer.
+
+        Parameters:
+            size - Number of bytes to mark
+            offset - Offset into binary chunk to start marking
+            round_to - Optional integer specifying how many bytes to round to. Valid values are 1, 2 and 4
+        """
+        size = (size + (round_to - 1)) & ~(round_to - 1)
+        if not self.expand and (offset + size) > self.size:
+            raise BinaryEncodingException("Ran out of data when attempting to mark node data location!")
+
+        if offset < self.end:
+            # This is filling in one of the partial chunks.
+            if size == 1:
+                self.next_byte = offset + 1 if ((offset + 1) & 3) != 0 else None
+            elif size == 2:
+                self.next_short = offset + 2 if ((offset + 2) & 3) != 0 else None
+            return
+
+        # This is a new allocation at the end, possibly starting a new partial chunk.
+        self.end = (offset + size + 3) & ~3
+        if size == 1:
+            self.next_byte = offset + 1
+        elif size == 2:
+            self.next_short = offset + 2
+
+    def __get_next_chunk(self) -> Optional[int]:
+        if self.expand or self.end < self.size:
+            return self.end
+        return None
+
+    def get_next_byte(self) -> Optional[int]:
+        """
+        Returns an integer location where the next byte will be found/stored, respecting Konami logic.
+        Will return None if its not possible to find this integer a spot and we aren't expanding.
+        """
+        if self.next_byte is not None:
+            return self.next_byte
+        return self.__get_next_chunk()
+
+    def get_next_short(self) -> Optional[int]:
+        """
+        Returns an integer location where the next short will be found/stored, respecting Konami logic.
+        Will return None if its not possible to find this integer a spot and we aren't expanding.
+        """
+        if self.next_short is not None:
+            return self.next_short
+        return self.__get_next_chunk()
+
+    def get_next_int(self) -> Optional[int]:
+        """
+        Returns an integer location where the next integer will be found/stored, respecting Konami logic.
+        Will return None if its not possible to find this integer a spot and we aren't expanding.
+        """
+        return self.__get_next_chunk()
+
+
+class BinaryCodec:
+    """
+    Precompiled encoding information for one node type, so that the fast encoder and
+    decoder don't need to look up and format struct strings for every value they touch.
+    """
+
+    # What sort of value this is, which decides how it is laid out in the body.
+    KIND_VOID: Final[int] = 0
+    KIND_SCALAR: Final[int] = 1
+    KIND_BOOL: Final[int] = 2
+    KIND_COMPOSITE: Final[int] = 3
+    KIND_STRING: Final[int] = 4
+    KIND_BINARY: Final[int] = 5
+    KIND_ARRAY: Final[int] = 6
+
+    # Struct encoding characters that can be bulk converted using the array module.
+    ARRAY_TYPECODES: Final[Dict[str, str]] = {
+        enc: typecode
+        for enc, typecodes in [
+            ('b', 'b'),
+            ('B', 'B'),
+            ('h', 'h'),
+            ('H', 'H'),
+            ('i', 'il'),
+            ('I', 'IL'),
+            ('q', 'ql'),
+            ('Q', 'QL'),
+            ('f', 'f'),
+            ('d', 'd'),
+        ]
+        for typecode in reversed(typecodes)
+        if array.array(typecode).itemsize == struct.calcsize(enc)
+    }
+
+    def __init__(self, node: Node) -> None:
+        """
+        Compile the codec for a node's type.
+
+        Parameters:
+            node - A Node whose type we should compile a codec for.
+        """
+        self.size = node.data_length
+        self.struct: Optional[struct.Struct] = None
+        self.typecode: Optional[str] = None
+
+        if self.size == 0:
+            self.kind = self.KIND_VOID
+            self.alignment = 0
+            return
+
+        enc = node.data_encoding
+        dtype = node.data_type
+        if self.size is None:
+            # Strings and binary blobs are stored with a length, aligned to 4 bytes.
+            if node.is_array:
+                raise BinaryFastPathException(f"Unsupported array of {dtype}")
+            self.kind = self.KIND_STRING if dtype == 'str' else self.KIND_BINARY
+            self.alignment = 4
+        elif node.is_array:
+            if node.is_composite:
+                raise BinaryFastPathException(f"Unsupported array of {dtype}")
+            self.kind = self.KIND_ARRAY
+            self.alignment = 4
+            self.typecode = self.ARRAY_TYPECODES.get(enc)
+            if self.typecode is None and len(enc) != 1:
+                # Can't be packed with a repeat count, such as arrays of ip4.
+                raise BinaryFastPathException(f"Unsupported array of {dtype}")
+            self.enc = enc
+        else:
+            self.kind = self.KIND_COMPOSITE if node.is_composite else (self.KIND_BOOL if dtype == 'bool' else self.KIND_SCALAR)
+            self.alignment = min(self.size, 4)
+            if self.alignment not in {1, 2, 4}:
+                raise BinaryFastPathException(f"Unsupported alignment for {dtype}")
+            self.struct = struct.Struct(f'>{enc}')
+
+    @staticmethod
+    def get(node: Node, cache: Dict[int, 'BinaryCodec']) -> 'BinaryCodec':
+        """
+        Look up, or compile, the codec for a given node's type.
+        """
+        codec = cache.get(node.type)
+        if codec is None:
+            codec = BinaryCodec(node)
+            cache[node.type] = codec
+        return codec
+
+
+class FastBinaryDecoder:
+    """
+    A class capable of taking a binary blob and decoding it to a Node tree. This produces
+    exactly the same results as BinaryDecoder, but decodes the schema in one pass over
+    the buffer, uses precompiled structs for scalars and bulk-converts arrays.
+    """
+
+    def __init__(self, data: bytes, encoding: str) -> None:
+        """
+        Initialize the object.
+
+        Parameters:
+            - data - A binary blob of data to be decoded
+            - encoding - A string representing the text encoding for string elements. Should be either
+                         'shift-jis', 'euc-jp' or 'utf-8'
+        """
+        self.data = data
+        self.encoding = encoding
+        self.executed = False
+        self.names: Dict[bytes, str] = {}
+        self.codecs: Dict[int, BinaryCodec] = {}
+
+    def __read_node_name(self, pos: int) -> Tuple[str, int]:
+        """
+        Given a position in the data, read the 6-bit-byte packed string name of the node.
+
+        Returns:
+            A tuple of the string name in ascii and the position after the name.
+        """
+        data = self.data
+        if pos >= len(data):
+            raise BinaryEncodingException("Ran out of data when attempting to read node name length!")
+        length = data[pos]
+        binary_length = ((length * 6) + 7) // 8
+        end = pos + 1 + binary_length
+        if end > len(data):
+            raise BinaryEncodingException("Ran out of data when attempting to read node name!")
+
+        key = data[pos:end]
+        name = self.names.get(key)
+        if name is None:
+            bits = int.from_bytes(key[1:], 'big')
+            shift = binary_length * 8
+            chars = Node.NODE_NAME_CHARS
+            name = ''.join(chars[(bits >> (shift - (6 * (i + 1)))) & 0x3F] for i in range(length))
+            self.names[key] = name
+        return name, end
+
+    def __decode_string(self, raw: bytes) -> Any:
+        # Need to convert this from encoding to standard string.
+        # Also, need to lob off the trailing null.
+        try:
+            return raw[:-1].decode(self.encoding)
+        except UnicodeDecodeError:
+            # Nothing we can do here
+            return raw
+
+    def get_tree(self) -> Node:
+        """
+        Parse the header and body such that we can return a Node tree
+        representing the data passed to us.
+
+        Returns:
+            Node object
+        """
+        if self.executed:
+            raise BinaryEncodingException("Logic error, should only call this once per instance")
+        self.executed = True
+
+        # Read the header first
+        data = self.data
+        if len(data) < 4:
+            raise BinaryEncodingException("Ran out of data when attempting to read header length!")
+        header_length = struct.unpack_from('>I', data, 0)[0]
+        if len(data) < 5:
+            raise BinaryEncodingException("Ran out of data when attempting to read root node type!")
+
+        name, pos = self.__read_node_name(5)
+        root = Node(name=name, type=data[4])
+        parents = [root]
+
+        while parents:
+            if pos >= len(data):
+                raise BinaryEncodingException("Ran out of data when attempting to read node type!")
+            child_type = data[pos]
+            pos += 1
+
+            if child_type == Node.END_OF_NODE:
+                parents.pop()
+            elif child_type == Node.ATTR_TYPE:
+                key, pos = self.__read_node_name(pos)
+                parents[-1].set_attribute(key)
+            else:
+                name, pos = self.__read_node_name(pos)
+                child = Node(name=name, type=child_type)
+                parents[-1].add_child(child)
+                parents.append(child)
+
+        eod = data[pos] if pos < len(data) else None
+        if eod != Node.END_OF_DOCUMENT:
+            raise BinaryEncodingException(f'Unknown node type {eod} at end of document')
+
+        # Skip by any padding
+        pos = max(pos + 1, header_length + 4)
+
+        # Read the body next
+        if pos + 4 > len(data):
+            return root
+        body_length = struct.unpack_from('>I', data, pos)[0]
+        if body_length <= 0:
+            return root
+
+        # We have a body
+        pos += 4
+        if pos + body_length > len(data):
+            raise BinaryEncodingException('Body has insufficient data')
+        body = data[pos:(pos + body_length)]
+
+        try:
+            self.__read_body(root, body)
+        except struct.error:
+            raise BinaryEncodingException("Ran out of data when attempting to read node data!")
+
+        return root
+
+    def __read_body(self, root: Node, body: bytes) -> None:
+        ordering = PackedAllocator(len(body))
+        unpack_length = struct.Struct('>I').unpack_from
+        nodes = [root]
+
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(reversed(node.children))
+            codec = BinaryCodec.get(node, self.codecs)
+            kind = codec.kind
+
+            if kind != BinaryCodec.KIND_VOID:
+                if codec.alignment == 1:
+                    loc = ordering.get_next_byte()
+                elif codec.alignment == 2:
+                    loc = ordering.get_next_short()
+                else:
+                    loc = ordering.get_next_int()
+                if loc is None:
+                    raise BinaryEncodingException("Ran out of data when attempting to read node data location!")
+
+                if kind == BinaryCodec.KIND_SCALAR or kind == BinaryCodec.KIND_BOOL:
+                    ordering.mark_used(codec.size, loc)
+                    node.set_value(codec.struct.unpack_from(body, loc)[0])
+                elif kind == BinaryCodec.KIND_COMPOSITE:
+                    ordering.mark_used(codec.size, loc)
+                    node.set_value(list(codec.struct.unpack_from(body, loc)))
+                elif kind == BinaryCodec.KIND_ARRAY:
+                    length = unpack_length(body, loc)[0]
+                    ordering.mark_used(length + 4, loc, round_to=4)
+                    elems = length // codec.size
+                    raw = body[(loc + 4):(loc + 4 + (elems * codec.size))]
+                    if len(raw) != elems * codec.size:
+                        raise BinaryEncodingException("Ran out of data when attempting to read array data!")
+
+                    if codec.typecode is not None:
+                        values = array.array(codec.typecode, raw)
+                        if sys.byteorder == 'little':
+                            values.byteswap()
+                        node.set_value(values)
+                    else:
+                        node.set_value(list(struct.unpack(f'>{elems}{codec.enc}', raw)))
+                else:
+                    length = unpack_length(body, loc)[0]
+                    ordering.mark_used(length + 4, loc, round_to=4)
+                    raw = body[(loc + 4):(loc + 4 + length)]
+                    if len(raw) != length:
+                        raise BinaryEncodingException("Ran out of data when attempting to read string data!")
+                    node.set_value(self.__decode_string(raw) if kind == BinaryCodec.KIND_STRING else raw)
+
+            for attr in sorted(node.attributes.keys()):
+                loc = ordering.get_next_int()
+                if loc is None:
+                    raise BinaryEncodingException("Ran out of data when attempting to read node data location!")
+                length = unpack_length(body, loc)[0]
+                ordering.mark_used(length + 4, loc, round_to=4)
+                raw = body[(loc + 4):(loc + 4 + length)]
+                if len(raw) != length:
+                    raise BinaryEncodingException("Ran out of data when attempting to read attribute data!")
+                node.set_attribute(attr, self.__decode_string(raw))
+
+
+class FastBinaryEncoder:
+    """
+    A class capable of taking a Node tree and encoding it into a binary format. This
+    produces exactly the same results as BinaryEncoder, but writes into preallocated
+    buffers using precompiled structs and bulk-converts arrays.
+    """
+
+    def __init__(self, tree: Node, encoding: str) -> None:
+        """
+        Initialize the object.
+
+        Parameters:
+            tree - A binary blob of data to be decoded
+            encoding - A string representing the text encoding for string elements. Should be either
+                       'shift-jis', 'euc-jp' or 'utf-8'
+        """
+        self.encoding = encoding
+        self.tree = tree
+        self.executed = False
+        self.names: Dict[str, bytes] = {}
+        self.codecs: Dict[int, BinaryCodec] = {}
+        self.char_lut: Dict[str, int] = {ch: i for i, ch in enumerate(Node.NODE_NAME_CHARS)}
+
+    def __node_name(self, name: str) -> bytes:
+        """
+        Given a string name, return the 6-bit-byte packed representation of the name.
+        """
+        packed = self.names.get(name)
+        if packed is None:
+            bits = 0
+            for ch in name:
+                bits = (bits << 6) | self.char_lut[ch]
+            length = len(name)
+            binary_length = ((length * 6) + 7) // 8
+            bits <<= (binary_length * 8) - (length * 6)
+            packed = struct.pack('>B', length) + bits.to_bytes(binary_length, 'big')
+            self.names[name] = packed
+        return packed
+
+    def __write_node(self, node: Node, header: bytearray) -> None:
+        header.append(node.type)
+        header += self.__node_name(node.name)
+        for attr in sorted(node.attributes.keys()):
+            header.append(Node.ATTR_TYPE)
+            header += self.__node_name(attr)
+
+        for child in node.children:
+            self.__write_node(child, header)
+
+        header.append(Node.END_OF_NODE)
+
+    def __encode_string(self, name: str, val: Any) -> bytes:
+        if not isinstance(val, str):
+            raise BinaryEncodingException(
+                f'Node \'{name}\' has non-string value!',
+            )
+
+        try:
+            return val.encode(self.encoding) + b'\0'
+        except UnicodeEncodeError:
+            raise BinaryEncodingException(
+                f'Node \'{name}\' has un-encodable string value \'{val}\''
+            )
+
+    def get_data(self) -> bytes:
+        """
+        Encode the header and body into binary formrt.
+
+        Returns:
+            Binary blob of data that can be decoded by a game.
+        """
+        if self.executed:
+            raise Exception("Logic error, should only call this once per instance")
+        self.executed = True
+
+        # Generate the header first
+        header = bytearray()
+        self.__write_node(self.tree, header)
+        header.append(Node.END_OF_DOCUMENT)
+        header += bytes((-len(header)) & 3)
+
+        # Generate the body
+        body = bytearray()
+        ordering = PackedAllocator(0, allow_expansion=True)
+        pack_length = struct.Struct('>I').pack
+
+        def add_data(data: bytes, offset: int) -> None:
+            # Make sure the body is big enough and padded to 4 bytes
+            end = offset + len(data)
+            if len(body) < end:
+                body.extend(bytes((end - len(body)) + ((-end) & 3)))
+            body[offset:end] = data
+
+        nodes = [self.tree]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(reversed(node.children))
+            codec = BinaryCodec.get(node, self.codecs)
+            kind = codec.kind
+
+            if kind != BinaryCodec.KIND_VOID:
+                # Numeric arrays can be taken straight from the node's packed storage.
+                val: Any = node.array_value if kind == BinaryCodec.KIND_ARRAY else None
+                if val is None:
+                    val = node.value
+                if val is None:
+                    raise BinaryEncodingException(
+                        f'Node \'{node.name}\' has invalid value None',
+                    )
+
+                if codec.alignment == 1:
+                    loc = ordering.get_next_byte()
+                elif codec.alignment == 2:
+                    loc = ordering.get_next_short()
+                else:
+                    loc = ordering.get_next_int()
+
+                if kind == BinaryCodec.KIND_SCALAR:
+                    add_data(codec.struct.pack(val), loc)
+                    ordering.mark_used(codec.size, loc)
+                elif kind == BinaryCodec.KIND_BOOL:
+                    add_data(codec.struct.pack(1 if val else 0), loc)
+                    ordering.mark_used(codec.size, loc)
+                elif kind == BinaryCodec.KIND_COMPOSITE:
+                    add_data(codec.struct.pack(*val), loc)
+                    ordering.mark_used(codec.size, loc)
+                elif kind == BinaryCodec.KIND_ARRAY:
+                    if node.data_type == 'bool':
+                        val = [1 if v else 0 for v in val]
+                    if codec.typecode is not None:
+                        values = array.array(codec.typecode, val)
+                        if sys.byteorder == 'little':
+                            values.byteswap()
+                        data = values.tobytes()
+                    else:
+                        data = struct.pack(f'>{len(val)}{codec.enc}', *val)
+                    add_data(pack_length(len(data)) + data, loc)
+                    ordering.mark_used(len(data) + 4, loc, round_to=4)
+                else:
+                    data = self.__encode_string(node.name, val) if kind == BinaryCodec.KIND_STRING else val
+                    add_data(pack_length(len(data)) + data, loc)
+                    ordering.mark_used(len(data) + 4, loc, round_to=4)
+
+            for attr in sorted(node.attributes.keys()):
+                val = node.attribute(attr)
+                if val is None:
+                    raise BinaryEncodingException(
+                        f'Node \'{attr}\' has invalid value None',
+                    )
+                loc = ordering.get_next_int()
+                data = self.__encode_string(attr, val)
+                add_data(pack_length(len(data)) + data, loc)
+                ordering.mark_used(len(data) + 4, loc, round_to=4)
+
+        return b''.join([
+            pack_length(len(header)),
+            header,
+            pack_length(len(body)),
+            body,
+        ])
+
+
 class BinaryEncoding:
     """
     Wrapper class representing a Binary Encoding.
@@ -726,11 +1255,16 @@ class BinaryEncoding:
         0xA0: "utf-8",
     }
 
-    def __init__(self) -> None:
+    def __init__(self, reference: bool=False) -> None:
         """
         Initialize the encoding object.
+
+        Parameters:
+            reference - Whether to always use the reference encoder and decoder instead
+                        of the fast versions. Defaults to False.
         """
         self.encoding: Optional[str] = None
+        self.reference = reference
 
     def __sanitize_encoding(self, enc: str) -> str:
         """
@@ -778,6 +1312,12 @@ class BinaryEncoding:
         if encoding is not None:
             self.encoding = encoding
             try:
+                if not self.reference:
+                    try:
+                        return FastBinaryDecoder(data[4:], self.__sanitize_encoding(encoding)).get_tree()
+                    except BinaryFastPathException:
+                        # Fall back to the reference decoder below.
+                        pass
                 decoder = BinaryDecoder(data[4:], self.__sanitize_encoding(encoding))
                 return decoder.get_tree()
             except BinaryEncodingException:
@@ -814,8 +1354,16 @@ class BinaryEncoding:
         if encoding_magic is None:
             raise BinaryEncodingException(f"Invalid text encoding {encoding}")
 
-        encoder = BinaryEncoder(tree, self.__sanitize_encoding(encoding))
-        data = encoder.get_data()
+        data = None
+        if not self.reference:
+            try:
+                data = FastBinaryEncoder(tree, self.__sanitize_encoding(encoding)).get_data()
+            except BinaryFastPathException:
+                # Fall back to the reference encoder below.
+                pass
+        if data is None:
+            encoder = BinaryEncoder(tree, self.__sanitize_encoding(encoding))
+            data = encoder.get_data()
 
         if data is not None:
             return struct.pack(">BBBB", BinaryEncoding.MAGIC, BinaryEncoding.COMPRESSED_WITH_DATA, encoding_magic, (~encoding_magic & 0xFF)) + data
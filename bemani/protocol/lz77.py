@@ -1,7 +1,6 @@
 import ctypes
 import os
-from collections import defaultdict
-from typing import Generator, Final, List, MutableMapping, Optional, Set, Tuple
+from typing import Dict, Generator, Final, List, Optional, Tuple
 
 from .. import package_root
 
@@ -21,6 +20,22 @@ except Exception:
     clib = None
 
 
+def _copy_run(flags: int) -> int:
+    """
+    Given a flags value with its sentinel bit set, return how many consecutive copy
+    flags are at the bottom, so that we can copy that many bytes in one go.
+    """
+    amount = 0
+    while flags != 1 and (flags & 1) == 1:
+        flags >>= 1
+        amount += 1
+    return amount
+
+
+# Lookup table for all possible flags values including the sentinel bit.
+_COPY_RUNS: Final[Tuple[int, ...]] = tuple(_copy_run(flags) for flags in range(0x200))
+
+
 class LzException(Exception):
     """
     An exception thrown when we encounter an error with Lz77 encoding/decoding.
@@ -33,13 +48,17 @@ class Lz77Decompress:
     variant to the Lz77 found in firebeat executables and BIOS. This is used for
     over-the-wire compression of XML data, as well as compression inside a decent
     amount of file formats found in various Konami games.
+
+    Data can be handed to the decompressor all at once in the constructor, or in
+    chunks as it arrives using feed(). In either case, finish() must be called once
+    all data has been provided in order to retrieve the remaining output.
     """
     RING_LENGTH: Final[int] = 0x1000
 
     FLAG_COPY: Final[int] = 1
     FLAG_BACKREF: Final[int] = 0
 
-    def __init__(self, data: bytes, backref: Optional[int] = None) -> None:
+    def __init__(self, data: bytes = b'', backref: Optional[int] = None) -> None:
         """
         Initialize the object.
 
@@ -49,167 +68,150 @@ class Lz77Decompress:
         self.eof: bool = False
         self.data: bytes = data
         self.read_pos: int = 0
-        self.left: int = len(self.data)
         self.flags: int = 1
-        self.write_pos: int = 0
-        self.pending_copy_amount: int = 0
-        self.pending_copy_pos: int = 0
-        self.pending_copy_max: int = 0
         self.ringlength: int = backref or self.RING_LENGTH
-        self.ring: bytes = b'\x00' * self.ringlength
 
-    def _ring_read(self, copy_pos: int, copy_len: int) -> Generator[bytes, None, None]:
+        # The window starts with a zeroed ringbuffer's worth of data so that backrefs
+        # before the start of the stream read zeros. All output is appended after it,
+        # so backrefs are plain slices of the window instead of ringbuffer reads.
+        self.window: bytearray = bytearray(self.ringlength)
+        self.output_pos: int = self.ringlength
+
+    def feed(self, data: bytes) -> bytes:
         """
-        Read the next bytes from the backref ring at the current copy position.
+        Add more compressed data to the stream and decompress as much as possible.
+
+        Parameters:
+            data - Binary blob representing the next chunk of data to be decompressed.
 
         Returns:
-            a generator which yields bytes.
+            Any decompressed data that became available.
         """
-        while copy_len > 0:
-            if copy_pos + copy_len > self.ringlength:
-                # Copy first chunk, let subsequent loop handle the next chunks
-                amount = self.ringlength - copy_pos
-            else:
-                # Copy the whole thing out, we have enough space to do so
-                amount = copy_len
+        if self.eof:
+            return b''
 
-            ret = self.ring[copy_pos:(copy_pos + amount)]
-            self._ring_write(ret)
-            yield ret
+        if self.read_pos >= len(self.data):
+            self.data = data
+        else:
+            self.data = self.data[self.read_pos:] + data
+        self.read_pos = 0
 
-            copy_pos = (copy_pos + amount) % self.ringlength
-            copy_len -= amount
+        self._decompress(final=False)
+        return self._take_output()
 
-    def _ring_write(self, bytedata: bytes) -> None:
+    def finish(self) -> bytes:
         """
-        Write bytes into the backref ring.
+        Signal that no more data is coming, decompressing whatever is left.
 
-        Parameters:
-            byte - A byte to be written at the current write offset
+        Returns:
+            Any decompressed data that was not already returned.
         """
-        while True:
-            amount = len(bytedata)
-            if amount == 0:
-                return
-            if amount > (self.ringlength - self.write_pos):
-                amount = self.ringlength - self.write_pos
-
-            self.ring = self.ring[:self.write_pos] + bytedata[:amount] + self.ring[(self.write_pos + amount):]
-            bytedata = bytedata[amount:]
-            self.write_pos = (self.write_pos + amount) % self.ringlength
+        self._decompress(final=True)
+        self.eof = True
+        return self._take_output()
 
     def decompress_bytes(self) -> Generator[bytes, None, None]:
         """
-        Yield the next byte from the decompressed output. If we are
-        in a backref copy, read the next byte from the backref. If
-        we aren't, read the next flag to see if we should decode
-        a byte directly or if we should start another backref read.
-        If we don't have any flags, exit reporting EOF (None). If
-        we hit the end of the stream, stop yielding to signify EOF.
-        In all cases, whatever byte we read should be added back to
-        the backref buffer.
+        Decompress all of the data handed to the constructor.
 
         Returns:
             a generator that yields bytes.
         """
-        while not self.eof:
-            if self.pending_copy_amount > 0:
-                # We had a backref that would have copied more data than we had available
-                # in the ringbuffer (because every read, even a backref, adds to the
-                # ringbuffer). So, since we read that last time and wrote it to the backbuffer
-                # we are safe to read again.
-                amount = min(self.pending_copy_amount, self.pending_copy_max)
-                yield from self._ring_read(self.pending_copy_pos, amount)
-
-                # We read this many bytes and are about to write them to the ringbuffer,
-                # so bookkeep that.
-                self.pending_copy_amount -= amount
-                self.pending_copy_max = amount
-            else:
-                if self.flags == 1:
-                    # Load the next byte for processing
-                    if self.left == 0:
-                        # We have nothing left to read, so skip the
-                        # ringbuffer write below and exit early.
-                        return
-                    else:
-                        self.flags = 0x100 | self.data[self.read_pos]
-                        self.read_pos += 1
-                        self.left -= 1
-
-                # Shift the lowest bit out to be retrieved as a flag
-                flag = self.flags & 1
-                self.flags >>= 1
-
-                if flag == self.FLAG_COPY:
-                    # Figure out how much to pull at once
-                    amount = 1
-                    while self.flags != 1 and (self.flags & 1) == self.FLAG_COPY:
-                        # We would do a copy next time, so pop that flag and just add to our read amount
-                        self.flags >>= 1
-                        amount += 1
-
-                    # Grab chunk right out of the data source
-                    b = self.data[self.read_pos:(self.read_pos + amount)]
-                    self._ring_write(b)
-                    yield b
-
-                    self.read_pos += amount
-                    self.left -= amount
-                elif flag == self.FLAG_BACKREF:
-                    yield from self._read_backref()
-                else:
-                    raise Exception("Logic error!")
+        yield self.finish()
 
-    def _read_backref(self) -> Generator[bytes, None, None]:
+    def _take_output(self) -> bytes:
+        """
+        Return all output that was decompressed since the last call, trimming
+        the window down to only what future backrefs could possibly reference.
         """
-        Read a backref chunk. Grab the copy length and copy position
-        from the first two bytes and then read the first byte from
-        the backref. Sets up variables such that Lz77Decompress.__read()
-        can finish copying out of the backref on subsequent calls. Should
-        only be called by Lz77Decompress.__read(). If we discover the end
-        of stream, we don't generate any bytes and instead set the eof
-        flag which terminates the main decompression loop above.
+        with memoryview(self.window) as view:
+            with view[self.output_pos:] as chunk:
+                output = bytes(chunk)
 
-        Returns:
-            a generator that yields bytes.
+        excess = len(self.window) - self.ringlength
+        if excess > 0:
+            del self.window[:excess]
+        self.output_pos = len(self.window)
+
+        return output
+
+    def _decompress(self, final: bool) -> None:
         """
-        if self.left == 0:
-            self.eof = True
-            return
-        if self.left == 1:
-            raise LzException('Unexpected EOF mid-backref')
-
-        hi = self.data[self.read_pos]
-        lo = self.data[self.read_pos + 1]
-        self.read_pos += 2
-        self.left -= 2
-
-        copy_len = lo & 0xF
-        copy_pos = (hi << 4) | (lo >> 4)
-
-        if copy_pos > 0:
-            copy_len += 3
-            if copy_len > copy_pos:
-                # Remember what we have to do left, and the safe
-                # amount to copy next time (which is our length,
-                # since we are about to write that many butes to
-                # the ringbuffer right after reading them).
-                self.pending_copy_amount = copy_len - copy_pos
-                self.pending_copy_pos = self.write_pos
-                self.pending_copy_max = copy_pos
-
-                # Only copy the available bytes
-                copy_len = copy_pos
-
-            copy_pos = (self.write_pos - copy_pos)
-            while copy_pos < 0:
-                copy_pos += self.ringlength
-            copy_pos = copy_pos % self.ringlength
-            yield from self._ring_read(copy_pos, copy_len)
-        else:
-            self.eof = True
-            return
+        Decompress as much of the pending data as possible into the window. Any
+        instruction that isn't fully available is left for the next call, unless
+        this is the final call in which case truncated data is an error.
+
+        Parameters:
+            final - Whether there is more data to come after this.
+        """
+        data = self.data
+        datalen = len(data)
+        read_pos = self.read_pos
+        flags = self.flags
+        window = self.window
+        ringlength = self.ringlength
+        copy_runs = _COPY_RUNS
+
+        while not self.eof:
+            if flags == 1:
+                # Load the next byte for processing
+                if read_pos >= datalen:
+                    if final:
+                        self.eof = True
+                    break
+                flags = 0x100 | data[read_pos]
+                read_pos += 1
+
+            if (flags & 1) == self.FLAG_COPY:
+                # Figure out how much to pull at once
+                amount = copy_runs[flags]
+                available = datalen - read_pos
+                if available < amount:
+                    if available == 0:
+                        if final:
+                            self.eof = True
+                        break
+                    amount = available
+
+                # Grab chunk right out of the data source
+                window += data[read_pos:(read_pos + amount)]
+                read_pos += amount
+                flags >>= amount
+            else:
+                available = datalen - read_pos
+                if available < 2:
+                    if not final:
+                        # Wait for the rest of this backref to arrive.
+                        break
+                    if available == 0:
+                        self.eof = True
+                        break
+                    raise LzException('Unexpected EOF mid-backref')
+
+                flags >>= 1
+                hi = data[read_pos]
+                lo = data[read_pos + 1]
+                read_pos += 2
+
+                copy_pos = (hi << 4) | (lo >> 4)
+                if copy_pos == 0:
+                    self.eof = True
+                    break
+
+                copy_len = (lo & 0xF) + 3
+                copy_pos = ((copy_pos - 1) % ringlength) + 1
+                start = len(window) - copy_pos
+
+                if copy_len <= copy_pos:
+                    window += window[start:(start + copy_len)]
+                else:
+                    # This backref overlaps the data it is producing, so the
+                    # result is the referenced chunk repeated until we've
+                    # produced enough bytes.
+                    window += (window[start:] * ((copy_len // copy_pos) + 1))[:copy_len]
+
+        self.read_pos = read_pos
+        self.flags = flags
 
 
 class Lz77Compress:
@@ -217,201 +219,207 @@ class Lz77Compress:
     A class that can compress arbitrary binary data using the Lz77 protocol.
     Note that this does support overlapped backtracks, so for instance the
     string "abcabcabc" will be compressed properly (see unit tests for examples).
-    Great care has been taken in optimizing this and then we further optimize
-    by using Cython to build, netting us another 40% speed-up. This is important
-    because for any given packet we are decompressing and compressing at least
-    once, and if we use a proxy to direct traffic, possibly a second time.
+
+    Matches are found using hash chains which only ever remember one ringbuffer's
+    worth of positions, so memory use is bounded by the window and not the input.
+    The compression level controls how far down each chain we search and whether
+    we use lazy matching, trading speed for compression ratio. Great care has been
+    taken in optimizing this and then we further optimize by using Cython to build.
+    This is important because for any given packet we are decompressing and
+    compressing at least once, and if we use a proxy to direct traffic, possibly
+    a second time.
     """
 
     RING_LENGTH: Final[int] = 0x1000
 
-    LOOSE_COMPRESS_THRESHOLD: Final[int] = 1024 * 512
+    MIN_BACKREF: Final[int] = 3
+    MAX_BACKREF: Final[int] = 18
+    MAX_DISTANCE: Final[int] = 0xFFF
+
+    HASH_BITS: Final[int] = 15
+
+    # Greedy matching that only searches a short way down each chain and doesn't
+    # index positions inside of matches.
+    LEVEL_FAST: Final[int] = 1
+    # Greedy matching that searches a good way down each chain.
+    LEVEL_DEFAULT: Final[int] = 2
+    # Lazy matching that searches the entire window.
+    LEVEL_BEST: Final[int] = 3
+
+    # Maximum chain length, whether to use lazy matching and whether to index
+    # every position for each compression level.
+    LEVELS: Final[Dict[int, Tuple[int, bool, bool]]] = {
+        LEVEL_FAST: (8, False, False),
+        LEVEL_DEFAULT: (128, False, True),
+        LEVEL_BEST: (RING_LENGTH, True, True),
+    }
 
     FLAG_COPY: Final[int] = 1
     FLAG_BACKREF: Final[int] = 0
 
-    def __init__(self, data: bytes, backref: Optional[int] = None) -> None:
+    def __init__(self, data: bytes, backref: Optional[int] = None, level: Optional[int] = None) -> None:
         """
         Initialize the object.
 
         Parameters:
-            data - Binary blob representing the data to be decompressed.
+            data - Binary blob representing the data to be compressed.
+            backref - Optional ringbuffer length, defaults to 0x1000.
+            level - Optional compression level, one of the LEVEL_* constants.
         """
         self.data: bytes = data
-        self.read_pos: int = 0
-        self.left: int = len(self.data)
-        self.eof: bool = False
-        self.bytes_written: int = 0
         self.ringlength: int = backref or self.RING_LENGTH
-        self.locations: MutableMapping[int, Set[int]] = defaultdict(set)
-        self.starts: MutableMapping[bytes, Set[int]] = defaultdict(set)
-        self.last_start: Tuple[int, int, int] = (0, 0, 0)
-
-        if len(data) > self.LOOSE_COMPRESS_THRESHOLD:
-            self._ring_write = self._ring_write_starts_only
-        else:
-            self._ring_write = self._ring_write_both
-
-    def _ring_write_starts_only(self, bytedata: bytes) -> None:
+        self.max_distance: int = min(self.ringlength - 1, self.MAX_DISTANCE)
+        self.level: int = level or self.LEVEL_DEFAULT
+        if self.level not in self.LEVELS:
+            raise LzException(f"Unknown compression level {level}")
+        self.max_chain, self.lazy, self.index_all = self.LEVELS[self.level]
+
+        # Most recent position for each hash, and the previous position with the same
+        # hash for each position in the window.
+        self.head: List[int] = [-1] * (1 << self.HASH_BITS)
+        self.prev: List[int] = [-1] * self.ringlength
+        self.indexed: int = 0
+
+    def _index_to(self, end: int) -> None:
         """
-        Write bytes into the backref ring.
+        Add every position we haven't seen yet up to (but not including) end to the
+        hash chains, so that they can be found as backref candidates.
 
         Parameters:
-            byte - A byte to be written at the current write offset
+            end - The position to stop indexing at.
         """
-        for byte in bytedata:
-            # Update the start locations hashmap if we're past the beginning
-            self.last_start = (self.last_start[1], self.last_start[2], byte)
-            if self.bytes_written >= 2:
-                self.starts[bytes(self.last_start)].add(self.bytes_written - 2)
-
-            # Keep track of the fact that we wrote this byte.
-            self.bytes_written += 1
-
-    def _ring_write_both(self, bytedata: bytes) -> None:
+        data = self.data
+        head = self.head
+        prev = self.prev
+        ringlength = self.ringlength
+        mask = (1 << self.HASH_BITS) - 1
+        end = min(end, len(data) - 2)
+
+        for pos in range(self.indexed, end):
+            key = ((data[pos] << 10) ^ (data[pos + 1] << 5) ^ data[pos + 2]) & mask
+            prev[pos % ringlength] = head[key]
+            head[key] = pos
+
+        if end > self.indexed:
+            self.indexed = end
+
+    def _longest_match(self, pos: int) -> Tuple[int, int]:
         """
-        Write bytes into the backref ring.
+        Find the longest backref for the data at a given position. All positions
+        before this one should have already been indexed.
 
         Parameters:
-            byte - A byte to be written at the current write offset
+            pos - The position in the data to find a backref for.
+
+        Returns:
+            A tuple of the length and distance of the best backref, or (0, 0) if
+            there wasn't a usable one.
         """
-        for byte in bytedata:
-            # Update the start locations hashmap if we're past the beginning
-            self.last_start = (self.last_start[1], self.last_start[2], byte)
-            if self.bytes_written >= 2:
-                self.starts[bytes(self.last_start)].add(self.bytes_written - 2)
+        data = self.data
+        max_length = min(self.MAX_BACKREF, len(data) - pos)
+        if max_length < self.MIN_BACKREF:
+            return (0, 0)
+
+        prev = self.prev
+        ringlength = self.ringlength
+        earliest = max(0, pos - self.max_distance)
+        key = ((data[pos] << 10) ^ (data[pos + 1] << 5) ^ data[pos + 2]) & ((1 << self.HASH_BITS) - 1)
+        candidate = self.head[key]
+        best_length = self.MIN_BACKREF - 1
+        best_distance = 0
+        chain = self.max_chain
+
+        while candidate >= earliest and chain > 0:
+            chain -= 1
+
+            # Only bother comparing if this could possibly beat our best match.
+            if data[candidate + best_length] == data[pos + best_length]:
+                length = 0
+                while length < max_length and data[candidate + length] == data[pos + length]:
+                    length += 1
+
+                if length > best_length:
+                    best_length = length
+                    best_distance = pos - candidate
+                    if length == max_length:
+                        # We can't do any better than this.
+                        break
 
-            # Update the rest of the location hashmaps
-            self.locations[byte].add(self.bytes_written)
+            candidate = prev[candidate % ringlength]
 
-            # Keep track of the fact that we wrote this byte.
-            self.bytes_written += 1
+        if best_distance == 0:
+            return (0, 0)
+        return (best_length, best_distance)
 
     def compress_bytes(self) -> Generator[bytes, None, None]:
         """
-        Given the current stream, go through and assemble the next flag byte
-        followed by the next chunk of compressed data.
+        Compress the data handed to the constructor.
+
+        Returns:
+            a generator that yields bytes.
         """
-        while not self.eof:
-            if self.left == 0:
-                # Output a dummy flag and an end of stream marker.
-                self.eof = True
-                yield b"\x00\x00\x00"
+        yield self.compress()
+
+    def compress(self) -> bytes:
+        """
+        Compress the data handed to the constructor, returning the compressed data
+        including the end of stream marker.
+        """
+        data = self.data
+        datalen = len(data)
+        out = bytearray()
+        flagloc = 0
+        flagpos = 8
+        pos = 0
+        next_match: Optional[Tuple[int, int]] = None
+
+        while pos < datalen:
+            if flagpos == 8:
+                # Need to start a new chunk, which is a flag byte and then 8 instructions.
+                flagloc = len(out)
+                out.append(0)
+                flagpos = 0
+
+            if next_match is not None:
+                # We already looked for this match when deciding on a lazy match.
+                length, distance = next_match
+                next_match = None
             else:
-                # Need to assemble and return the next chunk, which is a flag
-                # byte and then 8 instructions.
-                flags = 0x0
-                flagpos = -1
-                data: List[bytes] = [b""] * 8
-
-                for _ in range(8):
-                    # Track what flag we're generating data for
-                    flagpos += 1
-
-                    if self.left == 0:
-                        # Output the end of stream marker, set EOF since we've succeeded
-                        # in outputting all flags.
-                        flags |= self.FLAG_BACKREF << flagpos
-                        data[flagpos] = b"\x00\x00"
-                        self.eof = True
-                        break
-                    elif self.left < 3 or self.bytes_written < 3:
-                        # We either don't have enough data written to backref, or we
-                        # don't have enough data in the stream that could be made into
-                        # a backref.
-                        flags |= self.FLAG_COPY << flagpos
-
-                        chunk = self.data[self.read_pos:(self.read_pos + 1)]
-                        data[flagpos] = chunk
-                        self._ring_write(chunk)
-
-                        self.read_pos += 1
-                        self.left -= 1
-                        continue
-
-                    # Figure out the maximum backref we can attempt to find
-                    backref_amount = min(self.left, 18)
-
-                    # Iterate over all spots where the first byte equals, and is in range.
-                    earliest = max(0, self.bytes_written - (self.ringlength - 1))
-                    index = self.data[self.read_pos:(self.read_pos + 3)]
-                    updated_backref_locations: Set[int] = set(
-                        absolute_pos for absolute_pos in self.starts[index]
-                        if absolute_pos >= earliest
-                    )
-                    self.starts[index] = updated_backref_locations
-                    possible_backref_locations: List[int] = list(updated_backref_locations)
-
-                    # Output the data as a copy if we couldn't find a backref
-                    if not possible_backref_locations:
-                        flags |= self.FLAG_COPY << flagpos
-
-                        chunk = self.data[self.read_pos:(self.read_pos + 1)]
-                        data[flagpos] = chunk
-                        self._ring_write(chunk)
-
-                        self.read_pos += 1
-                        self.left -= 1
-                        continue
-
-                    # Now, find the longest actual backref of our possibilities. We know
-                    # we're going to write at least these three bytes, so append it to the
-                    # output buffer.
-                    start_write_size = self.bytes_written
-                    self._ring_write(index)
-                    copy_amount = 3
-                    while copy_amount < backref_amount:
-                        # First, let's see if we have any 3-wide chunks to consume.
-                        index = self.data[(self.read_pos + copy_amount):(self.read_pos + copy_amount + 3)]
-                        locations = self.starts[index]
-                        new_backref_locations: List[int] = [
-                            absolute_pos for absolute_pos in possible_backref_locations
-                            if absolute_pos + copy_amount in locations
-                        ]
-
-                        if new_backref_locations:
-                            # Mark that we're copying an extra byte from the backref.
-                            self._ring_write(index)
-                            copy_amount += 3
-                            possible_backref_locations = new_backref_locations
-                        else:
-                            # Check our existing locations to figure out if we still have
-                            # longest prefixes of 1 or 2 left.
-                            while copy_amount < backref_amount:
-                                locations = self.locations[self.data[self.read_pos + copy_amount]]
-                                new_backref_locations = [
-                                    absolute_pos for absolute_pos in possible_backref_locations
-                                    if absolute_pos + copy_amount in locations
-                                ]
-
-                                # If we have no longest prefixes, that means that any of the
-                                # previous prefixes are good enough.
-                                if not new_backref_locations:
-                                    break
-
-                                # Mark that we're copying an extra byte from the backref.
-                                self._ring_write(self.data[(self.read_pos + copy_amount):(self.read_pos + copy_amount + 1)])
-                                copy_amount += 1
-                                possible_backref_locations = new_backref_locations
-
-                            # Either we looped above in the inner while, or we didn't. Either way,
-                            # we don't have any more to check since there were no more 3-long backref
-                            # locations.
-                            break
-
-                    # Now that we have a list of candidates, arbitrarily pick the
-                    # first one as our candidate and output it.
-                    absolute_pos = possible_backref_locations[0]
-                    backref_pos = start_write_size - absolute_pos
-
-                    lo = (copy_amount - 3) & 0xF | ((backref_pos & 0xF) << 4)
-                    hi = (backref_pos >> 4) & 0xFF
-                    flags |= self.FLAG_BACKREF << flagpos
-                    data[flagpos] = bytes([hi, lo])
-                    self.read_pos += copy_amount
-                    self.left -= copy_amount
-
-                yield bytes([flags]) + b"".join(data)
+                self._index_to(pos)
+                length, distance = self._longest_match(pos)
+
+            if length > 0 and self.lazy and length < self.MAX_BACKREF:
+                # See if we'd be better off outputting a copy and backref'ing from the next byte.
+                self._index_to(pos + 1)
+                next_match = self._longest_match(pos + 1)
+                if next_match[0] > length:
+                    length = 0
+                else:
+                    next_match = None
+
+            if length > 0:
+                out[flagloc] |= self.FLAG_BACKREF << flagpos
+                out.append((distance >> 4) & 0xFF)
+                out.append(((distance & 0xF) << 4) | ((length - self.MIN_BACKREF) & 0xF))
+
+                if not self.index_all:
+                    # Only index the start of the backref, skipping the rest.
+                    self._index_to(pos + 1)
+                    self.indexed = pos + length
+                pos += length
+            else:
+                out[flagloc] |= self.FLAG_COPY << flagpos
+                out.append(data[pos])
+                pos += 1
+
+            flagpos += 1
+
+        # Output the end of stream marker, which is a backref to position zero.
+        if flagpos == 8:
+            out.append(0)
+        out += b"\x00\x00"
+
+        return bytes(out)
 
 
 class Lz77:
@@ -419,11 +427,18 @@ class Lz77:
     A wrapper class encapsulating Lz77 encoding and decoding.
     """
 
-    def __init__(self, backref: Optional[int] = None) -> None:
+    def __init__(self, backref: Optional[int] = None, level: Optional[int] = None) -> None:
         """
         Initialize the object.
+
+        Parameters:
+            backref - Optional ringbuffer length, defaults to 0x1000.
+            level - Optional compression level, one of the Lz77Compress.LEVEL_* constants.
+                    Only the pure python compressor honors this, the C++ compressor
+                    always searches the entire window.
         """
         self.backref = backref
+        self.level = level
 
     def decompress(self, data: bytes) -> bytes:
         """
@@ -454,7 +469,7 @@ class Lz77:
                 raise LzException("Unknown exception in C++ code!")
         else:
             lz = Lz77Decompress(data, backref=self.backref)
-            return b''.join(lz.decompress_bytes())
+            return lz.finish()
 
     def compress(self, data: bytes) -> bytes:
         """
@@ -483,5 +498,5 @@ class Lz77:
             else:
                 raise LzException("Unknown exception in C++ code!")
         else:
-            lz = Lz77Compress(data, backref=self.backref)
-            return b''.join(lz.compress_bytes())
+            lz = Lz77Compress(data, backref=self.backref, level=self.level)
+            return lz.compress()
@@ -1,6 +1,6 @@
-import copy
+import array
 import struct
-from typing import Any, Dict, Final, List, Optional, Union
+from typing import Any, Dict, Final, List, Optional
 
 
 # Hack to get around mypy's lack of scoping on types.
@@ -8,6 +8,23 @@ _renamed_float = float
 _renamed_bool = bool
 
 
+# Typecodes for the array module, keyed by struct encoding, used to store numeric arrays
+# compactly. Floating point arrays are kept at double precision so that values read back
+# exactly as they were set, and are narrowed when encoded.
+_ARRAY_TYPECODES: Final[Dict[str, str]] = {
+    'b': 'b',
+    'B': 'B',
+    'h': 'h',
+    'H': 'H',
+    'i': 'i',
+    'I': 'I',
+    'q': 'q',
+    'Q': 'Q',
+    'f': 'd',
+    'd': 'd',
+}
+
+
 class NodeException(Exception):
     """
     An exception thrown when we encounter an issue with a property node.
@@ -21,6 +38,18 @@ class Node:
     supported for a node to not have a value or children. This also includes a decent amount of
     constructor helper classmethods to make constructing a tree from source code easier.
     """
+    __slots__ = (
+        '__name',
+        '__array',
+        '__translated_type',
+        '__type',
+        '__attrs',
+        '__value',
+        '__children',
+        '__index',
+        '__indexed',
+    )
+
     NODE_NAME_CHARS: Final[str] = "0123456789:ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
 
     NODE_TYPE_VOID: Final[int] = 1
@@ -352,6 +381,18 @@ class Node:
             'composite': False,
         },
     }
+    # Reverse lookup of the above NODE_TYPES table.
+    NODE_TYPENAMES: Final[Dict[str, int]] = {typeinfo['name']: nodetype for nodetype, typeinfo in NODE_TYPES.items()}
+    # Array module typecodes that numeric arrays of a given node type are stored as.
+    ARRAY_TYPECODES: Final[Dict[int, str]] = {
+        nodetype: _ARRAY_TYPECODES[typeinfo['enc']]
+        for nodetype, typeinfo in NODE_TYPES.items()
+        if typeinfo['name'] != 'bool' and typeinfo['enc'] in _ARRAY_TYPECODES
+    }
+
+    # Number of children a node needs before child() lookups are done through an index.
+    CHILD_INDEX_THRESHOLD: Final[int] = 8
+
     ARRAY_BIT: Final[int] = 0x40
     ATTR_TYPE: Final[int] = 0x2E
     END_OF_NODE: Final[int] = 0xFE
@@ -504,11 +545,7 @@ class Node:
         Returns:
             An integer specifying the node type or None if not found.
         """
-        for nodetype in Node.NODE_TYPES:
-            if typename.lower() == Node.NODE_TYPES[nodetype]['name']:
-                return nodetype
-
-        return None
+        return Node.NODE_TYPENAMES.get(typename.lower())
 
     @staticmethod
     def __validate(nodetype: int, name: str, value: int) -> None:
@@ -556,9 +593,11 @@ class Node:
         self.__array = False
         self.__translated_type: Optional[Dict[str, Any]] = None
         self.__type: Optional[int] = None
-        self.__attrs: Dict[str, str] = {}
+        self.__attrs: Optional[Dict[str, str]] = None
         self.__value: Any = None
         self.__children: List[Node] = []
+        self.__index: Optional[Dict[str, Node]] = None
+        self.__indexed = 0
 
         if name is not None:
             self.set_name(name)
@@ -679,6 +718,8 @@ class Node:
             val - The string value to set the attribute value to. Defaults to empty string if
                   not provided.
         """
+        if self.__attrs is None:
+            self.__attrs = {}
         self.__attrs[attr] = val
 
     def attribute(self, attr: str, default: Optional[str]=None) -> Optional[str]:
@@ -691,6 +732,8 @@ class Node:
         Returns:
             The attribute value as a string.
         """
+        if self.__attrs is None:
+            return default
         return self.__attrs.get(attr, default)
 
     def add_child(self, child: 'Node') -> None:
@@ -704,6 +747,10 @@ class Node:
             raise NodeException('Invalid child')
 
         self.__children.append(child)
+        if self.__index is not None and self.__indexed == len(self.__children) - 1:
+            # Keep the index current, remembering only the first child of a given name.
+            self.__index.setdefault(child.name, child)
+            self.__indexed += 1
 
     def child(self, name: str) -> Optional['Node']:
         """
@@ -718,6 +765,19 @@ class Node:
             A Node if a child was found by name, or None if not.
         """
         tree = name.split('/', 1)
+        if len(self.__children) >= Node.CHILD_INDEX_THRESHOLD:
+            if self.__index is None or self.__indexed != len(self.__children):
+                # Build (or rebuild, if the children were modified directly) the index.
+                self.__index = {}
+                for child in self.__children:
+                    self.__index.setdefault(child.name, child)
+                self.__indexed = len(self.__children)
+
+            found = self.__index.get(tree[0])
+            if found is None or len(tree) == 1:
+                return found
+            return found.child(tree[1])
+
         for child in self.__children:
             if child.name == tree[0]:
                 if len(tree) == 1:
@@ -763,8 +823,11 @@ class Node:
         Wrapper for accessing attributes.
 
         Returns:
-            A dictionary keyed by attribute name whose values are strings.
+            A dictionary keyed by attribute name whose values are strings. Attributes
+            should be modified using set_attribute().
         """
+        if self.__attrs is None:
+            return {}
         return self.__attrs
 
     @property
@@ -798,7 +861,7 @@ class Node:
         Paramters:
             val - A mixed value to set the node to.
         """
-        is_array = isinstance(val, (list, tuple))
+        is_array = isinstance(val, (list, tuple, array.array))
 
         if self.__translated_type is None:
             raise Exception('Logic error, tried to set value before setting type!')
@@ -814,18 +877,16 @@ class Node:
         if is_array != self.__array:
             raise NodeException(f'Input {"is" if is_array else "is not"} array, expected {"array" if self.__array else "scalar"}')
 
-        def val_to_str(val: Any) -> Union[str, bytes]:
+        def convert(val: Any) -> Any:
             if translated_type['name'] == 'bool':
                 # Support user-built boolean types
-                if val is True:
-                    return 'true'
-                if val is False:
-                    return 'false'
+                if val is True or val is False:
+                    return val
 
                 # Support construction from binary
-                return 'true' if val != 0 else 'false'
+                return val != 0
             elif translated_type['name'] == 'float':
-                return str(val)
+                return float(val)
             elif translated_type['name'] == 'ip4':
                 try:
                     # Support construction from binary
@@ -839,15 +900,31 @@ class Node:
 
                     raise NodeException(f'Invalid value {val} for IP4 type')
             elif translated_type['int']:
-                return str(val)
+                return int(val)
             else:
-                # This could return either a string or bytes.
+                # This could be either a string or bytes.
                 return val
 
-        if is_array or translated_type['composite']:
-            self.__value = [val_to_str(v) for v in val]
+        if is_array:
+            typecode = Node.ARRAY_TYPECODES.get(self.__type & (~Node.ARRAY_BIT))
+            if typecode is not None:
+                # Numeric arrays are stored packed, which is much smaller than a list of
+                # python objects and lets the binary encoder write them out in bulk.
+                try:
+                    try:
+                        self.__value = array.array(typecode, val)
+                    except TypeError:
+                        self.__value = array.array(typecode, [convert(v) for v in val])
+                    return
+                except OverflowError:
+                    # Out of range values can't be packed, so store them as they are
+                    # and let the encoders complain about them.
+                    pass
+            self.__value = [convert(v) for v in val]
+        elif translated_type['composite']:
+            self.__value = [convert(v) for v in val]
         else:
-            self.__value = val_to_str(val)
+            self.__value = convert(val)
 
     @property
     def value(self) -> Any:
@@ -859,28 +936,32 @@ class Node:
         """
         if self.__translated_type is None:
             raise Exception('Logic error, tried to get value before setting type!')
-        translated_type: Dict[str, Any] = self.__translated_type
 
-        def str_to_val(string: Union[str, bytes]) -> Any:
-            if translated_type['name'] == 'bool':
-                return True if string == 'true' else False
-            elif translated_type['name'] == 'float':
-                return float(string)
-            elif translated_type['name'] == 'ip4':
-                if not isinstance(string, str):
-                    raise Exception('Logic error, expected a string!')
-                ip = [int(tup) for tup in string.split('.')]
-                return struct.pack('BBBB', ip[0], ip[1], ip[2], ip[3])
-            elif translated_type['int']:
-                return int(string)
-            else:
-                # At this point, we could be a string or bytes.
-                return string
-
-        if self.__array or translated_type['composite']:
-            return [str_to_val(v) for v in self.__value]
+        if self.__value is None:
+            return None
+        elif isinstance(self.__value, array.array):
+            return self.__value.tolist()
+        elif isinstance(self.__value, list):
+            return list(self.__value)
+        elif self.__translated_type['name'] == 'ip4':
+            ip = [int(tup) for tup in self.__value.split('.')]
+            return struct.pack('BBBB', ip[0], ip[1], ip[2], ip[3])
         else:
-            return str_to_val(self.__value)
+            return self.__value
+
+    @property
+    def array_value(self) -> Optional[array.array]:
+        """
+        Gets the packed storage of a numeric array node, so that it can be bulk encoded
+        without converting every element. This must not be modified by the caller.
+
+        Returns:
+            An array.array holding this node's values, or None if this node's value isn't
+            stored packed, such as for scalars and boolean arrays.
+        """
+        if isinstance(self.__value, array.array):
+            return self.__value
+        return None
 
     def __to_xml(self, depth: int) -> str:
         """
@@ -897,7 +978,7 @@ class Node:
             raise Exception('Logic error, tried to get XML representation before setting type!')
         translated_type: Dict[str, Any] = self.__translated_type
 
-        attrs_dict = copy.deepcopy(self.__attrs)
+        attrs_dict = dict(self.attributes)
         order = sorted(attrs_dict.keys())
         if self.data_length != 0:
             # Represent type and length
@@ -930,12 +1011,17 @@ class Node:
         else:
             attrs = ''
 
+        def val_to_str(val: Any) -> str:
+            if translated_type['name'] == 'bool':
+                return 'true' if val else 'false'
+            return str(val)
+
         def get_val() -> str:
             if self.__array or translated_type['composite']:
                 if self.__value is None:
                     vals = ''
                 else:
-                    vals = ' '.join([val for val in self.__value])
+                    vals = ' '.join([val_to_str(val) for val in self.__value])
             elif translated_type['name'] == 'str':
                 vals = escape(self.__value)
             elif translated_type['name'] == 'bin':
@@ -948,7 +1034,7 @@ class Node:
 
                 vals = ''.join([bin_to_hex(v) for v in self.__value])
             else:
-                vals = str(self.__value)
+                vals = val_to_str(self.__value)
             return vals
 
         if self.__children:
@@ -1010,16 +1096,14 @@ class Node:
                 if len(self.__value) != len(other.__value):
                     return False
 
-                for i in range(len(self.__value)):
-                    if self.__value[i] != other.__value[i]:
+                # Arrays may be stored packed or as lists depending on their contents,
+                # and packed arrays never compare equal to lists.
+                for mine, theirs in zip(self.__value, other.__value):
+                    if mine != theirs:
                         return False
 
-            for attr in self.__attrs:
-                if other.attribute(attr) != self.attribute(attr):
-                    return False
-            for attr in other.__attrs:
-                if self.attribute(attr) != other.attribute(attr):
-                    return False
+            if self.attributes != other.attributes:
+                return False
 
             if len(self.__children) != len(other.__children):
                 return False
@@ -1,8 +1,10 @@
 import binascii
 import hashlib
+from functools import lru_cache
 from typing import Final, Optional
 
 from bemani.protocol.lz77 import Lz77
+from bemani.protocol.rc4 import RC4
 from bemani.protocol.binary import BinaryEncoding
 from bemani.protocol.xml import XmlEncoding
 from bemani.protocol.node import Node
@@ -47,24 +49,30 @@ class EAmuseProtocol:
         Returns:
             binary string representing the encrypted/decrypted data
         """
-        S = list(range(256))
-        j = 0
-        out = []
+        return RC4(key).crypt(data)
 
-        # KSA Phase
-        for i in range(256):
-            j = (j + S[i] + key[i % len(key)]) & 0xFF
-            S[i], S[j] = S[j], S[i]
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _derive_key(encryption_key: str) -> bytes:
+        """
+        Given an encryption key as returned from a HTTP request, derive the real
+        RC4 key. This is cached since we see the same key at least twice per
+        request (once to decrypt the request and once to encrypt the response).
+
+        Parameters:
+            encryption_key - A string encryption key in the form 1-xxyyzzww-aabb.
 
-        # PRGA Phase
-        i = j = 0
-        for char in data:
-            i = (i + 1) & 0xFF
-            j = (j + S[i]) & 0XFF
-            S[i], S[j] = S[j], S[i]
-            out.append(char ^ S[(S[i] + S[j]) & 0xFF])
+        Returns:
+            binary string representing the RC4 key to use.
+        """
+        # Key is concatenated with the shared secret above
+        version, first, second = encryption_key.split('-')
+        key = binascii.unhexlify((first + second).encode('ascii')) + EAmuseProtocol.SHARED_SECRET
 
-        return bytes(out)
+        # Next, key is sent through MD5 to derive the real key
+        m = hashlib.md5()
+        m.update(key)
+        return m.digest()
 
     def __decrypt(self, encryption_key: Optional[str], data: bytes) -> bytes:
         """
@@ -82,20 +90,9 @@ class EAmuseProtocol:
         if data is None:
             return None
 
-        key: Optional[bytes] = None
         if encryption_key:
-            # Key is concatenated with the shared secret above
-            version, first, second = encryption_key.split('-')
-            key = binascii.unhexlify((first + second).encode('ascii')) + EAmuseProtocol.SHARED_SECRET
-
-            # Next, key is sent through MD5 to derive the real key
-            m = hashlib.md5()
-            m.update(key)
-            key = m.digest()
-
-        if key:
             # This is an encrypted old-style packet
-            return self._rc4_crypt(data, key)
+            return self._rc4_crypt(data, EAmuseProtocol._derive_key(encryption_key))
 
         # No encryption
         return data
@@ -142,7 +139,7 @@ class EAmuseProtocol:
         else:
             raise EAmuseException(f'Unknown compression {compression}')
 
-    def __compress(self, compression: Optional[str], data: bytes) -> bytes:
+    def __compress(self, compression: Optional[str], data: bytes, compress_level: Optional[int]=None) -> bytes:
         """
         Given data and an optional compression scheme, compress the data.
 
@@ -151,6 +148,7 @@ class EAmuseProtocol:
                           be of the form 'l7zz' or 'none'. The python value
                           None will also be recognized as 'none'.
             data - Binary string representing data to transform.
+            compress_level - An optional compression level to use, see Lz77Compress.
 
         Returns:
             binary string representing transformed data
@@ -163,7 +161,7 @@ class EAmuseProtocol:
             return data
         elif compression == 'lz77':
             # This is a compressed new-style packet
-            lz = Lz77()
+            lz = Lz77(level=compress_level)
             return lz.compress(data)
         else:
             raise EAmuseException(f'Unknown compression {compression}')
@@ -254,6 +252,7 @@ class EAmuseProtocol:
         tree: Node,
         text_encoding: Optional[str]=None,
         packet_encoding: Optional[int]=None,
+        compress_level: Optional[int]=None,
     ) -> bytes:
         """
         Given a response with optional compression and encryption set, encode, compress
@@ -268,6 +267,8 @@ class EAmuseProtocol:
                             last decoded packet. See __encode for values.
             packet_encpding - A packet encoding to use. If not provided, uses the packet encoding
                               of the last decoded packet. See __encode for values.
+            compress_level - A compression level to use when compressing. If not provided, uses
+                             the default compression level. See Lz77Compress for values.
 
         Returns:
             A blob of data representing the encoded packet.
@@ -288,5 +289,5 @@ class EAmuseProtocol:
         self.last_packet_encoding = None
 
         data = self.__encode(tree, text_encoding, packet_encoding)
-        data = self.__compress(compression, data)
+        data = self.__compress(compression, data, compress_level)
         return self.__encrypt(encryption, data)
@@ -0,0 +1,101 @@
+import ctypes
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from .. import package_root
+
+
+# Attempt to use the faster C++ libraries if they're available
+try:
+    clib = None
+    clib_path = os.path.join(package_root, "protocol")
+    files = [f for f in os.listdir(clib_path) if f.startswith("rc4cpp") and f.endswith(".so")]
+    if len(files) > 0:
+        clib = ctypes.cdll.LoadLibrary(os.path.join(clib_path, files[0]))
+        clib.rc4_crypt.argtypes = (ctypes.c_char_p, ctypes.c_uint, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint)
+        clib.rc4_crypt.restype = ctypes.c_int
+except Exception:
+    clib = None
+
+
+class RC4Exception(Exception):
+    """
+    An exception thrown when we encounter an error with RC4 encryption/decryption.
+    """
+
+
+@lru_cache(maxsize=256)
+def _schedule_key(key: bytes) -> Tuple[int, ...]:
+    """
+    Run the RC4 key scheduling algorithm over a key, returning the initial
+    permutation. This is cached since the same key is used to decrypt a request
+    and then encrypt its response, and possibly again when proxying.
+    """
+    S = list(range(256))
+    j = 0
+    keylen = len(key)
+
+    for i in range(256):
+        j = (j + S[i] + key[i % keylen]) & 0xFF
+        S[i], S[j] = S[j], S[i]
+
+    return tuple(S)
+
+
+class RC4:
+    """
+    A class that can encrypt or decrypt data using RC4, as used for packet encryption
+    by older E-Amusement games. Since RC4 is symmetric, the same call is used for both
+    operations. If the compiled C++ implementation is available this will be used,
+    otherwise we fall back to a pure python implementation.
+    """
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Initialize the object.
+
+        Parameters:
+            key - Binary string representing the key to use.
+        """
+        if not key:
+            raise RC4Exception("Cannot use an empty key!")
+        self.key = key
+
+    def crypt(self, data: bytes) -> bytes:
+        """
+        Given a data blob, perform RC4 encryption/decryption.
+
+        Parameters:
+            data - Binary string representing data to be encrypted/decrypted
+
+        Returns:
+            binary string representing the encrypted/decrypted data
+        """
+        if clib is not None:
+            outbuf = ctypes.create_string_buffer(len(data))
+            result = clib.rc4_crypt(self.key, len(self.key), data, outbuf, len(data))
+            if result >= 0:
+                return outbuf.raw[:result]
+            elif result == -1:
+                raise RC4Exception("Cannot use an empty key!")
+            else:
+                raise RC4Exception("Unknown exception in C++ code!")
+        else:
+            S = list(_schedule_key(self.key))
+            length = len(data)
+            stream = bytearray(length)
+            i = j = 0
+
+            # PRGA Phase, generating only the keystream so that we can XOR
+            # the whole thing in one go below instead of byte by byte.
+            for pos in range(length):
+                i = (i + 1) & 0xFF
+                si = S[i]
+                j = (j + si) & 0xFF
+                sj = S[j]
+                S[i] = sj
+                S[j] = si
+                stream[pos] = S[(si + sj) & 0xFF]
+
+            return (int.from_bytes(data, 'little') ^ int.from_bytes(stream, 'little')).to_bytes(length, 'little')
@@ -0,0 +1,45 @@
+#include <stdio.h>
+#include <stdint.h>
+
+extern "C"
+{
+    int rc4_crypt(uint8_t *key, unsigned int keylen, uint8_t *indata, uint8_t *outdata, unsigned int datalen)
+    {
+        if (keylen == 0)
+        {
+            // We cannot schedule an empty key, it would divide by zero below.
+            return -1;
+        }
+
+        uint8_t S[256];
+        for (unsigned int i = 0; i < 256; i++)
+        {
+            S[i] = i;
+        }
+
+        // KSA Phase
+        uint8_t j = 0;
+        for (unsigned int i = 0; i < 256; i++)
+        {
+            j = j + S[i] + key[i % keylen];
+            uint8_t tmp = S[i];
+            S[i] = S[j];
+            S[j] = tmp;
+        }
+
+        // PRGA Phase
+        uint8_t i = 0;
+        j = 0;
+        for (unsigned int loc = 0; loc < datalen; loc++)
+        {
+            i = i + 1;
+            j = j + S[i];
+            uint8_t tmp = S[i];
+            S[i] = S[j];
+            S[j] = tmp;
+            outdata[loc] = indata[loc] ^ S[(uint8_t)(S[i] + S[j])];
+        }
+
+        return datalen;
+    }
+}
@@ -1,8 +1,8 @@
 import copy
+import re
 import struct
-from typing import Any, Dict, Final, Iterator, List, Optional, Tuple
+from typing import Any, Dict, Final, List, Optional, Tuple
 
-from bemani.protocol.stream import InputStream
 from bemani.protocol.node import Node
 
 
@@ -20,6 +20,11 @@ class XmlDecoder:
     making them unsuitable for a protocol with exact specifications.
     """
 
+    # An attribute name is everything from the first non-whitespace character up to the
+    # equals sign. Anything between the equals sign and the opening quote is ignored.
+    ATTRIBUTE_REGEX: Final["re.Pattern[bytes]"] = re.compile(rb'\s*(\S[^=]*)=[^"\']*(["\'])(.*?)\2', re.DOTALL)
+    WHITESPACE_REGEX: Final["re.Pattern[bytes]"] = re.compile(rb'\s')
+
     def __init__(self, data: bytes, encoding: str) -> None:
         """
         Initialize the XML decoder.
@@ -28,7 +33,7 @@ class XmlDecoder:
             data - String XML data which should be decoded into Nodes.
             encoding - The expected encoding of the XML.
         """
-        self.stream = InputStream(data)
+        self.data = data
         self.root: Optional[Node] = None
         self.current: List[Node] = []
         self.encoding = encoding
@@ -92,20 +97,6 @@ class XmlDecoder:
             parent = self.current[-1]
             parent.add_child(node)
 
-    def __yield_values(self, text: str) -> Iterator[str]:
-        value = ''
-
-        for c in text:
-            if c.isspace():
-                if len(value) > 0:
-                    yield value
-                    value = ''
-            else:
-                value = value + c
-
-        if len(value) > 0:
-            yield value
-
     def __text(self, text: bytes) -> None:
         """
         Called when we finish parsing arbitrary non-element text. Note that the text passed in is in
@@ -146,11 +137,17 @@ class XmlDecoder:
                     return struct.pack('>B', intval)
 
                 # Remove any spaces first
-                value = ''.join([c for c in value if not c.isspace()])
+                value = ''.join(value.split())
+                try:
+                    binvalue = bytes.fromhex(value)
+                except ValueError:
+                    # Odd length or otherwise unusual, convert the slow way.
+                    binvalue = b''.join([hex_to_bin(value[i:(i + 2)]) for i in range(0, len(value), 2)])
+
                 if self.current[-1].value is None:
-                    self.current[-1].set_value(b''.join([hex_to_bin(value[i:(i + 2)]) for i in range(0, len(value), 2)]))
+                    self.current[-1].set_value(binvalue)
                 else:
-                    self.current[-1].set_value(self.current[-1].value + b''.join([hex_to_bin(value[i:(i + 2)]) for i in range(0, len(value), 2)]))
+                    self.current[-1].set_value(self.current[-1].value + binvalue)
             elif data_type == 'ip4':
                 # Do nothing, already fine
                 self.current[-1].set_value(value)
@@ -162,17 +159,17 @@ class XmlDecoder:
                         return True
 
                 if array or composite:
-                    self.current[-1].set_value([conv_bool(v) for v in self.__yield_values(value)])
+                    self.current[-1].set_value([conv_bool(v) for v in value.split()])
                 else:
                     self.current[-1].set_value(conv_bool(value))
             elif data_type == 'float':
                 if array or composite:
-                    self.current[-1].set_value([float(v) for v in self.__yield_values(value)])
+                    self.current[-1].set_value([float(v) for v in value.split()])
                 else:
                     self.current[-1].set_value(float(value))
             else:
                 if array or composite:
-                    self.current[-1].set_value([int(v) for v in self.__yield_values(value)])
+                    self.current[-1].set_value([int(v) for v in value.split()])
                 else:
                     self.current[-1].set_value(int(value))
 
@@ -185,14 +182,12 @@ class XmlDecoder:
             A dictionary keyed by the attribute name and who's values are unescaped strings.
             If no attributes exist, this returns an empty dictionary.
         """
-        attr_stream = InputStream(attributes)
         parsed_attrs: Dict[str, str] = {}
-        state = 'space'
-        attr = b''
-        val = b''
 
         def unescape(value: bytes) -> str:
             val = value.decode(self.encoding)
+            if '&' not in val:
+                return val
             val = val.replace('&amp;', '&')
             val = val.replace('&lt;', '<')
             val = val.replace('&gt;', '>')
@@ -201,65 +196,21 @@ class XmlDecoder:
             val = val.replace('&#13;', '\r')
             return val.replace('&#10;', '\n')
 
+        pos = 0
         while True:
-            c = attr_stream.read_byte()
-
-            if c is None:
+            match = self.ATTRIBUTE_REGEX.match(attributes, pos)
+            if match is None:
+                # Either we're done, or we have a dangling attribute which we ignore.
                 return parsed_attrs
-            if state == 'space':
-                if not c.isspace():
-                    state = 'attr'
-                    attr = c
-            elif state == 'attr':
-                if c == b'=':
-                    attr = attr.strip()
-                    state = 'valstart'
-                else:
-                    attr = attr + c
-            elif state == 'valstart':
-                if c == b'"':
-                    state = 'valdouble'
-                    val = b''
-                elif c == b'\'':
-                    state = 'valsingle'
-                    val = b''
-            elif state == 'valdouble':
-                if c == b'"':
-                    state = 'space'
-                    parsed_attrs[attr.decode('ascii')] = unescape(val)
-                else:
-                    val = val + c
-            elif state == 'valsingle':
-                if c == b'\'':
-                    state = 'space'
-                    parsed_attrs[attr.decode('ascii')] = unescape(val)
-                else:
-                    val = val + c
 
-    def __split_node(self, content: bytes) -> Tuple[bytes, bytes]:
-        node_stream = InputStream(content)
-        tag = b''
-        attributes = b''
-        state = "tag"
+            parsed_attrs[match.group(1).strip().decode('ascii')] = unescape(match.group(3))
+            pos = match.end()
 
-        while True:
-            c = node_stream.read_byte()
-
-            if c is None:
-                break
-            if state == "tag":
-                if c.isspace():
-                    state = "space"
-                else:
-                    tag = tag + c
-            elif state == "space":
-                if not c.isspace():
-                    attributes = c
-                    state = "attributes"
-            elif state == "attributes":
-                attributes = attributes + c
-
-        return (tag, attributes)
+    def __split_node(self, content: bytes) -> Tuple[bytes, bytes]:
+        match = self.WHITESPACE_REGEX.search(content)
+        if match is None:
+            return (content, b'')
+        return (content[:match.start()], content[match.end():].lstrip())
 
     def __handle_node(self, content: bytes) -> None:
         """
@@ -298,36 +249,41 @@ class XmlDecoder:
             if empty:
                 self.__end_element(tag)
 
-    def get_tree(self) -> Optional[Node]:
+    def get_tree(self, header_only: bool=False) -> Optional[Node]:
         """
         Walk the XML document and parse into nodes.
 
+        Parameters:
+            header_only - If set, stop parsing as soon as the root node and its first
+                          child node have been seen, returning a tree with just those
+                          two nodes and their attributes. This is enough to figure out
+                          what a packet is for without parsing the whole thing.
+
         Returns:
             A Node object representing the root of the XML document.
         """
-        state = 'text'
-        text = b''
-        node = b''
+        data = self.data
+        pos = 0
 
         while True:
-            c = self.stream.read_byte()
+            start = data.find(b'<', pos)
+            if start < 0:
+                return self.root
+            self.__text(data[pos:start])
 
-            if c is None:
+            end = data.find(b'>', start + 1)
+            if end < 0:
                 return self.root
-            elif state == 'text':
-                if c == b'<':
-                    self.__text(text)
-                    state = 'node'
-                    node = b''
-                else:
-                    text = text + c
-            elif state == 'node':
-                if c == b'>':
-                    self.__handle_node(node)
-                    state = 'text'
-                    text = b''
-                else:
-                    node = node + c
+            self.__handle_node(data[(start + 1):end])
+            pos = end + 1
+
+            if header_only and self.current:
+                # Once we know the root and its first child, we can stop here.
+                if len(self.current) > 1:
+                    self.current[0].add_child(self.current[1])
+                    return self.current[0]
+                if self.current[0].children:
+                    return self.current[0]
 
 
 class XmlEncoder:
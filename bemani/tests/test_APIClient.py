@@ -1,11 +1,17 @@
 # vim: set fileencoding=utf-8
 import unittest
+from typing import Any
+from unittest.mock import Mock, patch
 
+from bemani.common import GameConstants, VersionConstants
 from bemani.data.api.client import APIClient
 
 
 class TestAPIClient(unittest.TestCase):
 
+    def setUp(self) -> None:
+        APIClient.STATISTICS_CACHE.invalidate()
+
     def test_content_type(self) -> None:
         client = APIClient('https://127.0.0.1', 'token', False, False)
         self.assertFalse(client._content_type_valid('application/text'))
@@ -19,3 +25,33 @@ class TestAPIClient(unittest.TestCase):
         self.assertTrue(client._content_type_valid('application/json;charset=UTF-8'))
         self.assertTrue(client._content_type_valid('application/json;charset = UTF-8'))
         self.assertTrue(client._content_type_valid('application/json; charset = UTF-8'))
+
+    def test_failing_server(self) -> None:
+        def request(*args: Any, **kwargs: Any) -> None:
+            raise ConnectionError('down')
+
+        with patch('requests.Session.request', side_effect=request) as mock:
+            client = APIClient('https://failing.example.com', 'token', True, True)
+            for _ in range(3):
+                self.assertEqual(client.get_statistics(GameConstants.IIDX, VersionConstants.IIDX_SPADA, 'server', []), [])
+            self.assertEqual(mock.call_count, 3)
+
+            # Once a server has failed enough, we should stop waiting on it, even from new clients.
+            client = APIClient('https://failing.example.com', 'token', True, True)
+            self.assertEqual(client.get_statistics(GameConstants.IIDX, VersionConstants.IIDX_SPADA, 'server', []), [])
+            self.assertEqual(mock.call_count, 3)
+
+    def test_cached_response(self) -> None:
+        response = Mock()
+        response.status_code = 200
+        response.headers = {'content-type': 'application/json; charset=utf-8'}
+        response.json.return_value = {'statistics': [{'plays': 5}]}
+
+        with patch('requests.Session.request', return_value=response) as mock:
+            client = APIClient('https://cached.example.com', 'token', True, True)
+            for _ in range(2):
+                stats = client.get_statistics(GameConstants.IIDX, VersionConstants.IIDX_SPADA, 'server', [])
+                self.assertEqual(stats, [{'plays': 5}])
+                stats[0]['plays'] = 6
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(mock.call_args[1]['timeout'], (APIClient.CONNECT_TIMEOUT, APIClient.READ_TIMEOUTS['statistics']))
@@ -30,9 +30,28 @@ class TestBaseData(unittest.TestCase):
         }
 
         serialized = data.serialize(testdict)
-        self.assertEqual(serialized, '{"bytes": ["__bytes__", 1, 2, 3, 4, 5]}')
+        self.assertIn('{"__bytes64__":', serialized)
+        self.assertIn('"AQIDBAU="', serialized)
         self.assertEqual(data.deserialize(serialized), testdict)
 
+    def test_legacy_byte_deserialize(self) -> None:
+        data = BaseData({}, None)
+
+        # Rows written before bytes were base64 encoded should still load.
+        self.assertEqual(
+            data.deserialize('{"bytes": ["__bytes__", 1, 2, 3, 4, 5], "list": ["__bytes64__", 1]}'),
+            {'bytes': b'\x01\x02\x03\x04\x05', 'list': ['__bytes64__', 1]},
+        )
+
+    def test_non_string_keys(self) -> None:
+        data = BaseData({}, None)
+
+        # Keys are always stringified, regardless of the JSON library in use.
+        self.assertEqual(
+            data.deserialize(data.serialize({1: 'a', 'big': 2 ** 64 - 1})),  # type: ignore
+            {'1': 'a', 'big': 2 ** 64 - 1},
+        )
+
     def test_deep_byte_serialize(self) -> None:
         data = BaseData({}, None)
 
@@ -0,0 +1,86 @@
+# vim: set fileencoding=utf-8
+import random
+import unittest
+
+from bemani.protocol.binary import BinaryEncoding, PackedAllocator, PackedOrdering
+from bemani.protocol.node import Node
+
+
+class TestBinaryEncoding(unittest.TestCase):
+
+    def test_allocator_matches_ordering(self) -> None:
+        for _ in range(50):
+            ordering = PackedOrdering(0, allow_expansion=True)
+            allocator = PackedAllocator(0, allow_expansion=True)
+
+            for _ in range(200):
+                alignment = random.choice([1, 2, 4, 4])
+                if alignment == 1:
+                    loc = ordering.get_next_byte()
+                    self.assertEqual(loc, allocator.get_next_byte())
+                    size = 1
+                elif alignment == 2:
+                    loc = ordering.get_next_short()
+                    self.assertEqual(loc, allocator.get_next_short())
+                    size = 2
+                else:
+                    loc = ordering.get_next_int()
+                    self.assertEqual(loc, allocator.get_next_int())
+                    size = random.choice([4, 8, 6, 13])
+
+                round_to = 4 if size == 13 else 1
+                ordering.mark_used(size, loc, round_to=round_to)
+                allocator.mark_used(size, loc, round_to=round_to)
+
+    def test_fast_matches_reference(self) -> None:
+        root = Node.void('response')
+        root.set_attribute('status', '0')
+        for i in range(100):
+            child = Node.void('entry')
+            child.set_attribute('id', str(i))
+            root.add_child(child)
+            child.add_child(Node.u8('u8', i))
+            child.add_child(Node.s16_array('s16_array', [random.randint(-32768, 32767) for _ in range(i % 17)]))
+            child.add_child(Node.bool('bool', i % 2 == 0))
+            child.add_child(Node.string('str', f'エントリー{i}'))
+            child.add_child(Node.u16('u16', i * 100))
+            child.add_child(Node.binary('bin', bytes([i] * (i % 7))))
+            child.add_child(Node.s64('s64', -i))
+            child.add_child(Node.fouru8('4u8', [i, i, 0, 255]))
+            child.add_child(Node.bool_array('bool_array', [True, False, i % 3 == 0]))
+            child.add_child(Node.float_array('float_array', [1.5, -2.25]))
+
+        fast = BinaryEncoding().encode(root, 'shift-jis')
+        reference = BinaryEncoding(reference=True).encode(root, 'shift-jis')
+        self.assertEqual(fast, reference)
+        self.assertEqual(BinaryEncoding().decode(reference), root)
+        self.assertEqual(BinaryEncoding(reference=True).decode(fast), root)
+
+    def test_odd_sized_composite(self) -> None:
+        root = Node.void('response')
+        root.add_child(Node.u8('before', 1))
+        root.add_child(Node('threes16', type=Node.NODE_TYPE_3S16, value=[1, -2, 3]))
+        root.add_child(Node.u8('after', 2))
+
+        fast = BinaryEncoding().encode(root, 'shift-jis')
+        reference = BinaryEncoding(reference=True).encode(root, 'shift-jis')
+        self.assertEqual(fast, reference)
+        self.assertEqual(BinaryEncoding().decode(fast), root)
+
+    def test_empty_arrays(self) -> None:
+        root = Node.void('response')
+        root.add_child(Node.s16_array('s16_array', []))
+        root.add_child(Node.bool_array('bool_array', []))
+        root.add_child(Node('ip4_array', type=Node.NODE_TYPE_IP4, array=True, value=[]))
+
+        fast = BinaryEncoding().encode(root, 'shift-jis')
+        reference = BinaryEncoding(reference=True).encode(root, 'shift-jis')
+        self.assertEqual(fast, reference)
+        self.assertEqual(BinaryEncoding().decode(fast), root)
+
+    def test_truncated_body(self) -> None:
+        root = Node.void('response')
+        root.add_child(Node.u32_array('data', list(range(100))))
+        data = BinaryEncoding().encode(root, 'shift-jis')
+
+        self.assertIsNone(BinaryEncoding().decode(data[:-8], skip_on_exceptions=True))
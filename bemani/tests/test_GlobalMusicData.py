@@ -0,0 +1,80 @@
+# vim: set fileencoding=utf-8
+import unittest
+from unittest.mock import Mock, patch
+
+from bemani.common import APIConstants, GameConstants, VersionConstants
+from bemani.data.api.client import APIClient
+from bemani.data.api.music import GlobalMusicData
+from bemani.data.remoteuser import RemoteUser
+from bemani.data.types import Server
+
+
+class TestGlobalMusicData(unittest.TestCase):
+
+    def __make_api(self) -> Mock:
+        api = Mock()
+        api.get_all_servers.return_value = [
+            Server(1, 0, 'https://scores.example.com', 'token', False, True),
+            Server(2, 0, 'https://stats.example.com', 'token', True, False),
+        ]
+        return api
+
+    def test_unmirrored_records(self) -> None:
+        api = self.__make_api()
+        user = Mock()
+        user.get_all_cards.return_value = []
+        local = Mock()
+        local.get_all_scores.return_value = []
+        music = GlobalMusicData(api, user, local)
+
+        with patch.object(APIClient, 'get_records', return_value=[]) as get_records:
+            music.get_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, RemoteUser.card_to_userid('E004010000000001'), since=5)
+            music.get_all_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, songid=1000, songchart=2)
+
+            # Without a local copy, every remote server should be asked directly.
+            get_records.assert_any_call(
+                GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, APIConstants.ID_TYPE_CARD, ['E004010000000001'], 5, None,
+            )
+            get_records.assert_any_call(
+                GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, APIConstants.ID_TYPE_SONG, [1000, 2], None, None,
+            )
+            self.assertEqual(music.refresh_remote_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL), 0)
+
+    def test_mirrored_records(self) -> None:
+        api = self.__make_api()
+        mirror = Mock()
+        mirror.get_remote_records.return_value = []
+        user = Mock()
+        user.get_all_cards.return_value = []
+        local = Mock()
+        local.get_all_scores.return_value = []
+        music = GlobalMusicData(api, user, local, mirror=mirror)
+
+        with patch.object(APIClient, 'get_records') as get_records:
+            music.get_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, RemoteUser.card_to_userid('E004010000000001'), since=5)
+            music.get_all_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, songid=1000, songchart=2)
+            get_records.assert_not_called()
+
+        # Only servers that share scores with us should be looked up.
+        mirror.get_remote_records.assert_any_call(
+            [1], GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, cards=['E004010000000001'], since=5, until=None,
+        )
+        mirror.get_remote_records.assert_any_call(
+            [1], GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, songid=1000, songchart=2, since=None, until=None,
+        )
+
+    def test_refresh_remote_scores(self) -> None:
+        api = self.__make_api()
+        mirror = Mock()
+        mirror.get_remote_records_cursor.return_value = 12345
+        records = [{'song': 1000, 'chart': 2, 'cards': ['AAAA'], 'timestamp': 12345, 'updated': 12350}]
+        music = GlobalMusicData(api, Mock(), Mock(), mirror=mirror)
+
+        with patch.object(APIClient, 'get_records', return_value=records) as get_records:
+            self.assertEqual(music.refresh_remote_scores(GameConstants.IIDX, VersionConstants.IIDX_PENDUAL), 1)
+            get_records.assert_called_once_with(
+                GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, APIConstants.ID_TYPE_SERVER, [], 12345,
+            )
+
+        mirror.get_remote_records_cursor.assert_called_once_with(1, GameConstants.IIDX, VersionConstants.IIDX_PENDUAL)
+        mirror.put_remote_records.assert_called_once_with(1, GameConstants.IIDX, VersionConstants.IIDX_PENDUAL, records)
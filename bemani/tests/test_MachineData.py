@@ -0,0 +1,92 @@
+# vim: set fileencoding=utf-8
+import unittest
+from typing import Any, Dict, List, Optional
+from unittest.mock import Mock
+
+from bemani.data.mysql.base import DataCache
+from bemani.data.mysql.machine import MachineData
+from bemani.tests.helpers import FakeCursor
+
+
+class TestMachineData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.version = 0
+        self.queries: List[str] = []
+        MachineData.MACHINE_CACHE.invalidate()
+        MachineData.ARCADE_CACHE.invalidate()
+
+    def execute(self, sql: str, params: Optional[Dict[str, Any]]=None, safe_write_operation: bool=False) -> FakeCursor:
+        self.queries.append(sql)
+        if 'FROM cache_version' in sql:
+            return FakeCursor([{'version': self.version}])
+        if 'INTO cache_version' in sql:
+            self.version += 1
+            return FakeCursor([])
+        if 'FROM machine' in sql:
+            return FakeCursor([{
+                'id': 1,
+                'name': 'name',
+                'description': 'description',
+                'arcadeid': None,
+                'port': 10000,
+                'game': None,
+                'version': None,
+                'data': '{}',
+            }])
+        return FakeCursor([])
+
+    def machine_queries(self) -> int:
+        return len([q for q in self.queries if 'FROM machine' in q])
+
+    def test_machine_cache(self) -> None:
+        data = MachineData({'database': {}}, None)
+        data.execute = Mock(side_effect=self.execute)
+
+        # Repeated lookups should only hit the DB once.
+        machine = data.get_machine('pcbid')
+        self.assertEqual(machine.name, 'name')
+        machine.name = 'modified'
+        machine = data.get_machine('pcbid')
+        self.assertEqual(machine.name, 'name')
+        self.assertEqual(self.machine_queries(), 1)
+
+        # Writes should drop the cached copy and bump the version.
+        data.put_machine(machine)
+        self.assertEqual(self.version, 1)
+        data.get_machine('pcbid')
+        self.assertEqual(self.machine_queries(), 2)
+
+        data.destroy_machine('pcbid')
+        self.assertEqual(self.version, 2)
+        data.get_machine('pcbid')
+        self.assertEqual(self.machine_queries(), 3)
+
+    def test_version_change(self) -> None:
+        cache = DataCache('test', poll_interval=0.0)
+        cache.set_version(1)
+        cache.put('key', 'value')
+        self.assertTrue(cache.needs_poll())
+        self.assertEqual(cache.get('key'), (True, 'value'))
+
+        # Another process bumping the version should drop everything.
+        cache.set_version(2)
+        self.assertEqual(cache.get('key'), (False, None))
+
+    def test_expiration_and_size(self) -> None:
+        cache = DataCache('test', size=2, ttl=0.0)
+        cache.put('key', 'value')
+        self.assertEqual(cache.get('key'), (False, None))
+
+        cache = DataCache('test', size=2)
+        cache.put('key1', 1)
+        cache.put('key2', 2)
+        cache.get('key1')
+        cache.put('key3', 3)
+        self.assertEqual(cache.get('key1'), (True, 1))
+        self.assertEqual(cache.get('key2'), (False, None))
+        self.assertEqual(cache.get('key3'), (True, 3))
+
+        # Missing objects can be cached too.
+        cache.put('missing', None)
+        self.assertEqual(cache.get('missing'), (True, None))
@@ -0,0 +1,301 @@
+# vim: set fileencoding=utf-8
+import contextlib
+import unittest
+from typing import Any, Dict, List, Optional
+from unittest.mock import Mock
+
+from bemani.common import DBConstants, GameConstants
+from bemani.data.mysql.music import MusicData
+from bemani.data.types import Attempt, Score, UserID
+from bemani.tests.helpers import FakeCursor
+
+
+class TestMusicData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.queries: List[str] = []
+        self.stats: List[Dict[str, Any]] = []
+        MusicData.MUSICID_CACHE.invalidate()
+        MusicData.SONG_CACHE.invalidate()
+
+    def execute(self, sql: str, params: Optional[Dict[str, Any]]=None, safe_write_operation: bool=False) -> FakeCursor:
+        self.queries.append(sql)
+        if 'FROM cache_version' in sql:
+            return FakeCursor([{'version': 1}])
+        if 'SELECT songid, chart, id FROM music' in sql:
+            return FakeCursor([
+                {'songid': 1000, 'chart': 0, 'id': 1},
+                {'songid': 1000, 'chart': 1, 'id': 2},
+            ])
+        if 'SELECT version, songid, chart, name, artist, genre, data FROM music' in sql:
+            return FakeCursor([
+                {'version': 1, 'songid': 1000, 'chart': 0, 'name': 'name', 'artist': 'artist', 'genre': 'genre', 'data': '{"bpm": 150}'},
+            ])
+        if 'SELECT id FROM music' in sql:
+            # Pretend a song was added after the catalog was loaded.
+            if params['songid'] == 1001:
+                return FakeCursor([{'id': 3}])
+            return FakeCursor([])
+        if 'INTO `music_stats`' in sql:
+            self.stats.append(params)
+            return FakeCursor([])
+        if 'FROM music_stats' in sql:
+            return FakeCursor([
+                {'songid': 1000, 'chart': 0, 'plays': 4, 'clears': 3, 'combos': 1, 'points': 4002},
+                {'songid': 1000, 'chart': 1, 'plays': 2, 'clears': 0, 'combos': 0, 'points': 10},
+            ])
+        if 'SELECT points, timestamp FROM score' in sql:
+            return FakeCursor([{'points': 100, 'timestamp': 5}] if params['userid'] == 1337 else [])
+        if 'AS position FROM score' in sql:
+            self.assertEqual(params, {'musicid': 2, 'points': 100, 'timestamp': 5})
+            return FakeCursor([{'position': 7}])
+        if 'DELETE FROM `score_total`' in sql or 'INTO `score_total`' in sql:
+            return FakeCursor([])
+        if 'FROM `score_total`' in sql:
+            self.assertEqual(params['name0'], 'total')
+            self.assertEqual(params['name1'], 'hard')
+            return FakeCursor([{'name': 'total', 'ahead': 4}])
+        if 'JOIN music' in sql:
+            return FakeCursor([])
+        if 'FROM score_history' in sql:
+            self.assertEqual((params['since_id'], params['until_id']), (10, None))
+            return FakeCursor([
+                {'songid': 1000, 'chart': 0, 'scorekey': 11, 'timestamp': 1, 'points': 5, 'new_record': 1, 'lid': 3, 'data': '{}', 'userid': 1337},
+            ])
+        if 'FROM score' in sql:
+            return FakeCursor([{
+                'scorekey': 5,
+                'userid': 1337,
+                'timestamp': 1,
+                'update': 2,
+                'lid': 3,
+                'plays': 4,
+                'points': 5,
+                'data': '{}',
+            }])
+        return FakeCursor([])
+
+    def test_get_score(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        score = music.get_score('game', 1, UserID(1337), 1000, 1)
+        self.assertEqual(score.key, 5)
+        self.assertEqual(score.id, 1000)
+        self.assertEqual(score.chart, 1)
+        self.assertEqual(score.points, 5)
+        score = music.get_score('game', 1, UserID(1337), 1000, 0)
+        self.assertEqual(score.id, 1000)
+        self.assertEqual(score.chart, 0)
+
+        # The catalog should only have been loaded once.
+        self.assertEqual(len([q for q in self.queries if 'FROM music' in q]), 1)
+
+        # Songs missing from the catalog are looked up directly.
+        self.assertEqual(music.get_score('game', 1, UserID(1337), 1001, 0).id, 1001)
+        self.assertIsNone(music.get_score('game', 1, UserID(1337), 1002, 0))
+        self.assertEqual(len([q for q in self.queries if 'FROM music' in q]), 3)
+
+    def test_get_all_songs(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        songs = music.get_all_songs('game', 1)
+        self.assertEqual(len(songs), 1)
+        self.assertEqual(songs[0].data.get_int('bpm'), 150)
+
+        # Callers are free to rearrange the list they get back.
+        songs.clear()
+        self.assertEqual(len(music.get_all_songs('game', 1)), 1)
+        self.assertEqual(len([q for q in self.queries if 'FROM music' in q]), 1)
+
+        # Each version is cached separately.
+        music.get_all_songs('game')
+        self.assertEqual(len([q for q in self.queries if 'FROM music' in q]), 2)
+
+    def test_put_attempt_stats(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+        music._transaction = Mock(side_effect=contextlib.nullcontext)  # type: ignore
+
+        music.put_attempt(
+            GameConstants.IIDX, 1, UserID(1337), 1000, 0, 1, 500,
+            {'clear_status': DBConstants.IIDX_CLEAR_STATUS_FULL_COMBO}, True,
+        )
+        music.put_attempt(
+            GameConstants.IIDX, 1, None, 1000, 1, 1, 200,
+            {'clear_status': DBConstants.IIDX_CLEAR_STATUS_FAILED}, False,
+        )
+        self.assertEqual(self.stats, [
+            {'musicid': 1, 'clears': 1, 'combos': 1, 'points': 500},
+            {'musicid': 2, 'clears': 0, 'combos': 0, 'points': 200},
+        ])
+
+        # Only attempts by a user should count towards their high score's play count.
+        self.assertEqual(len([q for q in self.queries if 'UPDATE `score` SET plays = plays + 1' in q]), 1)
+
+        # Attempts that aren't plays shouldn't be counted at all.
+        music.put_attempt(
+            GameConstants.IIDX, 1, UserID(1337), 1000, 0, 1, 0,
+            {'clear_status': DBConstants.IIDX_CLEAR_STATUS_NO_PLAY}, False,
+        )
+        self.assertEqual(len(self.stats), 2)
+
+        # Each attempt should be written in its own transaction.
+        self.assertEqual(music._transaction.call_count, 3)
+
+    def test_put_scores_and_attempts(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+        music._transaction = Mock(side_effect=contextlib.nullcontext)  # type: ignore
+
+        clear = {'clear_status': DBConstants.IIDX_CLEAR_STATUS_CLEAR}
+        music.put_scores_and_attempts(
+            GameConstants.IIDX,
+            1,
+            UserID(1337),
+            [
+                Score(-1, 1000, 0, 500, 10, 12, 1, 0, clear),
+                Score(-1, 1000, 1, 200, 11, 11, 1, 0, clear),
+            ],
+            [
+                Attempt(-1, 1000, 0, 500, 10, 1, True, clear),
+                Attempt(-1, 1000, 1, 200, 11, 1, True, clear),
+                Attempt(-1, 1000, 0, 400, 12, 1, False, clear),
+            ],
+        )
+        music._transaction.assert_called_once()
+
+        # Everything is written with multi-row statements, and play counts are grouped.
+        writes = [q for q in self.queries if q.startswith('INSERT') or q.startswith('UPDATE')]
+        self.assertEqual(len(writes), 5)
+        self.assertEqual(len(self.stats), 1)
+        self.assertEqual(self.stats[0]['plays0'], 2)
+        self.assertEqual(self.stats[0]['points0'], 900)
+        self.assertEqual(self.stats[0]['plays1'], 1)
+
+    def test_put_scores_and_attempts_duplicates(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+        music._transaction = Mock(side_effect=contextlib.nullcontext)  # type: ignore
+
+        clear = {'clear_status': DBConstants.IIDX_CLEAR_STATUS_CLEAR}
+        music.put_scores_and_attempts(
+            GameConstants.IIDX,
+            1,
+            UserID(1337),
+            [Score(-1, 1000, 0, 500, 10, 10, 1, 0, clear)],
+            [
+                Attempt(-1, 1000, 0, 500, 10, 1, True, clear),
+                Attempt(-1, 1000, 0, 400, 10, 1, False, clear),
+                Attempt(-1, 1000, 1, 300, 10, 1, True, clear),
+            ],
+        )
+
+        # Repeats of a chart at the same time are dropped instead of failing the batch.
+        history = [q for q in self.queries if 'INTO `score_history`' in q]
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].count(':musicid'), 2)
+        self.assertEqual(self.stats[0]['plays0'], 1)
+        self.assertEqual(self.stats[0]['points0'], 500)
+
+    def test_get_clear_rates(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        self.assertEqual(music.get_clear_rates(GameConstants.SDVX, 1), {
+            1000: {
+                0: {'plays': 4, 'clears': 3, 'combos': 1, 'average': 1000},
+                1: {'plays': 2, 'clears': 0, 'combos': 0, 'average': 5},
+            },
+        })
+
+    def test_get_leaderboard(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        self.assertEqual(music.get_leaderboard_rank('game', 1, UserID(1337), 1000, 1), 7)
+        self.assertIsNone(music.get_leaderboard_rank('game', 1, UserID(1338), 1000, 1))
+        self.assertIsNone(music.get_leaderboard_rank('game', 1, UserID(1337), 1002, 1))
+
+        scores = music.get_leaderboard('game', 1, 1000, 1, offset=3, limit=9)
+        self.assertEqual(len(scores), 1)
+        self.assertEqual(scores[0][0], 1337)
+        self.assertEqual(scores[0][1].id, 1000)
+        self.assertEqual(scores[0][1].chart, 1)
+        self.assertIn('ORDER BY points DESC, timestamp DESC LIMIT :limit OFFSET :offset', self.queries[-1])
+
+    def test_get_all_scores_and_records(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        for version in [1, None]:
+            self.queries = []
+            music.get_all_scores('game', version, songid=1000, songchart=1)
+            music.get_all_records('game', version, userlist=[UserID(1337)], locationlist=[1])
+
+            # Neither query should need to look up songs or count history row by row.
+            for sql in self.queries:
+                self.assertNotIn('score_history', sql)
+                self.assertNotIn('WHERE music.id = score.musicid', sql)
+
+    def test_get_all_records_paged(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        # Unpaged lookups shouldn't pay for sorting.
+        music.get_all_records('game', 1)
+        self.assertNotIn('ORDER BY', self.queries[-1])
+
+        # Pages should be stable, and only ask for what changed when polling.
+        music.get_all_records('game', 1, songchart=2, since=100, after=(1000, 2, 55), limit=500)
+        self.assertIn('music.chart = :songchart', self.queries[-1])
+        self.assertIn('score.update >= :since', self.queries[-1])
+        self.assertIn('(music.songid, music.chart, score.id) > (:after_songid, :after_chart, :after_key)', self.queries[-1])
+        self.assertIn('ORDER BY music.songid, music.chart, score.id LIMIT :limit', self.queries[-1])
+        self.assertNotIn('OFFSET', self.queries[-1])
+
+        # Filters should apply to the plays totals as well, so they don't add up every chart.
+        music.get_all_records('game', 1, songids=[1000, 1001])
+        self.assertEqual(self.queries[-1].count('music.songid IN :songids'), 2)
+        self.assertEqual(music.execute.call_args[0][1]['songids'], (1000, 1001))
+
+    def test_get_all_attempts_since(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        # Refreshing a score feed should only ask for attempts newer than the last one seen.
+        attempts = music.get_all_attempts('game', 1, since_id=10)
+        self.assertIn('id >= :since_id', self.queries[-1])
+        self.assertNotIn('id < :until_id', self.queries[-1])
+        self.assertIn('ORDER BY id DESC', self.queries[-1])
+        self.assertEqual([(userid, attempt.key) for (userid, attempt) in attempts], [(1337, 11)])
+
+    def test_get_score_total_ranks(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+
+        self.assertEqual(music.get_score_total_ranks('game', 1, {'total': 1000, 'hard': 500}), {'total': 5, 'hard': 1})
+        self.assertEqual(music.get_score_total_ranks('game', 1, {}), {})
+        self.assertEqual(len(self.queries), 1)
+
+        # Updates should add to existing totals rather than recounting them.
+        music.update_score_totals('game', 1, UserID(1337), {'total': 100, 'hard': 100})
+        self.assertEqual(len(self.queries), 3)
+        self.assertIn('total = total + VALUES(total)', self.queries[-1])
+
+    def test_replace_score_totals(self) -> None:
+        music = MusicData({'database': {}}, None)
+        music.execute = Mock(side_effect=self.execute)
+        music._transaction = Mock(side_effect=contextlib.nullcontext)  # type: ignore
+
+        music.replace_score_totals('game', 1, {
+            UserID(1337): {'total': 1000, 'hard': 500},
+            UserID(1338): {'total': 200},
+        })
+        music._transaction.assert_called_once()
+
+        # Old totals are cleared and new ones written in a single multi-row statement.
+        self.assertEqual(len(self.queries), 2)
+        self.assertIn('DELETE FROM `score_total`', self.queries[0])
+        self.assertEqual(self.queries[1].count('(:game, :version'), 3)
@@ -0,0 +1,109 @@
+# vim: set fileencoding=utf-8
+import array
+import copy
+import unittest
+
+from bemani.protocol import Node
+from bemani.protocol.node import NodeException
+
+
+class TestNode(unittest.TestCase):
+
+    def test_slots(self) -> None:
+        node = Node.u32('node', 5)
+        with self.assertRaises(AttributeError):
+            node.extra = 5  # type: ignore
+
+    def test_attributes(self) -> None:
+        node = Node.void('node')
+        self.assertEqual(node.attributes, {})
+        self.assertEqual(node.attribute('attr'), None)
+        self.assertEqual(node.attribute('attr', 'default'), 'default')
+
+        node.set_attribute('attr', 'value')
+        self.assertEqual(node.attributes, {'attr': 'value'})
+        self.assertEqual(node.attribute('attr'), 'value')
+
+        other = Node.void('node')
+        self.assertNotEqual(node, other)
+        other.set_attribute('attr', 'value')
+        self.assertEqual(node, other)
+
+    def test_array_storage(self) -> None:
+        node = Node.u16_array('node', [1, 2, 3])
+        self.assertEqual(node.value, [1, 2, 3])
+        self.assertIsInstance(node.array_value, array.array)
+
+        # Packed arrays and out of range arrays should both work.
+        node = Node(name='node', type=Node.NODE_TYPE_U8, array=True, value=[1, 2, 300])
+        self.assertEqual(node.value, [1, 2, 300])
+        self.assertIsNone(node.array_value)
+
+        # Floats should come back exactly as they were set.
+        node = Node.float_array('node', [0.1, 2.5])
+        self.assertEqual(node.value, [0.1, 2.5])
+
+        # Booleans are left as a list.
+        node = Node.bool_array('node', [True, False, 1])
+        self.assertEqual(node.value, [True, False, True])
+        self.assertIsNone(node.array_value)
+
+        # Modifying a returned value shouldn't modify the node.
+        node = Node.s32_array('node', [-1, 0, 1])
+        value = node.value
+        value.append(2)
+        self.assertEqual(node.value, [-1, 0, 1])
+
+        # Equality shouldn't depend on how the array is stored.
+        self.assertEqual(
+            Node.s32_array('node', [-1, 0, 1]),
+            Node(name='node', type=Node.NODE_TYPE_S32, array=True, value=array.array('q', [-1, 0, 1])),
+        )
+        self.assertNotEqual(Node.s32_array('node', [-1, 0, 1]), Node.s32_array('node', [-1, 0, 2]))
+
+        with self.assertRaises(NodeException):
+            Node(name='node', type=Node.NODE_TYPE_U8, value=[1, 2])
+
+    def test_scalar_values(self) -> None:
+        self.assertEqual(Node.bool('node', True).value, True)
+        self.assertEqual(Node(name='node', type=Node.NODE_TYPE_BOOL, value=0).value, False)
+        self.assertEqual(Node.float('node', 1.5).value, 1.5)
+        self.assertEqual(Node.ipv4('node', '127.0.0.1').value, b'\x7f\x00\x00\x01')
+        self.assertEqual(Node(name='node', type=Node.NODE_TYPE_U32, value='12').value, 12)
+        self.assertEqual(Node.fouru8('node', [1, 2, 3, 4]).value, [1, 2, 3, 4])
+        self.assertEqual(Node.string('node', 'str').value, 'str')
+        self.assertEqual(Node.binary('node', b'bin').value, b'bin')
+
+    def test_child_lookup(self) -> None:
+        for count in [Node.CHILD_INDEX_THRESHOLD - 1, Node.CHILD_INDEX_THRESHOLD * 4]:
+            root = Node.void('root')
+            for i in range(count):
+                root.add_child(Node.u32(f'node{i}', i))
+            root.add_child(Node.u32('node0', 1000))
+            self.assertEqual(root.child_value('node0'), 0)
+            self.assertEqual(root.child_value(f'node{count - 1}'), count - 1)
+            self.assertIsNone(root.child('missing'))
+
+            # Children added after a lookup should still be found.
+            sub = Node.void('sub')
+            sub.add_child(Node.string('leaf', 'value'))
+            root.add_child(sub)
+            self.assertEqual(root.child_value('sub/leaf'), 'value')
+            self.assertIsNone(root.child('sub/missing'))
+            self.assertIsNone(root.child('missing/leaf'))
+
+            # As should ones modified directly.
+            root.children.pop()
+            self.assertIsNone(root.child('sub'))
+            root.children.append(sub)
+            self.assertEqual(root.child_value('sub/leaf'), 'value')
+
+    def test_copy(self) -> None:
+        root = Node.void('root')
+        root.set_attribute('attr', 'value')
+        root.add_child(Node.u8_array('array', [1, 2, 3]))
+        copied = copy.deepcopy(root)
+        self.assertEqual(root, copied)
+
+        root.child('array').set_value([4, 5, 6])
+        self.assertEqual(copied.child_value('array'), [1, 2, 3])
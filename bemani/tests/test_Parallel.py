@@ -1,5 +1,6 @@
 # vim: set fileencoding=utf-8
 import unittest
+from typing import List
 
 from bemani.common import Parallel
 
@@ -93,3 +94,20 @@ class TestParallel(unittest.TestCase):
     def test_flatten(self) -> None:
         results = Parallel.flatten([[1, 2, 3], [4, 5, 6], [7, 8, 9], []])
         self.assertEqual(results, [1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+    def test_nested(self) -> None:
+        # Nesting more work than the pool has threads shouldn't deadlock.
+        def inner(x: int) -> List[int]:
+            return Parallel.map(lambda y: x * y, list(range(4)))
+
+        results = Parallel.map(inner, list(range(Parallel.MAX_WORKERS * 2)))
+        self.assertEqual(results, [[0, x, x * 2, x * 3] for x in range(Parallel.MAX_WORKERS * 2)])
+
+    def test_exception(self) -> None:
+        def fun(x: int) -> int:
+            if x == 3:
+                raise ValueError('bad value')
+            return x
+
+        with self.assertRaises(ValueError):
+            Parallel.map(fun, [1, 2, 3, 4, 5])
@@ -3,6 +3,7 @@ import random
 import unittest
 
 from bemani.protocol.protocol import EAmuseProtocol
+from bemani.protocol.rc4 import RC4, RC4Exception
 
 
 class TestRC4Cipher(unittest.TestCase):
@@ -40,3 +41,16 @@ class TestRC4Cipher(unittest.TestCase):
 
         plaintext = proto._rc4_crypt(cyphertext, key)
         self.assertEqual(data, plaintext)
+
+    def test_empty_data(self) -> None:
+        self.assertEqual(RC4(b'12345').crypt(b''), b'')
+
+    def test_empty_key(self) -> None:
+        with self.assertRaises(RC4Exception):
+            RC4(b'')
+
+    def test_key_derivation(self) -> None:
+        key = EAmuseProtocol._derive_key('1-abcdef12-3456')
+        self.assertEqual(len(key), 16)
+        self.assertEqual(key, EAmuseProtocol._derive_key('1-abcdef12-3456'))
+        self.assertNotEqual(key, EAmuseProtocol._derive_key('1-abcdef12-3457'))
@@ -0,0 +1,88 @@
+# vim: set fileencoding=utf-8
+import unittest
+from typing import Any, Dict, List, Optional
+from unittest.mock import Mock
+
+from bemani.data.mysql.user import UserData
+from bemani.data.types import UserID
+from bemani.tests.helpers import FakeCursor
+
+
+class TestUserData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.queries: List[str] = []
+
+    def execute(self, sql: str, params: Optional[Dict[str, Any]]=None, safe_write_operation: bool=False) -> FakeCursor:
+        self.queries.append(sql)
+        if 'FROM refid LEFT JOIN extid' in sql:
+            return FakeCursor([
+                # User 1 has the requested version and an older one.
+                {'userid': 1, 'version': 2, 'refid': 'R1V2', 'extid': 11},
+                {'userid': 1, 'version': 1, 'refid': 'R1V1', 'extid': 11},
+                # User 2 only has older versions, so gets the newest of them.
+                {'userid': 2, 'version': 1, 'refid': 'R2V1', 'extid': 22},
+                {'userid': 2, 'version': 0, 'refid': 'R2V0', 'extid': 22},
+                # User 3 has a refid but never got an extid.
+                {'userid': 3, 'version': 2, 'refid': 'R3V2', 'extid': None},
+            ])
+        if 'COUNT(*) AS count FROM achievement' in sql:
+            self.assertEqual(params['id'], 5)
+            self.assertEqual(params['type'], 'sgrade')
+            return FakeCursor([{'count': 12}])
+        if 'AS attempts' in sql:
+            self.assertEqual(params['clearpath'], '$.clear_type')
+            self.assertEqual(params['scorepath'], '$.score')
+            return FakeCursor([
+                {'id': 101, 'attempts': 3, 'clears': 2, 'total_score': 300},
+                {'id': 102, 'attempts': 1, 'clears': None, 'total_score': None},
+            ])
+        if 'SELECT id, username FROM user' in sql:
+            self.assertEqual(params['userids'], (1, 2))
+            return FakeCursor([{'id': 1, 'username': 'user'}, {'id': 2, 'username': None}])
+        if 'FROM profile' in sql:
+            self.assertEqual(set(params.values()), {'R1V2', 'R2V1'})
+            return FakeCursor([
+                {'refid': refid, 'data': f'{{"name": "{refid}"}}'}
+                for refid in params.values()
+            ])
+        return FakeCursor([])
+
+    def test_get_any_profiles(self) -> None:
+        user = UserData({'database': {}}, None)
+        user.execute = Mock(side_effect=self.execute)
+
+        profiles = user.get_any_profiles('game', 2, [UserID(1), UserID(2), UserID(3), UserID(4), UserID(1)])
+        self.assertEqual([p[0] for p in profiles], [1, 2, 3, 4, 1])
+        self.assertEqual(profiles[0][1], {'refid': 'R1V2', 'extid': 11, 'game': 'game', 'version': 2, 'name': 'R1V2'})
+        self.assertEqual(profiles[1][1], {'refid': 'R2V1', 'extid': 22, 'game': 'game', 'version': 1, 'name': 'R2V1'})
+        self.assertIsNone(profiles[2][1])
+        self.assertIsNone(profiles[3][1])
+        self.assertEqual(profiles[4][1], profiles[0][1])
+        self.assertIsNot(profiles[4][1], profiles[0][1])
+
+        # Everything should have been looked up in a fixed number of queries.
+        self.assertEqual(len(self.queries), 2)
+
+    def test_achievement_counts(self) -> None:
+        user = UserData({'database': {}}, None)
+        user.execute = Mock(side_effect=self.execute)
+
+        self.assertEqual(user.count_achievements('game', 2, 5, 'sgrade'), 12)
+        self.assertEqual(user.get_achievement_stats('game', 2, 'course', 'score', 'clear_type', 2), {
+            101: {'attempts': 3, 'clears': 2, 'total_score': 300},
+            102: {'attempts': 1, 'clears': 0, 'total_score': 0},
+        })
+
+        # Neither should need to load the achievements themselves.
+        for sql in self.queries:
+            self.assertNotIn('achievement.data AS data', sql)
+
+    def test_get_usernames(self) -> None:
+        user = UserData({'database': {}}, None)
+        user.execute = Mock(side_effect=self.execute)
+
+        # Names should come back from one query, and no query at all when there's nothing to look up.
+        self.assertEqual(user.get_usernames([UserID(1), UserID(2)]), {1: 'user', 2: None})
+        self.assertEqual(user.get_usernames([]), {})
+        self.assertEqual(len(self.queries), 1)
@@ -112,3 +112,22 @@ class TestXmlDecoder(unittest.TestCase):
         self.assertEqual(tree.attributes, {})
         self.assertEqual(tree.data_type, 'u32')
         self.assertEqual(tree.value, [1, 2, 3, 4])
+
+    def test_decode_header_only(self) -> None:
+        data = b'<call model="M39:J:B:A:2014061900"><pcbevent method="put"><time __type="time">1438375918</time></pcbevent><other /></call>'
+
+        xml = XmlDecoder(data, 'ascii')
+        tree = xml.get_tree(header_only=True)
+
+        self.assertEqual(tree.name, 'call')
+        self.assertEqual(tree.attributes, {'model': 'M39:J:B:A:2014061900'})
+        self.assertEqual(len(tree.children), 1)
+        self.assertEqual(tree.children[0].name, 'pcbevent')
+        self.assertEqual(tree.children[0].attributes, {'method': 'put'})
+        self.assertEqual(tree.children[0].children, [])
+
+        xml = XmlDecoder(b'<call model="M39:J:B:A:2014061900"><pcbevent method="put" /><other /></call>', 'ascii')
+        tree = xml.get_tree(header_only=True)
+
+        self.assertEqual(len(tree.children), 1)
+        self.assertEqual(tree.children[0].name, 'pcbevent')
@@ -3,28 +3,39 @@ import os
 import random
 import unittest
 
-from bemani.protocol.lz77 import Lz77, Lz77Decompress
+from bemani.protocol.lz77 import Lz77, Lz77Compress, Lz77Decompress, LzException
 from bemani.tests.helpers import get_fixture
 
 
 class TestLZ77Decompressor(unittest.TestCase):
-    def test_ringbuffer_fuzz(self) -> None:
-        dec = Lz77Decompress(b'')
+    def test_streaming_fuzz(self) -> None:
+        lz77 = Lz77()
+        data = os.urandom(16 * 1024) + get_fixture("declaration.txt") + get_fixture("rawdata")
+        compresseddata = lz77.compress(data)
 
-        for _ in range(100):
-            amount = random.randint(1, Lz77Decompress.RING_LENGTH)
-            data = os.urandom(amount)
+        for _ in range(20):
+            dec = Lz77Decompress()
+            chunks = []
+            pos = 0
+            while pos < len(compresseddata):
+                amount = random.randint(1, 1024)
+                chunks.append(dec.feed(compresseddata[pos:(pos + amount)]))
+                pos += amount
+            chunks.append(dec.finish())
 
-            # Save our ring position, write a chunk of data
-            readpos = dec.write_pos
-            dec._ring_write(data)
+            self.assertEqual(data, b''.join(chunks))
 
-            # Read a chunk of data back from that buffer, see its the same
-            newdata = b''.join(dec._ring_read(readpos, amount))
-            self.assertEqual(data, newdata)
+            # Verify that we only hold on to what backrefs could need
+            self.assertEqual(len(dec.window), Lz77Decompress.RING_LENGTH)
 
-            # Verify integrity of ringbuffer
-            self.assertEqual(len(dec.ring), Lz77Decompress.RING_LENGTH)
+    def test_overlapped_backref(self) -> None:
+        dec = Lz77Decompress(b"\x07abc\x006\x00\x00")
+        self.assertEqual(b"abcabcabcabc", dec.finish())
+
+    def test_truncated_backref(self) -> None:
+        dec = Lz77Decompress(b"\x07abc\x00")
+        with self.assertRaises(LzException):
+            dec.finish()
 
 
 class TestLz77RealCompressor(unittest.TestCase):
@@ -103,3 +114,20 @@ class TestLz77RealCompressor(unittest.TestCase):
 
         decompresseddata = lz77.decompress(compresseddata)
         self.assertEqual(data, decompresseddata)
+
+    def test_compression_levels(self) -> None:
+        data = get_fixture("declaration.txt")
+        sizes = []
+
+        for level in [Lz77Compress.LEVEL_FAST, Lz77Compress.LEVEL_DEFAULT, Lz77Compress.LEVEL_BEST]:
+            compresseddata = Lz77Compress(data, level=level).compress()
+            self.assertEqual(b"\x07abc\x006\x00\x00", Lz77Compress(b"abcabcabcabc", level=level).compress())
+            self.assertEqual(data, Lz77Decompress(compresseddata).finish())
+            sizes.append(len(compresseddata))
+
+        # Higher levels should never do worse on text.
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+    def test_unknown_compression_level(self) -> None:
+        with self.assertRaises(LzException):
+            Lz77Compress(b"abcabcabcabc", level=4)
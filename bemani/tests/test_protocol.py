@@ -3,6 +3,7 @@ import unittest
 from typing import Optional
 
 from bemani.protocol import EAmuseProtocol, Node
+from bemani.protocol.binary import BinaryEncoding
 
 
 class TestProtocol(unittest.TestCase):
@@ -12,6 +13,16 @@ class TestProtocol(unittest.TestCase):
     def assertLoopback(self, root: Node) -> Optional[int]:
         proto = EAmuseProtocol()
 
+        # Verify that the fast binary path matches the reference implementation exactly.
+        fast = BinaryEncoding().encode(root, EAmuseProtocol.SHIFT_JIS)
+        reference = BinaryEncoding(reference=True).encode(root, EAmuseProtocol.SHIFT_JIS)
+        self.assertEqual(fast, reference, "Fast binary encoder doesn't match reference encoder!")
+        self.assertEqual(
+            BinaryEncoding().decode(reference),
+            BinaryEncoding(reference=True).decode(reference),
+            "Fast binary decoder doesn't match reference decoder!",
+        )
+
         for encoding in [EAmuseProtocol.BINARY, EAmuseProtocol.XML]:
             if encoding == EAmuseProtocol.BINARY:
                 loop_name = "binary"
@@ -285,7 +285,7 @@ def extract_txp2(
     return 0
 
 
-def update_txp2(fname: str, update_dir: str, *, pretend: bool=False, verbose: bool=False) -> int:
+def update_txp2(fname: str, update_dir: str, *, pretend: bool=False, compress_level: Optional[int]=None, verbose: bool=False) -> int:
     # First, parse the file out
     with open(fname, "rb") as bfp:
         afpfile = TXP2File(bfp.read(), verbose=verbose)
@@ -320,10 +320,10 @@ def update_txp2(fname: str, update_dir: str, *, pretend: bool=False, verbose: bo
     # Now, write out the updated file
     if pretend:
         print(f"Would write {fname}...")
-        afpfile.unparse()
+        afpfile.unparse(compress_level=compress_level)
     else:
         print(f"Writing {fname}...")
-        data = afpfile.unparse()
+        data = afpfile.unparse(compress_level=compress_level)
         with open(fname, "wb") as bfp:
             bfp.write(data)
 
@@ -759,6 +759,13 @@ def main() -> int:
         action="store_true",
         help="Pretend to update instead of updating",
     )
+    update_parser.add_argument(
+        "-l",
+        "--compress-level",
+        type=int,
+        default=None,
+        help="Compression level to use for updated textures, from 1 (fastest) to 3 (smallest)",
+    )
     update_parser.add_argument(
         "-v",
         "--verbose",
@@ -969,7 +976,7 @@ def main() -> int:
             verbose=args.verbose,
         )
     elif args.action == "update":
-        return update_txp2(args.file, args.dir, pretend=args.pretend, verbose=args.verbose)
+        return update_txp2(args.file, args.dir, pretend=args.pretend, compress_level=args.compress_level, verbose=args.verbose)
     elif args.action == "print":
         return print_txp2(args.file, decompile_bytecode=args.decompile_bytecode, verbose=args.verbose)
     elif args.action == "parseafp":
@@ -68,11 +68,18 @@ def remove_admin(config: Dict[str, Any], username: Optional[str]) -> None:
     print(f'User {username} lost admin rights.')
 
 
+def rebuild_clear_stats(config: Dict[str, Any], game: Optional[str]) -> None:
+    data = Data(config)
+    count = data.local.music.rebuild_clear_stats(game)
+    print(f'Rebuilt clear rate totals for {count} charts.')
+    data.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="A utility for working with databases created with this codebase.")
     parser.add_argument(
         "operation",
-        help="Operation to perform, options include 'create', 'generate', 'upgrade', 'change-password', 'add-admin' and 'remove-admin'.",
+        help="Operation to perform, options include 'create', 'generate', 'upgrade', 'change-password', 'add-admin', 'remove-admin' and 'rebuild-clear-stats'.",
         type=str,
     )
     parser.add_argument(
@@ -93,6 +100,12 @@ def main() -> None:
         help="Allow empty migration script to be generated. Useful for data-only migrations.",
         action='store_true',
     )
+    parser.add_argument(
+        "-g",
+        "--game",
+        help="Game series to rebuild clear rate totals for. Defaults to all games.",
+        type=str,
+    )
     parser.add_argument("-c", "--config", help="Core configuration. Defaults to server.yaml", type=str, default="server.yaml")
     args = parser.parse_args()
 
@@ -111,6 +124,8 @@ def main() -> None:
             remove_admin(config, args.username)
         elif args.operation == 'change-password':
             change_password(config, args.username)
+        elif args.operation == 'rebuild-clear-stats':
+            rebuild_clear_stats(config, args.game)
         else:
             raise Exception(f"Unknown operation '{args.operation}'")
     except DBCreateException as e:
@@ -15,6 +15,7 @@ from bemani.frontend import app, config  # noqa: F401
 from bemani.frontend.account import account_pages
 from bemani.frontend.admin import admin_pages
 from bemani.frontend.arcade import arcade_pages
+from bemani.frontend.assets import build_assets
 from bemani.frontend.home import home_pages
 from bemani.frontend.iidx import iidx_pages
 from bemani.frontend.popn import popn_pages
@@ -83,11 +84,26 @@ def load_config(filename: str) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="A front end services provider for eAmusement games.")
+    parser.add_argument(
+        "operation",
+        help="Operation to perform, options include 'serve' and 'build-assets'. Defaults to 'serve'.",
+        type=str,
+        nargs='?',
+        default='serve',
+    )
     parser.add_argument("-p", "--port", help="Port to listen on. Defaults to 80", type=int, default=80)
     parser.add_argument("-c", "--config", help="Core configuration. Defaults to server.yaml", type=str, default="server.yaml")
     parser.add_argument("-r", "--profile", help="Turn on profiling for front end", action="store_true")
     args = parser.parse_args()
 
+    if args.operation == 'build-assets':
+        # Precompile JSX ahead of time so that workers don't have to on first load
+        manifest = build_assets()
+        print(f"Compiled {len(manifest)} scripts")
+        return
+    elif args.operation != 'serve':
+        raise Exception(f"Unknown operation '{args.operation}'")
+
     # Set up app
     load_config(args.config)
 
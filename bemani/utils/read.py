@@ -72,6 +72,13 @@ class ImportBase:
         self.__batch = True
 
     def finish_batch(self) -> None:
+        if not self.__config['database'].get('read_only', False):
+            # Let any running servers know the catalog may have changed, so that they
+            # drop their cached music IDs and songs.
+            self.execute(
+                "INSERT INTO cache_version (name, version) VALUES (:name, 1) ON DUPLICATE KEY UPDATE version = version + 1",
+                {'name': MusicData.MUSICID_CACHE.name},
+            )
         self.__session.commit()
         self.__batch = False
 
@@ -18,7 +18,7 @@ from bemani.frontend.ddr import DDRCache
 from bemani.frontend.sdvx import SoundVoltexCache
 from bemani.frontend.reflec import ReflecBeatCache
 from bemani.frontend.museca import MusecaCache
-from bemani.common import GameConstants, Time
+from bemani.common import GameConstants, DBConstants, Time
 from bemani.data import Data
 
 
@@ -57,6 +57,13 @@ def run_scheduled_work(config: Dict[str, Any]) -> None:
     for factory in enabled_factories:
         factory.run_scheduled_work(data, config)
 
+    # Now, bring our copy of remote scores up to date if we serve scores from it
+    if config.get('mirror_remote_scores', False):
+        for factory in enabled_factories:
+            for (game, version, _) in factory.all_games():
+                data.remote.music.refresh_remote_scores(game, version)
+                data.remote.music.refresh_remote_scores(game, version + DBConstants.OMNIMIX_VERSION_BUMP)
+
     # Now, warm the caches for the frontend
     for cache in enabled_caches:
         cache.preload(data, config)
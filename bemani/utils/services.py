@@ -2,10 +2,11 @@ import argparse
 import copy
 import traceback
 import yaml
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from flask import Flask, request, redirect, Response, make_response
 
 from bemani.protocol import EAmuseProtocol
+from bemani.protocol.lz77 import Lz77Compress
 from bemani.backend import Dispatch, UnrecognizedPCBIDException
 from bemani.backend.iidx import IIDXFactory
 from bemani.backend.popn import PopnMusicFactory
@@ -21,6 +22,19 @@ from bemani.data import Data
 
 app = Flask(__name__)
 config: Dict[str, Any] = {}
+dataprovider: Optional[Data] = None
+
+
+def get_data() -> Data:
+    """
+    Look up the Data object for this worker, creating it on first use. This is
+    created lazily so that a forking server creates one per worker process.
+    """
+    global dataprovider
+
+    if dataprovider is None:
+        dataprovider = Data(config)
+    return dataprovider
 
 
 @app.route('/', defaults={'path': ''}, methods=['GET'])
@@ -64,7 +78,7 @@ def receive_request(path: str) -> Response:
         'address': remote_address or request.remote_addr,
     }
 
-    dataprovider = Data(requestconfig)
+    dataprovider = get_data()
     try:
         dispatch = Dispatch(requestconfig, dataprovider, True)
         resp = dispatch.handle(req)
@@ -79,12 +93,17 @@ def receive_request(path: str) -> Response:
             )
             return Response("No response generated", 404)
 
-        compression = None
+        # Only compress responses to games that compressed their request, and only
+        # if the operator has opted into spending the CPU on it.
+        compress_level = config['server'].get('compress_level', 0)
+        if compress_level == 0 or compression != 'lz77':
+            compression = None
 
         data = proto.encode(
             compression,
             encryption,
             resp,
+            compress_level=compress_level,
         )
 
         response = make_response(data)
@@ -122,7 +141,9 @@ def receive_request(path: str) -> Response:
         )
         return Response("Crash when handling packet!", 500)
     finally:
-        dataprovider.close()
+        # Return our connection to the pool rather than closing everything down,
+        # since the next request will need it again.
+        dataprovider.release()
 
 
 def load_config(filename: str) -> None:
@@ -131,6 +152,14 @@ def load_config(filename: str) -> None:
     config.update(yaml.safe_load(open(filename)))
     config['database']['engine'] = Data.create_engine(config)
 
+    # Catch a bad compression level now, rather than failing every request that asks for it.
+    compress_level = config['server'].get('compress_level', 0)
+    if compress_level not in {0, Lz77Compress.LEVEL_FAST, Lz77Compress.LEVEL_DEFAULT, Lz77Compress.LEVEL_BEST}:
+        raise Exception(
+            f"Invalid compress_level {compress_level}, should be 0 to disable compression or "
+            f"{Lz77Compress.LEVEL_FAST} through {Lz77Compress.LEVEL_BEST}!"
+        )
+
 
 def register_games() -> None:
     global config